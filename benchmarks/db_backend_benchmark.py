@@ -0,0 +1,80 @@
+import argparse
+import logging
+import tempfile
+import time
+from src.db_helper import open_repository
+
+
+def build_documents(count: int) -> list[dict]:
+    return [
+        {
+            "isbn": f"{index:013d}",
+            "title": f"Book {index}",
+            "author": f"Author {index}",
+            "page_count": 300,
+            "state": "on_going",
+            "type": "by_page",
+            "current_page": 0,
+            "channel_id": f"C{index:08d}",
+            "object_type": "book",
+        }
+        for index in range(count)
+    ]
+
+
+def measure(name: str, directory: str, documents: list[dict], upserts: int) -> dict:
+    repository = open_repository(name.format(directory=directory))
+    repository.insert_many(documents)
+    repository.close()
+
+    started = time.perf_counter()
+    repository = open_repository(name.format(directory=directory))
+    repository.find("isbn", documents[0]["isbn"])
+    load = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for index in range(upserts):
+        repository.upsert(
+            {"isbn": documents[index * 7 % len(documents)]["isbn"], "current_page": 15},
+            "isbn",
+        )
+    repository.close()
+    upsert = (time.perf_counter() - started) / upserts
+
+    started = time.perf_counter()
+    books = repository.of_type("book")
+    scan = time.perf_counter() - started
+    repository.close()
+
+    assert len(books) == len(documents)
+    return {"load": load, "upsert": upsert, "scan": scan}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load, upsert and scan cost of the TinyDB and SQLite backends"
+    )
+    parser.add_argument(
+        "--documents", type=int, nargs="+", default=[1000, 10_000, 100_000]
+    )
+    parser.add_argument("--upserts", type=int, default=1000)
+    arguments = parser.parse_args()
+
+    logging.getLogger("daily_learner").setLevel(logging.ERROR)
+
+    for count in arguments.documents:
+        documents = build_documents(count)
+        for backend, name in [
+            ("tinydb", "{directory}/books.json"),
+            ("sqlite", "sqlite:///{directory}/books.db"),
+        ]:
+            with tempfile.TemporaryDirectory() as directory:
+                result = measure(name, directory, documents, arguments.upserts)
+            print(
+                f"{count} documents - {backend}: load {result['load'] * 1000:.0f}ms - "
+                f"upsert {result['upsert'] * 1_000_000:.0f}us - scan {result['scan'] * 1000:.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import random
+import time
+from tinydb import Query, TinyDB
+from tinydb.storages import MemoryStorage
+from src.repository_helper import IndexedRepository
+
+
+def build_catalog(size: int) -> TinyDB:
+    db = TinyDB(storage=MemoryStorage)
+    db.insert_multiple(
+        {"isbn": f"{index:013d}", "title": f"Book {index}", "object_type": "book"}
+        if index % 2
+        else {"name": f"Technology {index}", "object_type": "tech"}
+        for index in range(size)
+    )
+    return db
+
+
+def per_lookup_ms(lookup, keys: list[str]) -> float:
+    started = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    return (time.perf_counter() - started) * 1000 / len(keys)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="ISBN lookups through TinyDB queries against the indexed repository"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--scan-lookups", type=int, default=5)
+    parser.add_argument("--index-lookups", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    arguments = parser.parse_args()
+
+    generator = random.Random(arguments.seed)
+
+    for size in arguments.sizes:
+        db = build_catalog(size)
+        keys = [f"{generator.randrange(1, size, 2):013d}" for _ in range(10_000)]
+
+        scan = per_lookup_ms(
+            lambda isbn: db.search(
+                (Query().isbn == isbn) & (Query().object_type == "book")
+            ),
+            keys[: arguments.scan_lookups],
+        )
+
+        repository = IndexedRepository(db)
+        started = time.perf_counter()
+        repository.rebuild()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        indexed = per_lookup_ms(
+            lambda isbn: repository.find("isbn", isbn),
+            keys[: arguments.index_lookups],
+        )
+
+        print(
+            f"{size} documents: query scan {scan:.3f}ms - indexed {indexed * 1000:.2f}us "
+            f"per lookup ({scan / indexed:.0f}x) - index built once in {build_ms:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
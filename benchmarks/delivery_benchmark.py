@@ -0,0 +1,96 @@
+import argparse
+import logging
+import tempfile
+import time
+from functools import partial
+from src.delivery_helper import DeliveryQueue
+from src.metrics_helper import metrics
+from src.slack_helper import PooledWebClient, send_slack_message
+from tests.slack_stand_in import SlackStandIn
+
+SECTION = (
+    "## Key ideas\n"
+    "The chapter explains why **small functions** are easier to read and test.\n\n"
+    "- Keep functions short\n- Use *descriptive* names\n\n"
+    "```python\ndef total(items):\n    return sum(item.price for item in items)\n```\n\n"
+)
+
+
+def build_summary(size: int) -> str:
+    return (SECTION * (size // len(SECTION) + 1))[:size]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="End-to-end delivery of daily summaries against a local Slack stand-in"
+    )
+    parser.add_argument("--summaries", type=int, default=2000)
+    parser.add_argument("--channels", type=int, default=2000)
+    parser.add_argument("--channel-per-second", type=float, default=1)
+    parser.add_argument("--summary-kb", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--rate-limit-every", type=int, default=200)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--global-per-second", type=float, default=1000)
+    arguments = parser.parse_args()
+
+    logging.getLogger("daily_learner").setLevel(logging.ERROR)
+
+    stand_in = SlackStandIn(
+        latency_seconds=arguments.latency_ms / 1000,
+        rate_limit_every=arguments.rate_limit_every,
+        retry_after=arguments.retry_after,
+        error_rate=arguments.error_rate,
+    ).start()
+    client = PooledWebClient(
+        pool_size=arguments.workers, token="xoxb-benchmark", base_url=stand_in.base_url
+    )
+    summary = build_summary(arguments.summary_kb * 1024)
+
+    with tempfile.TemporaryDirectory() as directory:
+        queue = DeliveryQueue(
+            directory=directory,
+            channel_rate=arguments.channel_per_second,
+            global_rate=arguments.global_per_second,
+            max_workers=arguments.workers,
+            max_attempts=5,
+            sender=partial(send_slack_message, client=client, structured=True),
+            sleep=lambda seconds: time.sleep(min(seconds, 1)),
+        )
+        metrics.reset()
+
+        started = time.perf_counter()
+        for index in range(arguments.summaries):
+            queue.enqueue(f"C{index % arguments.channels:08d}", summary)
+        queue.join()
+        elapsed = time.perf_counter() - started
+
+        undelivered = queue.stats()["undelivered"]
+
+    client.close()
+    stand_in.stop()
+
+    snapshot = metrics.snapshot()
+    counters = snapshot["counters"]
+    wait = snapshot["samples"].get("delivery.wait_seconds", {})
+    print(
+        f"{arguments.summaries} summaries of {arguments.summary_kb} KB to "
+        f"{arguments.channels} channels in {elapsed:.1f}s "
+        f"({arguments.summaries / elapsed:.0f} summaries/s)"
+    )
+    print(
+        f"sent {counters.get('delivery.sent', 0):.0f} - "
+        f"rate limited {counters.get('delivery.rate_limited', 0):.0f} - "
+        f"errors {counters.get('delivery.errors', 0):.0f} - "
+        f"undelivered {undelivered}"
+    )
+    print(
+        f"queue wait p50 {wait.get('p50', 0):.2f}s p95 {wait.get('p95', 0):.2f}s - "
+        f"{stand_in.calls['chat.postMessage']} chat.postMessage calls"
+    )
+
+
+if __name__ == "__main__":
+    main()
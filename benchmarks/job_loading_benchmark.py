@@ -0,0 +1,103 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+import schedule
+
+
+def documents(jobs: int) -> tuple[list[dict], list[dict]]:
+    catalog, subscriptions = [], []
+    for index in range(jobs):
+        if index % 10:
+            catalog.append(
+                {
+                    "isbn": f"{index:013d}",
+                    "title": f"Book {index}",
+                    "author": "Author",
+                    "state": "on_going",
+                    "type": "by_page",
+                    "object_type": "book",
+                    "page_count": 300,
+                    "channel_id": f"C{index:08d}",
+                }
+            )
+            subscriptions.append({"isbn": f"{index:013d}", "object_type": "book"})
+        else:
+            catalog.append(
+                {
+                    "name": f"Technology {index}",
+                    "object_type": "tech",
+                    "channel_id": f"C{index:08d}",
+                }
+            )
+            subscriptions.append({"name": f"Technology {index}", "object_type": "tech"})
+    return catalog, subscriptions
+
+
+def per_10k_ms(load, jobs: int) -> float:
+    schedule.clear()
+    started = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - started
+    assert len(schedule.jobs) == jobs
+    return elapsed * 1000 * 10_000 / jobs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Startup job loading with per-job lookups against one bulk pass"
+    )
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--backend", choices=("tinydb", "sqlite"), default="tinydb")
+    arguments = parser.parse_args()
+
+    logging.getLogger("daily_learner").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        scheme = "sqlite:///" if arguments.backend == "sqlite" else ""
+        os.environ["DB_NAME"] = scheme + os.path.join(directory, "books")
+        os.environ["JOBS_DB_NAME"] = scheme + os.path.join(directory, "jobs")
+        os.environ["DB_FLUSH_WRITES"] = "1000000"
+        os.environ["DB_FLUSH_SECONDS"] = "0"
+
+        from src import db_helper
+        from src.schedule_helper import schedule_jobs
+
+        def per_job_lookups() -> None:
+            for element in db_helper.jobs_repository.all():
+                if isbn := element.get("isbn"):
+                    schedule_jobs(db_helper.load_book_by_isbn(isbn=isbn))
+                else:
+                    schedule_jobs(
+                        db_helper.load_technology_by_name(
+                            technology_name=element["name"]
+                        )
+                    )
+
+        for jobs in arguments.jobs:
+            catalog, subscriptions = documents(jobs)
+            db_helper.repository.truncate()
+            db_helper.jobs_repository.truncate()
+            db_helper.repository.insert_many(catalog)
+            db_helper.jobs_repository.insert_many(subscriptions)
+            db_helper.repository.all()
+            db_helper.jobs_repository.all()
+
+            timings = [
+                min(per_10k_ms(load, jobs) for _ in range(arguments.rounds))
+                for load in (per_job_lookups, db_helper.load_jobs)
+            ]
+
+            print(
+                f"{jobs} jobs on {arguments.backend}: per-job lookups {timings[0]:.0f}ms - "
+                f"bulk load {timings[1]:.0f}ms per 10k jobs "
+                f"({timings[0] / timings[1]:.1f}x)"
+            )
+
+        db_helper.close_db()
+
+
+if __name__ == "__main__":
+    main()
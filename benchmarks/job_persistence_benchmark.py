@@ -0,0 +1,72 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+from tinydb import TinyDB
+from src.repository_helper import IndexedRepository, SqliteRepository
+from src.storage_helper import WriteBehindStorage
+
+
+def truncate_and_reinsert(db: TinyDB, isbns: list[str]) -> None:
+    db.truncate()
+    for isbn in isbns:
+        db.insert({"isbn": isbn})
+
+
+def registration_ms(jobs: int, registrations: int, backend: str) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "jobs.json")
+        isbns = [f"{index:013d}" for index in range(jobs)]
+
+        if backend == "tinydb":
+            repository = IndexedRepository(
+                TinyDB(path, storage=WriteBehindStorage, max_pending_writes=1),
+                path,
+            )
+        elif backend == "sqlite":
+            repository = SqliteRepository(os.path.join(directory, "jobs.db"))
+        else:
+            db = TinyDB(path)
+            db.insert_multiple({"isbn": isbn} for isbn in isbns)
+        if backend != "legacy":
+            repository.insert_many({"isbn": isbn} for isbn in isbns)
+
+        started = time.perf_counter()
+        for index in range(registrations):
+            isbn = f"new-{index}"
+            isbns.append(isbn)
+            if backend == "legacy":
+                truncate_and_reinsert(db, isbns)
+            else:
+                repository.upsert({"isbn": isbn, "object_type": "book"}, "isbn")
+        elapsed = time.perf_counter() - started
+
+        if backend != "legacy":
+            repository.close()
+        return elapsed * 1000 / registrations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Cost of registering one job as the number of saved jobs grows"
+    )
+    parser.add_argument("--jobs", type=int, nargs="+", default=[100, 1000, 2000])
+    parser.add_argument("--registrations", type=int, default=5)
+    arguments = parser.parse_args()
+
+    logging.getLogger("daily_learner").setLevel(logging.ERROR)
+
+    for jobs in arguments.jobs:
+        legacy, tinydb, sqlite = (
+            registration_ms(jobs, arguments.registrations, backend)
+            for backend in ("legacy", "tinydb", "sqlite")
+        )
+        print(
+            f"{jobs} saved jobs: truncate and reinsert {legacy:.1f}ms - "
+            f"upsert {tinydb:.2f}ms on TinyDB, {sqlite:.2f}ms on SQLite per registration"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+from tinydb import TinyDB
+from src.lock_helper import LockedRepository
+from src.repository_helper import IndexedRepository
+from src.storage_helper import WriteBehindStorage
+
+
+def open_repository(path: str, locked: bool, flush_writes: bool = False):
+    repository = IndexedRepository(
+        TinyDB(path, storage=WriteBehindStorage, fsync="never", flush_interval=0.01),
+        path,
+    )
+    return LockedRepository(repository, path, flush_writes) if locked else repository
+
+
+def interleaved(repository, writers: int, readers: int) -> tuple[float, int]:
+    repository.upsert({"name": "counter", "count": 0}, "name")
+
+    def write(worker: int) -> None:
+        repository.upsert({"isbn": f"{worker:013d}", "object_type": "book"}, "isbn")
+        increment = getattr(repository, "write", None)
+        if increment is None:
+            counter = repository.find("name", "counter")
+            repository.upsert(
+                {"name": "counter", "count": counter["count"] + 1}, "name"
+            )
+            return
+        with increment():
+            counter = repository.find("name", "counter")
+            repository.upsert(
+                {"name": "counter", "count": counter["count"] + 1}, "name"
+            )
+
+    def read() -> None:
+        for _ in range(20):
+            repository.of_type("book")
+
+    threads = [
+        threading.Thread(target=write, args=(index,)) for index in range(writers)
+    ]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    count = repository.find("name", "counter")["count"]
+    repository.close()
+    return elapsed, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Interleaved writers and readers with and without the lock layer"
+    )
+    parser.add_argument("--writers", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--readers", type=int, default=20)
+    arguments = parser.parse_args()
+
+    logging.getLogger("daily_learner").setLevel(logging.ERROR)
+
+    for writers in arguments.writers:
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            for name, locked, flush_writes in (
+                ("unlocked", False, False),
+                ("locked", True, False),
+                ("multi-process", True, True),
+            ):
+                path = os.path.join(directory, f"{name}.json")
+                elapsed, count = interleaved(
+                    open_repository(path, locked, flush_writes),
+                    writers,
+                    arguments.readers,
+                )
+                results.append(f"{name} {elapsed * 1000:.0f}ms ({count}/{writers})")
+
+        print(f"{writers} writers: " + " - ".join(results))
+
+
+if __name__ == "__main__":
+    main()
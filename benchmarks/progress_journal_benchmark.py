@@ -0,0 +1,98 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+from tinydb import TinyDB
+from src.domain import Book, State, Type
+from src.journal_helper import ProgressJournal
+from src.repository_helper import IndexedRepository
+from src.storage_helper import WriteBehindStorage
+
+
+def catalog(books: int) -> list[dict]:
+    return [
+        Book.to_json(
+            Book(
+                isbn=f"{index:013d}",
+                title=f"Book {index}",
+                author="Author",
+                page_count=300,
+                channel_id=f"C{index:08d}",
+                state=State.ON_GOING,
+                type=Type.BY_PAGE,
+            )
+        )
+        for index in range(books)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Durable daily progress writes: full document upserts against journal appends"
+    )
+    parser.add_argument("--books", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--fsync", default="always")
+    arguments = parser.parse_args()
+
+    logging.getLogger("daily_learner").setLevel(logging.ERROR)
+
+    for books in arguments.books:
+        documents = catalog(books)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "books.json")
+            repository = IndexedRepository(
+                TinyDB(
+                    path,
+                    storage=WriteBehindStorage,
+                    max_pending_writes=1,
+                    fsync=arguments.fsync,
+                ),
+                path,
+            )
+            repository.insert_many(documents)
+            journal = ProgressJournal(
+                os.path.join(directory, "progress.journal"), fsync=arguments.fsync
+            )
+
+            started = time.perf_counter()
+            for index in range(arguments.updates):
+                document = documents[index % books]
+                repository.upsert({**document, "current_page": index}, "isbn")
+            upsert_ms = (time.perf_counter() - started) * 1000 / arguments.updates
+
+            started = time.perf_counter()
+            for index in range(arguments.updates):
+                book = Book.from_json(documents[index % books])
+                book.current_page = index
+                journal.append(book)
+            append_ms = (time.perf_counter() - started) * 1000 / arguments.updates
+
+            repository.close()
+            repository = IndexedRepository(
+                TinyDB(path, storage=WriteBehindStorage, fsync=arguments.fsync), path
+            )
+
+            def snapshot(events: list[dict]) -> None:
+                for event in events:
+                    repository.upsert(
+                        {"isbn": event["isbn"], "current_page": event["current_page"]},
+                        "isbn",
+                    )
+                repository.flush()
+
+            started = time.perf_counter()
+            compacted = journal.compact(snapshot)
+            compact_ms = (time.perf_counter() - started) * 1000
+            repository.close()
+
+        print(
+            f"{books} books: upsert {upsert_ms:.2f}ms - journal append {append_ms:.3f}ms "
+            f"per progress write ({upsert_ms / append_ms:.0f}x) - "
+            f"compacting {compacted} books took {compact_ms:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
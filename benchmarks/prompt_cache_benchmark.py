@@ -0,0 +1,197 @@
+import argparse
+import hashlib
+import random
+import time
+from collections.abc import Callable
+from src.prompt_helper import CHAPTER_TEMPLATE, PAGE_TEMPLATE, TECHNOLOGY_TEMPLATE
+
+CHARS_PER_TOKEN = 4
+
+
+class PrefixCachingStub:
+    # Mirrors the provider's rules: prompts under 1024 tokens are never cached
+    # and a cache hit covers the shared prefix in 128-token steps from there.
+    def __init__(
+        self,
+        min_tokens: int = 1024,
+        step_tokens: int = 128,
+        base_ms: float = 150,
+        prefill_ms_per_token: float = 0.5,
+        cached_ms_per_token: float = 0.05,
+        cached_price: float = 0.5,
+    ) -> None:
+        self.min_tokens = min_tokens
+        self.step_tokens = step_tokens
+        self.step_chars = step_tokens * CHARS_PER_TOKEN
+        self.base_ms = base_ms
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.cached_ms_per_token = cached_ms_per_token
+        self.cached_price = cached_price
+        self.blocks: set[str] = set()
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.billed_tokens = 0.0
+
+    def first_token_ms(self, prompt: str) -> float:
+        tokens = len(prompt) // CHARS_PER_TOKEN
+        cached = 0
+
+        if tokens >= self.min_tokens:
+            digest = hashlib.sha256()
+            still_cached = True
+            for start in range(0, len(prompt) - self.step_chars + 1, self.step_chars):
+                digest.update(prompt[start : start + self.step_chars].encode())
+                block = digest.hexdigest()
+                if still_cached and block in self.blocks:
+                    cached += self.step_tokens
+                else:
+                    still_cached = False
+                    self.blocks.add(block)
+            if cached < self.min_tokens:
+                cached = 0
+
+        self.prompt_tokens += tokens
+        self.cached_tokens += cached
+        self.billed_tokens += tokens - cached + cached * self.cached_price
+
+        return (
+            self.base_ms
+            + (tokens - cached) * self.prefill_ms_per_token
+            + cached * self.cached_ms_per_token
+        )
+
+
+def legacy_page_prompt(title: str, author: str, current: int, target: int) -> str:
+    return f"Please make a summary of the pages {current} to {target} for the book {title} by {author} - This summary can be detailed, it should be able to be read in under five minutes - Please refrain from using emojis etc.. Only use headings if necessary, highlight the important words, phrases. Also I want your answer to ONLY CONTAIN THE SUMMARY, nothing else no hello or bye or question JUST the summary"
+
+
+def legacy_chapter_prompt(title: str, author: str, chapter: int) -> str:
+    return f"Please make a summary of the chapter {chapter} of the book {title} by {author} - This summary should be detailed, it should be able to be read in under five minutes - Please refrain from using emojis etc.. use slack-flavored markdown for headers and highlighting the important words, phrases. Also I want your answer to ONLY CONTAIN THE SUMMARY, nothing else no hello or bye or question JUST the summary"
+
+
+def legacy_technology_prompt(technology_name: str) -> str:
+    return f"Please give me a tip or trick for using technology: {technology_name} - This tip or trick should be detailed with code example when necessary, Please refrain from using emojis etc.. use slack-flavored markdown for headers and highlighting the importan words, phrases. Also I want you answer to ONLY CONTAIN THE TIPS OR TRICKS, nothing else no hello or by or question JUST the tip"
+
+
+def templated_page_prompt(title: str, author: str, current: int, target: int) -> str:
+    return PAGE_TEMPLATE.render(
+        title=title, author=author, current_page=current, target_page=target
+    )
+
+
+def templated_chapter_prompt(title: str, author: str, chapter: int) -> str:
+    return CHAPTER_TEMPLATE.render(title=title, author=author, current_chapter=chapter)
+
+
+def templated_technology_prompt(technology_name: str) -> str:
+    return TECHNOLOGY_TEMPLATE.render(technology_name=technology_name)
+
+
+def with_prefix_tokens(builder: Callable[..., str], tokens: int) -> Callable[..., str]:
+    filler = " ".join(["guideline"] * (tokens * CHARS_PER_TOKEN // 10))
+
+    def build(*arguments) -> str:
+        return builder(*arguments).replace(
+            "\n\nRequest:\n", f"\n\n{filler}\n\nRequest:\n", 1
+        )
+
+    return build
+
+
+def build_workload(requests: int, seed: int) -> list[tuple]:
+    generator = random.Random(seed)
+    workload: list[tuple] = []
+    for index in range(requests):
+        kind = generator.choice(["page", "chapter", "tech"])
+        if kind == "page":
+            start = generator.randrange(0, 400, 10)
+            workload.append(
+                (kind, f"Book {index}", f"Author {index}", start, start + 20)
+            )
+        elif kind == "chapter":
+            workload.append(
+                (kind, f"Book {index}", f"Author {index}", generator.randint(1, 30))
+            )
+        else:
+            workload.append((kind, f"Technology {index}"))
+    return workload
+
+
+def run(
+    workload: list[tuple],
+    page: Callable[..., str],
+    chapter: Callable[..., str],
+    technology: Callable[..., str],
+) -> dict:
+    stub = PrefixCachingStub()
+    builders = {"page": page, "chapter": chapter, "tech": technology}
+
+    started = time.perf_counter()
+    latencies = sorted(
+        stub.first_token_ms(builders[kind](*arguments)) for kind, *arguments in workload
+    )
+    elapsed = time.perf_counter() - started
+
+    return {
+        "hit_rate": stub.cached_tokens / stub.prompt_tokens,
+        "prompt_tokens": stub.prompt_tokens / len(workload),
+        "billed_tokens": stub.billed_tokens / len(workload),
+        "ttft_p50_ms": latencies[len(latencies) // 2],
+        "ttft_p95_ms": latencies[int(len(latencies) * 0.95)],
+        "build_seconds": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare provider prefix cache hits of legacy and templated prompts"
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--prefix-tokens",
+        type=int,
+        default=1100,
+        help="also simulate the templates with the prefix padded to this size",
+    )
+    arguments = parser.parse_args()
+
+    workload = build_workload(arguments.requests, arguments.seed)
+    results = {
+        "before": run(
+            workload,
+            legacy_page_prompt,
+            legacy_chapter_prompt,
+            legacy_technology_prompt,
+        ),
+        "after": run(
+            workload,
+            templated_page_prompt,
+            templated_chapter_prompt,
+            templated_technology_prompt,
+        ),
+        f"after, {arguments.prefix_tokens}-token prefix": run(
+            workload,
+            with_prefix_tokens(templated_page_prompt, arguments.prefix_tokens),
+            with_prefix_tokens(templated_chapter_prompt, arguments.prefix_tokens),
+            with_prefix_tokens(templated_technology_prompt, arguments.prefix_tokens),
+        ),
+    }
+
+    for template in (PAGE_TEMPLATE, CHAPTER_TEMPLATE, TECHNOLOGY_TEMPLATE):
+        tokens = len(template.prefix) // CHARS_PER_TOKEN
+        print(f"{template.key} prefix: about {tokens} tokens")
+
+    for name, result in results.items():
+        print(
+            f"{name}: cached prefix hit rate {result['hit_rate']:.1%} - "
+            f"{result['prompt_tokens']:.0f} prompt tokens, "
+            f"{result['billed_tokens']:.0f} billed - "
+            f"simulated TTFT p50 {result['ttft_p50_ms']:.0f}ms "
+            f"p95 {result['ttft_p95_ms']:.0f}ms "
+            f"({result['build_seconds'] * 1000:.1f}ms to run)"
+        )
+
+
+if __name__ == "__main__":
+    main()
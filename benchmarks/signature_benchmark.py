@@ -0,0 +1,87 @@
+import argparse
+import hashlib
+import hmac
+import os
+import time
+from urllib.parse import urlencode
+from src.slack_helper import SignatureVerifier
+
+SECRET = "8f742231b10e8888abcd99yyyzzz85a5"
+
+
+def legacy_verify_slack_request(
+    timestamp: str, slack_signature: str, body: bytes
+) -> bool:
+    if not timestamp or not slack_signature:
+        return False
+
+    if abs(time.time() - int(timestamp)) > 60 * 5:
+        return False
+
+    basestring = f"v0:{timestamp}:{body.decode('utf-8')}"
+
+    expected_signature = (
+        "v0="
+        + hmac.new(
+            os.getenv("BENCHMARK_SIGNING_SECRET", SECRET).encode(),
+            basestring.encode(),
+            hashlib.sha256,
+        ).hexdigest()
+    )
+
+    return hmac.compare_digest(expected_signature, slack_signature)
+
+
+def build_requests(count: int, body_bytes: int) -> list[tuple[str, str, bytes]]:
+    requests = []
+    now = int(time.time())
+    for index in range(count):
+        timestamp = str(now - index % 120)
+        body = urlencode(
+            {
+                "command": "/usage",
+                "text": "x" * body_bytes,
+                "trigger_id": f"{index}.{now}",
+            }
+        ).encode()
+        signature = hmac.new(
+            SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256
+        ).hexdigest()
+        requests.append((timestamp, f"v0={signature}", body))
+    return requests
+
+
+def measure(verify, requests: list[tuple[str, str, bytes]]) -> float:
+    started = time.perf_counter()
+    for request in requests:
+        if not verify(*request):
+            raise Exception("Benchmark request failed verification")
+    return (time.perf_counter() - started) / len(requests)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Signature verification cost per request at a given request rate"
+    )
+    parser.add_argument("--rps", type=int, default=1000)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--body-bytes", type=int, default=2048)
+    arguments = parser.parse_args()
+
+    os.environ.setdefault("BENCHMARK_SIGNING_SECRET", SECRET)
+    requests = build_requests(arguments.rps * arguments.seconds, arguments.body_bytes)
+    verifier = SignatureVerifier(SECRET, max_nonces=arguments.rps * 300)
+
+    for name, verify in [
+        ("decode/encode per request", legacy_verify_slack_request),
+        ("precomputed key over raw bytes + replay cache", verifier.verify),
+    ]:
+        cost = measure(verify, requests)
+        print(
+            f"{name}: {cost * 1_000_000:.1f}us per request - "
+            f"{cost * arguments.rps:.2%} of one core at {arguments.rps} rps"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import statistics
+import time
+from slack_sdk import WebClient
+from src.slack_helper import PooledWebClient
+from tests.slack_stand_in import SlackStandIn
+
+
+def measure(client: WebClient, messages: int) -> list[float]:
+    latencies = []
+    for index in range(messages):
+        started = time.perf_counter()
+        client.chat_postMessage(channel="C1", text=f"Message {index}")
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-message latency of a WebClient per call against the pooled client"
+    )
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument(
+        "--handshake-ms",
+        type=float,
+        default=10,
+        help="Simulated TCP + TLS setup cost paid once per new connection",
+    )
+    arguments = parser.parse_args()
+
+    stand_in = SlackStandIn(handshake_seconds=arguments.handshake_ms / 1000).start()
+    base_url = stand_in.base_url
+
+    pooled = PooledWebClient(token="xoxb-benchmark", base_url=base_url)
+    results = {
+        "client per call": [
+            latency
+            for _ in range(arguments.messages)
+            for latency in measure(
+                WebClient(token="xoxb-benchmark", base_url=base_url), 1
+            )
+        ],
+        "pooled client": measure(pooled, arguments.messages),
+    }
+    pooled.close()
+    stand_in.stop()
+
+    for name, latencies in results.items():
+        latencies.sort()
+        print(
+            f"{name}: {len(latencies)} posts - mean {statistics.mean(latencies):.2f}ms "
+            f"p50 {latencies[len(latencies) // 2]:.2f}ms "
+            f"p95 {latencies[int(len(latencies) * 0.95)]:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import re
+import time
+from src.slack_helper import _markdown_to_slackdown
+
+LEGACY_MARKDOWN_RULES = [
+    (r"^#{1,6}\s*(.+)$", r"*\1*"),
+    (r"\*\*(.+?)\*\*", r"*\1*"),
+]
+
+SECTION = """## Chapter overview
+The author explains **why habits compound** and how *small changes* matter.
+
+- First idea with `inline code` and a [link](https://example.com)
+- Second idea with **bold** and ~~struck~~ words
+  * Nested detail
+
+> A quote worth **remembering**
+
+```python
+## this is code, not a heading
+value = compute(**options)
+```
+
+"""
+
+
+EXTENDED_MARKDOWN_RULES = LEGACY_MARKDOWN_RULES + [
+    (r"(?<![*\w])\*(?!\s)([^*\n]+?)(?<!\s)\*(?![*\w])", r"_\1_"),
+    (r"__(.+?)__", r"*\1*"),
+    (r"~~(.+?)~~", r"~\1~"),
+    (r"\[([^\]\n]+)\]\(([^)\s]+)\)", r"<\2|\1>"),
+    (r"^(\s*)[-+]\s+", r"\1• "),
+]
+
+
+def legacy_markdown_to_slackdown(message: str) -> str:
+    for pattern, replacement in LEGACY_MARKDOWN_RULES:
+        message = re.sub(pattern, replacement, message, flags=re.MULTILINE)
+    return message
+
+
+def extended_markdown_to_slackdown(message: str) -> str:
+    for pattern, replacement in EXTENDED_MARKDOWN_RULES:
+        message = re.sub(pattern, replacement, message, flags=re.MULTILINE)
+    return message
+
+
+def build_summary(size: int) -> str:
+    return (SECTION * (size // len(SECTION) + 1))[:size]
+
+
+def measure(function, message: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function(message)
+    elapsed = time.perf_counter() - started
+    return len(message) * rounds / elapsed / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Throughput of the single-pass converter against the regex chain"
+    )
+    parser.add_argument("--size-kb", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=50)
+    arguments = parser.parse_args()
+
+    message = build_summary(arguments.size_kb * 1024)
+    for name, function in [
+        ("regex chain (headings, bold)", legacy_markdown_to_slackdown),
+        ("regex chain extended to the same syntax", extended_markdown_to_slackdown),
+        ("single pass (full syntax)", _markdown_to_slackdown),
+    ]:
+        throughput = measure(function, message, arguments.rounds)
+        print(f"{name}: {throughput:.1f} MB/s on {arguments.size_kb} KB summaries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import tempfile
+import time
+from tinydb import Query, TinyDB
+from src.metrics_helper import metrics
+from src.storage_helper import WriteBehindStorage
+
+
+def daily_run(db: TinyDB, path: str, books: int) -> tuple[float, int]:
+    written = 0
+    started = time.perf_counter()
+    for index in range(books):
+        db.upsert(
+            {"isbn": f"{index:013d}", "current_page": 42, "object_type": "book"},
+            Query().isbn == f"{index:013d}",
+        )
+        if isinstance(db.storage, WriteBehindStorage):
+            continue
+        written += os.path.getsize(path)
+    db.close()
+    elapsed = time.perf_counter() - started
+    return elapsed, written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Bytes written by a daily run of upserts with and without write-behind"
+    )
+    parser.add_argument("--books", type=int, nargs="+", default=[100, 1000, 2000])
+    parser.add_argument("--flush-writes", type=int, default=100)
+    parser.add_argument("--fsync", default="always")
+    arguments = parser.parse_args()
+
+    for books in arguments.books:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "json.json")
+            json_seconds, json_bytes = daily_run(TinyDB(path), path, books)
+
+            path = os.path.join(directory, "write_behind.json")
+            metrics.reset()
+            behind_seconds, _ = daily_run(
+                TinyDB(
+                    path,
+                    storage=WriteBehindStorage,
+                    max_pending_writes=arguments.flush_writes,
+                    fsync=arguments.fsync,
+                ),
+                path,
+                books,
+            )
+            flushes = metrics.samples["storage.flush_bytes"]
+            durations = metrics.samples["storage.flush_seconds"]
+
+        print(
+            f"{books} books: JSONStorage {json_bytes / 1024 / 1024:.1f} MB in {json_seconds:.2f}s - "
+            f"write-behind {sum(flushes) / 1024 / 1024:.1f} MB in {len(flushes)} flushes "
+            f"(max {max(flushes) / 1024:.0f} KB, {max(durations) * 1000:.1f}ms) in {behind_seconds:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,30 @@
 import traceback
 import asyncio
+from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
-import schedule
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from src.db_helper import load_jobs, reset_jobs
+from fastapi.responses import JSONResponse, Response
+from src.batch_helper import OpenAIBatchBackend, schedule_batch_jobs
+from src.db_helper import (
+    close_db,
+    load_jobs,
+    reset_jobs,
+    run_db_call,
+    schedule_progress_compaction,
+)
+from src.delivery_helper import schedule_delivery_jobs
+from src.schedule_helper import run_pending_jobs
+from src.prefetch_helper import schedule_prefetch_jobs
 from src.main import (
     handle_list_command,
     handle_readme_command,
+    handle_stats_command,
     handle_tips_command,
     handle_run_command,
+    handle_usage_command,
 )
-from src.slack_helper import verify_slack_request
+from src.slack_helper import close_slack_client, verify_slack_request
+from src.warmup_helper import warm_up
 import os
 import logging
 from dotenv import load_dotenv
@@ -20,19 +33,33 @@ load_dotenv()
 
 logger = logging.getLogger("daily_learner")
 debug_mode = os.getenv("DEBUG_MODE", "false") == "true"
+batch_mode = os.getenv("BATCH_MODE", "false") == "true"
+startup_warmup = os.getenv("STARTUP_WARMUP", "true") == "true"
 
 
 async def scheduler_loop():
     logger.info("Loading jobs...")
-    load_jobs()
+    await run_db_call(load_jobs)
+    schedule_prefetch_jobs()
+    schedule_delivery_jobs()
+    schedule_progress_compaction()
+    if batch_mode:
+        logger.info("Batch mode enabled, scheduling offline generation")
+        schedule_batch_jobs(OpenAIBatchBackend())
     while True:
         logger.info("Checking pending...")
-        schedule.run_pending()
+        try:
+            await run_pending_jobs()
+        except Exception:
+            logger.warning(f"A scheduled job failed: {traceback.format_exc()}")
         await asyncio.sleep(60)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if startup_warmup:
+        logger.info("Warming up before starting the scheduler...")
+        await warm_up()
     task = asyncio.create_task(scheduler_loop())
     yield
     task.cancel()
@@ -40,13 +67,20 @@ async def lifespan(app: FastAPI):
         await task
     except asyncio.CancelledError:
         pass
+    close_slack_client()
+    close_db()
 
 
 app = FastAPI(lifespan=lifespan)
 
 
-@app.post("/slack/hello")
-async def slack_hello(request: Request) -> JSONResponse:
+@app.middleware("http")
+async def verify_slack_signature(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    if not request.url.path.startswith("/slack/"):
+        return await call_next(request)
+
     timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
     slack_signature = request.headers.get("X-Slack-Signature", "")
     body = await request.body()
@@ -54,23 +88,21 @@ async def slack_hello(request: Request) -> JSONResponse:
     if not verify_slack_request(timestamp, slack_signature, body) and not debug_mode:
         logger.warning("Accessing the endpoint without the proper authorization")
         return JSONResponse(status_code=403, content={"error": "Unsupported command"})
+
+    return await call_next(request)
+
+
+@app.post("/slack/hello")
+async def slack_hello(request: Request) -> JSONResponse:
     logger.info("Succesful Hello, sending back response")
     return JSONResponse(content={"response_type": "in_channel", "text": "Hello!"})
 
 
 @app.post("/slack/reset_schedule")
 async def reset_schedule(request: Request) -> JSONResponse:
-    timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
-    slack_signature = request.headers.get("X-Slack-Signature", "")
-    body = await request.body()
-
-    if not verify_slack_request(timestamp, slack_signature, body) and not debug_mode:
-        logger.warning("Accessing the endpoint without the proper authorization")
-        return JSONResponse(status_code=403, content={"error": "Unsupported command"})
-
     logger.info("Reseting jobs...")
 
-    reset_jobs()
+    await run_db_call(reset_jobs)
 
     logger.info("Job reseted succesfully")
 
@@ -81,14 +113,6 @@ async def reset_schedule(request: Request) -> JSONResponse:
 
 @app.post("/slack/events", response_model=None)
 async def slack_events(request: Request) -> JSONResponse | None:
-    timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
-    slack_signature = request.headers.get("X-Slack-Signature", "")
-    body = await request.body()
-
-    if not verify_slack_request(timestamp, slack_signature, body) and not debug_mode:
-        logger.warning("Accessing the endpoint without the proper authorization")
-        return JSONResponse(status_code=403, content={"error": "Unsupported command"})
-
     logger.info("Processing slack/events..")
 
     form = await request.form()
@@ -97,7 +121,7 @@ async def slack_events(request: Request) -> JSONResponse | None:
 
     logger.info(f"Checking command for {command=} and {text=}")
 
-    if command not in ["/readme", "/list", "/tips", "/run"]:
+    if command not in ["/readme", "/list", "/tips", "/run", "/stats", "/usage"]:
         logger.warning("Accessing the endpoint with a unavailable command")
         return JSONResponse(
             content={
@@ -119,7 +143,7 @@ async def slack_events(request: Request) -> JSONResponse | None:
         try:
             logger.info("Handling readme command..")
 
-            result = handle_readme_command(text)
+            result = await run_db_call(handle_readme_command, text)
 
             logger.info("Handling readme succesful, sending response..")
 
@@ -143,7 +167,7 @@ async def slack_events(request: Request) -> JSONResponse | None:
         try:
             logger.info("Handle list command")
 
-            result = handle_list_command()
+            result = await run_db_call(handle_list_command)
 
             logger.info("List command succesful, sending response...")
 
@@ -167,7 +191,7 @@ async def slack_events(request: Request) -> JSONResponse | None:
         try:
             logger.info("Handle tips command")
 
-            result = handle_tips_command(technology_name=text)
+            result = await run_db_call(handle_tips_command, technology_name=text)
 
             logger.info("Tips command succesful, sending response...")
 
@@ -211,3 +235,51 @@ async def slack_events(request: Request) -> JSONResponse | None:
                     "text": f"Oh oh! An error occured - {str(exception)}",
                 }
             )
+    if command == "/stats":
+        try:
+            logger.info("Handle stats command")
+
+            result = handle_stats_command()
+
+            logger.info("Stats command succesful, sending response...")
+
+            return JSONResponse(
+                content={
+                    "response_type": "in_channel",
+                    "text": result,
+                }
+            )
+        except Exception as exception:
+            logger.warning(
+                f"An error occured when processing stats command: {traceback.format_exc()}"
+            )
+            return JSONResponse(
+                content={
+                    "response_type": "in_channel",
+                    "text": f"Oh oh! An error occured - {str(exception)}",
+                }
+            )
+    if command == "/usage":
+        try:
+            logger.info("Handle usage command")
+
+            result = handle_usage_command(text)
+
+            logger.info("Usage command succesful, sending response...")
+
+            return JSONResponse(
+                content={
+                    "response_type": "in_channel",
+                    "text": result,
+                }
+            )
+        except Exception as exception:
+            logger.warning(
+                f"An error occured when processing usage command: {traceback.format_exc()}"
+            )
+            return JSONResponse(
+                content={
+                    "response_type": "in_channel",
+                    "text": f"Oh oh! An error occured - {str(exception)}",
+                }
+            )
@@ -1,20 +1,145 @@
+import asyncio
+import contextvars
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import os
+import time
 from typing import TYPE_CHECKING
-from openai import Client, OpenAI
+from weakref import WeakKeyDictionary
+from openai import AsyncClient, AsyncOpenAI, Client, OpenAI
 from dotenv import load_dotenv
+from src.cache_helper import SummaryCache, summary_cache
+from src.metrics_helper import metrics
+from src.prompt_helper import (
+    CHAPTER_TEMPLATE,
+    MERGE_TEMPLATE,
+    PAGE_TEMPLATE,
+    TECHNOLOGY_TEMPLATE,
+)
+from src.rate_limit_helper import PromptLimiter, estimate_tokens
+from src.resilience_helper import call_with_resilience, call_with_resilience_async
+from src.router_helper import model_router
+from src.usage_helper import usage_store
 import logging
 
 logger = logging.getLogger("daily_learner")
 
 if TYPE_CHECKING:
-    from tests.test_utils import TestClient
+    from tests.test_utils import AsyncTestClient, TestClient
 
 
 load_dotenv()
 
+_async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = (
+    WeakKeyDictionary()
+)
+
 
 def get_summary_for_book_by_page(
     title: str, author: str, target_page: int, current_page: int
 ) -> str:
+    model = model_router.choose("page")
+    key, prompt = build_page_request(title, author, target_page, current_page, model)
+    if cached_summary := summary_cache.get(key):
+        return cached_summary
+
+    if target_page - current_page > _map_reduce_pages():
+        return _store(
+            key,
+            _map_reduce_pages_summary(title, author, target_page, current_page, model),
+        )
+
+    return _store(key, _send_prompt(prompt=prompt, kind="page", model=model))
+
+
+def get_summary_for_book_by_chapter(
+    title: str, author: str, current_chapter: int
+) -> str:
+    model = model_router.choose("chapter")
+    key, prompt = build_chapter_request(title, author, current_chapter, model)
+    if cached_summary := summary_cache.get(key):
+        return cached_summary
+
+    return _store(key, _send_prompt(prompt=prompt, kind="chapter", model=model))
+
+
+def get_summary_for_technology(technology_name: str) -> str:
+    model = model_router.choose("tech")
+    key, prompt = build_technology_request(technology_name, model=model)
+    if cached_summary := summary_cache.get(key):
+        return cached_summary
+
+    return _store(key, _send_prompt(prompt=prompt, kind="tech", model=model))
+
+
+async def get_summary_for_book_by_page_async(
+    title: str,
+    author: str,
+    target_page: int,
+    current_page: int,
+    limiter: PromptLimiter,
+) -> str:
+    model = model_router.choose("page")
+    key, prompt = build_page_request(title, author, target_page, current_page, model)
+    if cached_summary := summary_cache.get(key):
+        return cached_summary
+
+    if target_page - current_page > _map_reduce_pages():
+        return _store(
+            key,
+            await _map_reduce_pages_summary_async(
+                title, author, target_page, current_page, limiter, model
+            ),
+        )
+
+    return _store(
+        key,
+        await _send_prompt_async(
+            prompt=prompt, limiter=limiter, kind="page", model=model
+        ),
+    )
+
+
+async def get_summary_for_book_by_chapter_async(
+    title: str, author: str, current_chapter: int, limiter: PromptLimiter
+) -> str:
+    model = model_router.choose("chapter")
+    key, prompt = build_chapter_request(title, author, current_chapter, model)
+    if cached_summary := summary_cache.get(key):
+        return cached_summary
+
+    return _store(
+        key,
+        await _send_prompt_async(
+            prompt=prompt, limiter=limiter, kind="chapter", model=model
+        ),
+    )
+
+
+async def get_summary_for_technology_async(
+    technology_name: str, limiter: PromptLimiter
+) -> str:
+    model = model_router.choose("tech")
+    key, prompt = build_technology_request(technology_name, model=model)
+    if cached_summary := summary_cache.get(key):
+        return cached_summary
+
+    return _store(
+        key,
+        await _send_prompt_async(
+            prompt=prompt, limiter=limiter, kind="tech", model=model
+        ),
+    )
+
+
+def build_page_request(
+    title: str,
+    author: str,
+    target_page: int,
+    current_page: int,
+    model: str | None = None,
+) -> tuple[str, str]:
     logger.info("Getting summary for book by page")
 
     if not title or target_page <= 0 or current_page > target_page:
@@ -24,14 +149,162 @@ def get_summary_for_book_by_page(
 
     logger.info(f"Getting summary by page for {title=}")
 
-    prompt = f"Please make a summary of the pages {current_page} to {target_page} for the book {title} by {author} - This summary can be detailed, it should be able to be read in under five minutes - Please refrain from using emojis etc.. Only use headings if necessary, highlight the important words, phrases. Also I want your answer to ONLY CONTAIN THE SUMMARY, nothing else no hello or bye or question JUST the summary"
+    prompt = PAGE_TEMPLATE.render(
+        title=title, author=author, current_page=current_page, target_page=target_page
+    )
 
-    return _send_prompt(prompt=prompt)
+    return page_cache_key(
+        title, author, current_page, target_page, model or model_router.choose("page")
+    ), prompt
 
 
-def get_summary_for_book_by_chapter(
-    title: str, author: str, current_chapter: int
+def build_merge_prompt(
+    title: str, author: str, target_page: int, current_page: int, partials: list[str]
 ) -> str:
+    logger.info(f"Merging {len(partials)} partial summaries for {title=}")
+
+    joined_partials = "\n\n".join(
+        f"Part {index}:\n{partial}" for index, partial in enumerate(partials, 1)
+    )
+
+    return MERGE_TEMPLATE.render(
+        count=len(partials),
+        title=title,
+        author=author,
+        current_page=current_page,
+        target_page=target_page,
+        partials=joined_partials,
+    )
+
+
+def split_page_range(
+    current_page: int, target_page: int, max_pages: int
+) -> list[tuple[int, int]]:
+    if max_pages <= 0:
+        raise Exception(f"Invalid split size given {max_pages=}")
+
+    # Page ranges are inclusive, so each range starts after the previous end
+    ranges = []
+    start = current_page
+    while start <= target_page:
+        end = min(start + max_pages, target_page)
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def build_page_requests(
+    title: str,
+    author: str,
+    target_page: int,
+    current_page: int,
+    model: str | None = None,
+) -> list[tuple[str, str]]:
+    if target_page - current_page <= _map_reduce_pages():
+        return [build_page_request(title, author, target_page, current_page, model)]
+
+    return [
+        build_page_request(title, author, end, start, model)
+        for start, end in split_page_range(
+            current_page, target_page, _map_reduce_pages()
+        )
+    ]
+
+
+def build_streamed_page_request(
+    title: str, author: str, target_page: int, current_page: int, model: str
+) -> tuple[str, str]:
+    key, prompt = build_page_request(title, author, target_page, current_page, model)
+    if target_page - current_page <= _map_reduce_pages() or summary_cache.get(key):
+        return key, prompt
+
+    # Only the merge is streamed, the page ranges are summarized beforehand
+    partials = _map_page_ranges(title, author, target_page, current_page)
+    return key, build_merge_prompt(title, author, target_page, current_page, partials)
+
+
+def _map_reduce_pages() -> int:
+    return int(os.getenv("AI_MAP_REDUCE_PAGES", 30))
+
+
+def _map_page_ranges(
+    title: str, author: str, target_page: int, current_page: int
+) -> list[str]:
+    ranges = split_page_range(current_page, target_page, _map_reduce_pages())
+    logger.info(f"Map-reduce summary of {title=} over {len(ranges)} page ranges")
+
+    started = time.perf_counter()
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(
+        max_workers=int(os.getenv("AI_MAX_CONCURRENCY", 8)),
+        thread_name_prefix="Map page range",
+    ) as executor:
+        partials = list(
+            executor.map(
+                lambda pages: context.copy().run(
+                    get_summary_for_book_by_page, title, author, pages[1], pages[0]
+                ),
+                ranges,
+            )
+        )
+    metrics.observe("map_reduce.map_seconds", time.perf_counter() - started)
+
+    return partials
+
+
+def _map_reduce_pages_summary(
+    title: str, author: str, target_page: int, current_page: int, model: str
+) -> str:
+    partials = _map_page_ranges(title, author, target_page, current_page)
+
+    started = time.perf_counter()
+    summary = _send_prompt(
+        prompt=build_merge_prompt(title, author, target_page, current_page, partials),
+        kind="page",
+        model=model,
+    )
+    metrics.observe("map_reduce.reduce_seconds", time.perf_counter() - started)
+
+    return summary
+
+
+async def _map_reduce_pages_summary_async(
+    title: str,
+    author: str,
+    target_page: int,
+    current_page: int,
+    limiter: PromptLimiter,
+    model: str,
+) -> str:
+    ranges = split_page_range(current_page, target_page, _map_reduce_pages())
+    logger.info(f"Map-reduce summary of {title=} over {len(ranges)} page ranges")
+
+    started = time.perf_counter()
+    partials = await asyncio.gather(
+        *(
+            get_summary_for_book_by_page_async(title, author, end, start, limiter)
+            for start, end in ranges
+        )
+    )
+    metrics.observe("map_reduce.map_seconds", time.perf_counter() - started)
+
+    started = time.perf_counter()
+    summary = await _send_prompt_async(
+        prompt=build_merge_prompt(
+            title, author, target_page, current_page, list(partials)
+        ),
+        limiter=limiter,
+        kind="page",
+        model=model,
+    )
+    metrics.observe("map_reduce.reduce_seconds", time.perf_counter() - started)
+
+    return summary
+
+
+def build_chapter_request(
+    title: str, author: str, current_chapter: int, model: str | None = None
+) -> tuple[str, str]:
     if not title or current_chapter < 0:
         raise Exception(
             f"Invalid value was given, aborting before sending request - Book name {title} - Current chapter {current_chapter}"
@@ -39,12 +312,18 @@ def get_summary_for_book_by_chapter(
 
     logger.info(f"Getting summary by chapter for {title=}")
 
-    prompt = f"Please make a summary of the chapter {current_chapter} of the book {title} by {author} - This summary should be detailed, it should be able to be read in under five minutes - Please refrain from using emojis etc.. use slack-flavored markdown for headers and highlighting the important words, phrases. Also I want your answer to ONLY CONTAIN THE SUMMARY, nothing else no hello or bye or question JUST the summary"
+    prompt = CHAPTER_TEMPLATE.render(
+        title=title, author=author, current_chapter=current_chapter
+    )
 
-    return _send_prompt(prompt=prompt)
+    return chapter_cache_key(
+        title, author, current_chapter, model or model_router.choose("chapter")
+    ), prompt
 
 
-def get_summary_for_technology(technology_name: str) -> str:
+def build_technology_request(
+    technology_name: str, day: date | None = None, model: str | None = None
+) -> tuple[str, str]:
     if not technology_name:
         raise Exception(
             f"Invalid value was given, aborting before send request {technology_name=}"
@@ -52,19 +331,177 @@ def get_summary_for_technology(technology_name: str) -> str:
 
     logger.info(f"Getting tips for {technology_name=}")
 
-    prompt = f"Please give me a tip or trick for using technology: {technology_name} - This tip or trick should be detailed with code example when necessary, Please refrain from using emojis etc.. use slack-flavored markdown for headers and highlighting the importan words, phrases. Also I want you answer to ONLY CONTAIN THE TIPS OR TRICKS, nothing else no hello or by or question JUST the tip"
+    prompt = TECHNOLOGY_TEMPLATE.render(technology_name=technology_name)
 
-    return _send_prompt(prompt=prompt)
+    return technology_cache_key(
+        technology_name, day or date.today(), model or model_router.choose("tech")
+    ), prompt
 
 
-def _send_prompt(prompt: str, client: "None | TestClient | Client" = None) -> str:
-    client = client or OpenAI()
+def page_cache_key(
+    title: str, author: str, current_page: int, target_page: int, model: str
+) -> str:
+    return SummaryCache.build_key(
+        "page",
+        title,
+        author,
+        f"{current_page}-{target_page}",
+        PAGE_TEMPLATE.key,
+        model,
+    )
+
+
+def chapter_cache_key(title: str, author: str, current_chapter: int, model: str) -> str:
+    return SummaryCache.build_key(
+        "chapter",
+        title,
+        author,
+        current_chapter,
+        CHAPTER_TEMPLATE.key,
+        model,
+    )
+
+
+def technology_cache_key(technology_name: str, day: date, model: str) -> str:
+    return SummaryCache.build_key(
+        "tech",
+        technology_name,
+        day.isoformat(),
+        TECHNOLOGY_TEMPLATE.key,
+        model,
+    )
+
+
+def _store(key: str, summary: str) -> str:
+    if summary:
+        summary_cache.set(key, summary)
+    return summary
+
+
+def _send_prompt(
+    prompt: str,
+    client: "None | TestClient | Client" = None,
+    kind: str = "default",
+    model: str | None = None,
+) -> str:
+    client = client or OpenAI(max_retries=0)
 
     if not prompt:
         raise Exception("Empty prompt was given, aborting before sending request")
 
-    logger.info("Sending prompt to AI model")
+    model = model or model_router.choose(kind)
+    logger.info(f"Sending prompt to AI model {model}")
 
-    response = client.responses.create(model="gpt-4o-mini", input=prompt)
+    started = time.perf_counter()
+    with model_router.track(model):
+        response = call_with_resilience(
+            lambda timeout: client.responses.create(
+                model=model, input=prompt, timeout=timeout
+            )
+        )
+    _record_usage(kind, model, response, started)
 
     return response.output_text
+
+
+def stream_summary(
+    key: str,
+    prompt: str,
+    client: "None | TestClient | Client" = None,
+    kind: str = "default",
+    model: str | None = None,
+) -> Iterator[str]:
+    if cached_summary := summary_cache.get(key):
+        yield cached_summary
+        return
+
+    chunks = []
+    for delta in _stream_prompt(prompt=prompt, client=client, kind=kind, model=model):
+        chunks.append(delta)
+        yield delta
+
+    _store(key, "".join(chunks))
+
+
+def _stream_prompt(
+    prompt: str,
+    client: "None | TestClient | Client" = None,
+    kind: str = "default",
+    model: str | None = None,
+) -> Iterator[str]:
+    client = client or OpenAI(max_retries=0)
+
+    if not prompt:
+        raise Exception("Empty prompt was given, aborting before sending request")
+
+    model = model or model_router.choose(kind)
+    logger.info(f"Streaming prompt to AI model {model}")
+
+    started = time.perf_counter()
+    with model_router.track(model):
+        stream = call_with_resilience(
+            lambda timeout: client.responses.create(
+                model=model, input=prompt, stream=True, timeout=timeout
+            )
+        )
+
+    for event in stream:
+        if event.type == "response.output_text.delta":
+            yield event.delta
+        if event.type == "response.completed":
+            _record_usage(kind, model, event.response, started)
+
+
+def get_async_client() -> AsyncClient:
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        logger.info("Creating shared async AI client for the running event loop")
+        _async_clients[loop] = AsyncOpenAI(max_retries=0)
+    return _async_clients[loop]
+
+
+async def close_async_client() -> None:
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        logger.info("Closing the async AI client of the running event loop")
+        await client.close()
+
+
+async def _send_prompt_async(
+    prompt: str,
+    limiter: PromptLimiter,
+    client: "None | AsyncTestClient | AsyncClient" = None,
+    kind: str = "default",
+    model: str | None = None,
+) -> str:
+    if not prompt:
+        raise Exception("Empty prompt was given, aborting before sending request")
+
+    client = client or get_async_client()
+
+    await limiter.reserve(estimate_tokens(prompt))
+
+    async with limiter.semaphore:
+        model = model or model_router.choose(kind)
+        logger.info(f"Sending prompt to AI model {model} asynchronously")
+        started = time.perf_counter()
+        with model_router.track(model):
+            response = await call_with_resilience_async(
+                lambda timeout: client.responses.create(
+                    model=model, input=prompt, timeout=timeout
+                )
+            )
+    _record_usage(kind, model, response, started)
+
+    return response.output_text
+
+
+def _record_usage(kind: str, model: str, response: object, started: float) -> None:
+    usage = getattr(response, "usage", None)
+    usage_store.record(
+        kind=kind,
+        model=model,
+        prompt_tokens=getattr(usage, "input_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "output_tokens", 0) or 0,
+        seconds=time.perf_counter() - started,
+    )
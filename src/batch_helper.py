@@ -0,0 +1,189 @@
+from datetime import date, timedelta
+from typing import Protocol
+import json
+import logging
+import os
+import schedule
+from dotenv import load_dotenv
+from openai import Client, OpenAI
+from src.cache_helper import summary_cache
+from src.domain import Book, State, Technology
+from src.router_helper import model_router
+from src.schedule_helper import maintenance_scheduler
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+BATCH_ENDPOINT = "/v1/responses"
+
+
+class BatchFailedError(Exception):
+    pass
+
+
+class BatchBackend(Protocol):
+    def submit(self, path: str) -> str: ...
+
+    def is_complete(self, batch_id: str) -> bool: ...
+
+    def results(self, batch_id: str) -> list[dict]: ...
+
+
+class OpenAIBatchBackend:
+    def __init__(self, client: Client | None = None) -> None:
+        self.client = client or OpenAI()
+
+    def submit(self, path: str) -> str:
+        logger.info(f"Uploading batch request file {path}")
+        with open(path, "rb") as file:
+            uploaded = self.client.files.create(file=file, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        logger.info(f"Batch {batch.id} submitted")
+        return batch.id
+
+    def is_complete(self, batch_id: str) -> bool:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in ["failed", "expired", "cancelled"]:
+            raise BatchFailedError(f"Batch {batch_id} ended with status {batch.status}")
+        return batch.status == "completed"
+
+    def results(self, batch_id: str) -> list[dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            raise BatchFailedError(f"Batch {batch_id} has no output file")
+        content = self.client.files.content(batch.output_file_id).text
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def collect_due_requests(day: date) -> list[dict]:
+    from src.main import build_daily_requests
+
+    logger.info(f"Collecting prompts due on {day.isoformat()}")
+    requests: dict[str, dict] = {}
+
+    for job in schedule.jobs:
+        object = job.job_func.args[0] if job.job_func and job.job_func.args else None
+        if not isinstance(object, (Book, Technology)):
+            continue
+        if isinstance(object, Book) and object.state == State.FINISHED:
+            continue
+
+        for key, prompt in build_daily_requests(object, day, model_router.primary):
+            requests[key] = {
+                "custom_id": key,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {"model": model_router.primary, "input": prompt},
+            }
+
+    return list(requests.values())
+
+
+def write_batch_file(requests: list[dict], path: str) -> str:
+    logger.info(f"Writing {len(requests)} batch requests to {path}")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        for request in requests:
+            file.write(json.dumps(request) + "\n")
+    return path
+
+
+def submit_daily_batch(backend: BatchBackend, day: date | None = None) -> str | None:
+    day = day or date.today() + timedelta(days=1)
+    requests = collect_due_requests(day)
+
+    if not requests:
+        logger.info("No prompts due, skipping batch submission")
+        return None
+
+    path = write_batch_file(requests, os.path.join(_batch_dir(), f"{day}.jsonl"))
+    batch_id = backend.submit(path)
+
+    pending = _load_pending()
+    pending.append(batch_id)
+    _save_pending(pending)
+
+    return batch_id
+
+
+def collect_daily_batch(backend: BatchBackend) -> int:
+    loaded = 0
+    pending = _load_pending()
+
+    for batch_id in list(pending):
+        try:
+            if not backend.is_complete(batch_id):
+                logger.info(f"Batch {batch_id} is still running")
+                continue
+
+            for result in backend.results(batch_id):
+                if summary := _extract_output_text(result):
+                    summary_cache.set(result["custom_id"], summary)
+                    loaded += 1
+                else:
+                    logger.warning(
+                        f"No summary in batch result {result.get('custom_id')}"
+                    )
+        except BatchFailedError as exception:
+            logger.warning(f"Dropping batch {batch_id}: {exception}")
+        except Exception as exception:
+            logger.warning(
+                f"Could not collect batch {batch_id}, will retry: {exception}"
+            )
+            continue
+
+        pending.remove(batch_id)
+        _save_pending(pending)
+
+    logger.info(f"Loaded {loaded} batch summaries into the summary cache")
+    return loaded
+
+
+def schedule_batch_jobs(backend: BatchBackend) -> None:
+    submit_time = os.getenv("BATCH_SUBMIT_TIME", "21:00")
+    logger.info(f"Scheduling batch submission at {submit_time}")
+
+    maintenance_scheduler.every().day.at(submit_time).do(submit_daily_batch, backend)
+    maintenance_scheduler.every(int(os.getenv("BATCH_POLL_MINUTES", 15))).minutes.do(
+        collect_daily_batch, backend
+    )
+
+
+def _extract_output_text(result: dict) -> str:
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        return ""
+
+    return "".join(
+        content.get("text", "")
+        for item in response.get("body", {}).get("output", [])
+        if item.get("type") == "message"
+        for content in item.get("content", [])
+        if content.get("type") == "output_text"
+    )
+
+
+def _batch_dir() -> str:
+    return os.getenv("BATCH_DIR", ".batches")
+
+
+def _load_pending() -> list[str]:
+    path = os.path.join(_batch_dir(), "pending.json")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _save_pending(pending: list[str]) -> None:
+    os.makedirs(_batch_dir(), exist_ok=True)
+    path = os.path.join(_batch_dir(), "pending.json")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(pending, file)
+    os.replace(f"{path}.tmp", path)
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from dotenv import load_dotenv
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+
+class SummaryCache:
+    def __init__(self, directory: str, max_entries: int, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._disk_bytes: int | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build_key(*parts: object) -> str:
+        normalized = [" ".join(str(part).split()).lower() for part in parts]
+        return hashlib.sha256("\x1f".join(normalized).encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            if key in self._memory:
+                logger.info(f"Summary cache memory hit for {key=}")
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, encoding="utf-8") as file:
+                    summary = file.read()
+                os.utime(path)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+
+            logger.info(f"Summary cache disk hit for {key=}")
+            self._remember(key, summary)
+            self.hits += 1
+            return summary
+
+    def set(self, key: str, summary: str) -> None:
+        if not summary:
+            raise Exception(f"Empty summary given for {key=}")
+
+        with self._lock:
+            self._remember(key, summary)
+            self._write(key, summary)
+
+    def clear(self) -> None:
+        logger.info("Clearing summary cache")
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+            for path in self._disk_entries():
+                os.remove(path)
+            self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes or 0,
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def _remember(self, key: str, summary: str) -> None:
+        self._memory[key] = summary
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _write(self, key: str, summary: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.write(summary)
+        os.replace(temporary_path, path)
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(os.path.getsize(p) for p in self._disk_entries())
+        else:
+            self._disk_bytes += os.path.getsize(path) - previous_size
+
+        if self._disk_bytes > self.max_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        logger.info(f"Summary cache over {self.max_bytes} bytes, evicting from disk")
+        entries = sorted(self._disk_entries(), key=os.path.getmtime)
+        for path in entries:
+            if (self._disk_bytes or 0) <= self.max_bytes:
+                break
+            self._disk_bytes = (self._disk_bytes or 0) - os.path.getsize(path)
+            os.remove(path)
+
+    def _disk_entries(self) -> list[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".txt")
+        ]
+
+
+summary_cache = SummaryCache(
+    directory=os.getenv("SUMMARY_CACHE_DIR", ".summary_cache"),
+    max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 1024)),
+    max_bytes=int(os.getenv("SUMMARY_CACHE_MAX_BYTES", 50 * 1024 * 1024)),
+)
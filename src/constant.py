@@ -1,12 +1,20 @@
-HEADING_MARKDOWN_REGEX = r"^#{1,6}\s*(.+)$"
-BOLD_MARKDOWN_REGEX = r"\*\*(.+?)\*\*"
+FENCE_MARKDOWN_REGEX = r"^[ \t]*(```|~~~)[^\n]*$"
+MARKDOWN_TOKEN_REGEX = (
+    r"\n(?:(?P<heading_indent>[ \t]*)#{1,6}[ \t]*(?P<heading>[^\n]*[^\s#])[ \t#]*(?=\n|\Z)"
+    r"|(?P<bullet>[ \t]*)[-*+][ \t]+)"
+    r"|`(?P<code>[^`\n]+)`"
+    r"|\[(?P<link_text>[^\]\n]+)\]\((?P<link_url>[^)\s]+)\)"
+    r"|\*\*\*(?P<bold_italic>[^*\s](?:[^*\n]*?[^*\s])?)\*\*\*"
+    r"|\*\*(?P<bold>[^*\n]+?)\*\*"
+    r"|__(?<!\w__)(?P<underscore_bold>(?=[^_\n]*[^\w\n])[^_\s](?:[^_\n]*?[^_\s])?)__(?!\w)"
+    r"|~~(?P<strike>[^~\n]+?)~~"
+    r"|\*(?<![*\w]\*)(?P<italic>[^*\s](?:[^*\n]*?[^*\s])?)\*(?![*\w])"
+)
 
-BOLD_SLACK_REGEX = r"*\1*"
+SLACK_BULLET = "•"
 
+DEFAULT_SCHEDULE_TIME = "09:30"
 
-MARKDOWN_RULES = [
-    (HEADING_MARKDOWN_REGEX, BOLD_SLACK_REGEX),
-    (BOLD_MARKDOWN_REGEX, BOLD_SLACK_REGEX),
-]
+DEFAULT_AI_MODEL = "gpt-4o-mini"
 
-DEFAULT_SCHEDULE_TIME = "09:30"
+STREAMING_PLACEHOLDER = "_Generating summary..._"
@@ -1,26 +1,77 @@
-from tinydb import TinyDB, Query
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import threading
+from tinydb import TinyDB
 import os
-from src.schedule_helper import schedule_jobs
+import time
+from src.journal_helper import PROGRESS_FIELDS, ProgressJournal
+from src.lock_helper import LockedRepository
+from src.metrics_helper import metrics
+from src.schedule_helper import maintenance_scheduler, schedule_many
 from src.domain import Book, Technology
+from src.repository_helper import SQLITE_SCHEME, IndexedRepository, SqliteRepository
+from src.storage_helper import WriteBehindStorage
 import schedule
 import logging
 
 logger = logging.getLogger("daily_learner")
 
-db = TinyDB(os.getenv("DB_NAME", "books.json"))
-jobs_db = TinyDB(os.getenv("JOBS_DB_NAME", "jobs.json"))
+
+def _open_db(path: str) -> TinyDB:
+    return TinyDB(
+        path,
+        storage=WriteBehindStorage,
+        max_pending_writes=int(os.getenv("DB_FLUSH_WRITES", 100)),
+        flush_interval=float(os.getenv("DB_FLUSH_SECONDS", 5)),
+        fsync=os.getenv("DB_FSYNC", "always"),
+    )
+
+
+def open_repository(name: str) -> LockedRepository:
+    flush_writes = os.getenv("DB_MULTI_PROCESS", "false") == "true"
+    if name.startswith(SQLITE_SCHEME):
+        logger.info(f"Using the SQLite backend for {name}")
+        path = name.removeprefix(SQLITE_SCHEME)
+        return LockedRepository(SqliteRepository(path), path, flush_writes)
+    return LockedRepository(IndexedRepository(_open_db(name), name), name, flush_writes)
+
+
+repository = open_repository(os.getenv("DB_NAME", "books.json"))
+jobs_repository = open_repository(os.getenv("JOBS_DB_NAME", "jobs.json"))
+progress_journal = ProgressJournal.from_env()
+
+_db_executor: ThreadPoolExecutor | None = None
+_db_executor_lock = threading.Lock()
+
+
+async def run_db_call(function: Callable, *args, **kwargs):
+    global _db_executor
+
+    with _db_executor_lock:
+        if _db_executor is None:
+            _db_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("DB_MAX_WORKERS", 4)),
+                thread_name_prefix="Document store",
+            )
+
+    return await asyncio.get_running_loop().run_in_executor(
+        _db_executor, partial(function, *args, **kwargs)
+    )
 
 
 def load_books() -> list[Book]:
     logger.info("Loading all books from database")
-    return [Book.from_json(row) for row in db.search(Query().object_type == "book")]
+    return [
+        Book.from_json(progress_journal.apply(row))
+        for row in repository.of_type("book")
+    ]
 
 
 def load_technologies() -> list[Technology]:
     logger.info("Loading all technologies from database")
-    return [
-        Technology.from_json(row) for row in db.search(Query().object_type == "tech")
-    ]
+    return [Technology.from_json(row) for row in repository.of_type("tech")]
 
 
 def load_book_by_isbn(isbn: str) -> Book | None:
@@ -29,13 +80,13 @@ def load_book_by_isbn(isbn: str) -> Book | None:
 
     logger.info(f"Loading book by {isbn=}")
 
-    book = db.search((Query().isbn == isbn) & (Query().object_type == "book"))
+    book = repository.find("isbn", isbn)
 
-    if not book:
+    if not book or book.get("object_type") != "book":
         logger.info(f"Book with{isbn=} does not exist in the database")
         return None
 
-    return Book.from_json(book[0])
+    return Book.from_json(progress_journal.apply(book))
 
 
 def write_book_to_db(book: dict) -> None:
@@ -44,7 +95,38 @@ def write_book_to_db(book: dict) -> None:
 
     logger.info(f"Writing book {book.get('title', 'Unknown')} to database")
 
-    db.upsert(book, Query().isbn == book.get("isbn"))
+    repository.upsert(book, "isbn")
+
+
+def record_progress(book: Book) -> None:
+    logger.info(f"Recording progress of {book.title} in the journal")
+    progress_journal.append(book)
+
+
+def compact_progress() -> int:
+    def snapshot(events: list[dict]) -> None:
+        for event in events:
+            if repository.find("isbn", event["isbn"]) is None:
+                logger.warning(f"Dropping progress of unknown book {event['isbn']}")
+                continue
+            repository.upsert(
+                {
+                    "isbn": event["isbn"],
+                    **{field: event[field] for field in PROGRESS_FIELDS},
+                },
+                "isbn",
+            )
+        repository.flush()
+
+    logger.info("Compacting the progress journal into the database")
+    with repository.write():
+        return progress_journal.compact(snapshot)
+
+
+def schedule_progress_compaction() -> None:
+    compact_minutes = int(os.getenv("PROGRESS_COMPACT_MINUTES", 60))
+    logger.info(f"Scheduling progress compaction every {compact_minutes} minutes")
+    maintenance_scheduler.every(compact_minutes).minutes.do(compact_progress)
 
 
 def write_technology_to_db(technology: dict) -> None:
@@ -53,7 +135,7 @@ def write_technology_to_db(technology: dict) -> None:
 
     logger.info(f"Writing technology {technology.get('name', 'Unknown')}")
 
-    db.upsert(technology, Query().name == technology.get("name"))
+    repository.upsert(technology, "name")
 
 
 def load_technology_by_name(technology_name: str) -> Technology | None:
@@ -62,51 +144,95 @@ def load_technology_by_name(technology_name: str) -> Technology | None:
 
     logger.info(f"Loading book by {technology_name=}")
 
-    technology = db.search(
-        (Query().name == technology_name) & (Query().object_type == "tech")
-    )
+    technology = repository.find("name", technology_name)
 
-    if not technology:
+    if not technology or technology.get("object_type") != "tech":
         logger.info(f"{technology_name=} does not exist in the database")
         return None
 
-    return Technology.from_json(technology[0])
+    return Technology.from_json(technology)
 
 
-def load_jobs() -> None:
+def load_jobs() -> int:
     logger.info("Loading jobs from database")
-    jobs = jobs_db.all()
-    for element in jobs:
+    started = time.perf_counter()
+
+    books: dict[str, dict] = {}
+    technologies: dict[str, dict] = {}
+    for document in repository.all():
+        if document.get("object_type") == "book" and document.get("isbn"):
+            books.setdefault(document["isbn"], document)
+        elif document.get("object_type") == "tech" and document.get("name"):
+            technologies.setdefault(document["name"], document)
+
+    subscriptions: list[Book | Technology] = []
+    dangling = 0
+    for element in jobs_repository.all():
         if isbn := element.get("isbn", None):
-            logger.info("Scheduling book job")
-            schedule_jobs(load_book_by_isbn(isbn=isbn))
+            document = books.get(isbn)
+            subscription = (
+                Book.from_json(progress_journal.apply(document)) if document else None
+            )
         elif name := element.get("name", None):
-            logger.info("Scheduling tech job")
-            schedule_jobs(load_technology_by_name(technology_name=name))
+            document = technologies.get(name)
+            subscription = Technology.from_json(document) if document else None
+        else:
+            subscription = None
+
+        if subscription is None:
+            logger.warning(
+                f"Skipping job {element}: nothing matches it in the database"
+            )
+            dangling += 1
+            continue
+        subscriptions.append(subscription)
 
+    scheduled = schedule_many(subscriptions)
+    elapsed = time.perf_counter() - started
+
+    logger.info(
+        f"Loaded {scheduled} jobs in {elapsed:.3f}s - skipped {dangling} dangling jobs"
+    )
+    metrics.increment("jobs.dangling", dangling)
+    metrics.observe("jobs.load_seconds", elapsed)
+    return scheduled
+
+
+def save_job(subscription: Book | Technology) -> None:
+    field, value = _job_key(subscription)
+    if not value:
+        raise Exception(f"Invalid job subscription given {subscription}")
+
+    logger.info(f"Saving job {field}={value} to database")
+    jobs_repository.upsert(
+        {field: value, "object_type": subscription.object_type.value}, field
+    )
+    # Registrations are rare, write them through instead of waiting for a flush
+    jobs_repository.flush()
 
-def save_jobs() -> None:
-    logger.info("Saving jobs to database")
-    jobs_db.truncate()
-    for job in schedule.jobs:
-        if isbn := getattr(job.job_func.args[0], "isbn", None):
-            logger.info(f"Saving book {isbn=}job to database")
-            jobs_db.insert(
-                {
-                    "isbn": isbn,
-                }
-            )
-        elif name := getattr(job.job_func.args[0], "name", None):
-            logger.info(f"Saving technology {name=} job to database")
-            jobs_db.insert(
-                {
-                    "name": name,
-                }
-            )
+
+def _job_key(subscription: Book | Technology) -> tuple[str, str]:
+    if isinstance(subscription, Book):
+        return "isbn", subscription.isbn
+    return "name", subscription.name
 
 
 def reset_jobs() -> None:
     logger.info("Clearing schedule...")
     schedule.clear()
     logger.info("Clearing jobs DB")
-    jobs_db.truncate()
+    jobs_repository.truncate()
+
+
+def close_db() -> None:
+    global _db_executor
+
+    logger.info("Flushing and closing databases")
+    compact_progress()
+    repository.close()
+    jobs_repository.close()
+
+    with _db_executor_lock:
+        if _db_executor is not None:
+            _db_executor.shutdown(wait=False)
+        _db_executor = None
@@ -0,0 +1,266 @@
+from collections import defaultdict, deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import suppress
+from functools import partial
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+import uuid
+from dotenv import load_dotenv
+from src.metrics_helper import metrics
+from src.rate_limit_helper import TokenBucket
+from src.schedule_helper import maintenance_scheduler
+from src.slack_helper import (
+    SlackPermanentError,
+    SlackRateLimitedError,
+    send_slack_message,
+)
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+DEAD_LETTER_DIRECTORY = "dead_letter"
+
+
+class DeliveryQueue:
+    def __init__(
+        self,
+        directory: str,
+        channel_rate: float,
+        global_rate: float,
+        max_workers: int,
+        max_attempts: int,
+        sender: Callable[..., object] = partial(send_slack_message, structured=True),
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.directory = directory
+        self.channel_rate = channel_rate
+        self.global_bucket = TokenBucket(global_rate, max(global_rate, 1))
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.sender = sender
+        self.sleep = sleep
+        self._channel_buckets: dict[str, TokenBucket] = {}
+        self._pending: defaultdict[str, deque[dict]] = defaultdict(deque)
+        self._draining: set[str] = set()
+        self._queued_ids: set[str] = set()
+        self._futures: list[Future] = []
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_env() -> "DeliveryQueue":
+        return DeliveryQueue(
+            directory=os.getenv("DELIVERY_DIR", ".deliveries"),
+            channel_rate=float(os.getenv("DELIVERY_CHANNEL_PER_SECOND", 1)),
+            global_rate=float(os.getenv("DELIVERY_GLOBAL_PER_SECOND", 10)),
+            max_workers=int(os.getenv("DELIVERY_WORKERS", 4)),
+            max_attempts=int(os.getenv("DELIVERY_MAX_ATTEMPTS", 5)),
+        )
+
+    def enqueue(self, channel_id: str, message: str) -> str:
+        if not channel_id or not message:
+            raise Exception(f"Wrong argument given {channel_id} - {message}")
+
+        delivery_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        delivery = {
+            "id": delivery_id,
+            "channel_id": channel_id,
+            "message": message,
+            "enqueued_at": time.time(),
+        }
+        self._persist(delivery)
+
+        logger.info(f"Queueing slack message {delivery_id} for {channel_id=}")
+        metrics.increment("delivery.queued")
+        self._schedule(delivery)
+
+        return delivery_id
+
+    def retry_undelivered(self) -> int:
+        if not os.path.isdir(self.directory):
+            return 0
+
+        deliveries = []
+        with self._lock:
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith(".json") or name[:-5] in self._queued_ids:
+                    continue
+                try:
+                    with open(
+                        os.path.join(self.directory, name), encoding="utf-8"
+                    ) as file:
+                        deliveries.append(json.load(file))
+                except FileNotFoundError:
+                    continue
+            self._queued_ids.update(delivery["id"] for delivery in deliveries)
+
+        logger.info(f"Retrying {len(deliveries)} undelivered slack messages")
+        for delivery in deliveries:
+            self._schedule(delivery)
+
+        return len(deliveries)
+
+    def join(self, timeout: float | None = None) -> None:
+        while True:
+            with self._lock:
+                futures = [future for future in self._futures if not future.done()]
+                self._futures = futures
+            if not futures:
+                return
+            wait(futures, timeout=timeout)
+            if timeout is not None:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            depth = sum(len(queue) for queue in self._pending.values())
+            channels = sum(1 for queue in self._pending.values() if queue)
+        undelivered = (
+            sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+            if os.path.isdir(self.directory)
+            else 0
+        )
+        return {"depth": depth, "channels": channels, "undelivered": undelivered}
+
+    def _schedule(self, delivery: dict) -> None:
+        channel_id = delivery["channel_id"]
+        with self._lock:
+            self._pending[channel_id].append(delivery)
+            self._queued_ids.add(delivery["id"])
+            if channel_id in self._draining:
+                return
+            self._draining.add(channel_id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="Slack delivery"
+                )
+            self._futures.append(self._executor.submit(self._drain, channel_id))
+
+    def _drain(self, channel_id: str) -> None:
+        while True:
+            with self._lock:
+                if not self._pending[channel_id]:
+                    self._draining.discard(channel_id)
+                    return
+                delivery = self._pending[channel_id][0]
+
+            try:
+                self._deliver(delivery)
+            except Exception:
+                logger.warning(
+                    f"Delivery {delivery['id']} crashed: {traceback.format_exc()}"
+                )
+                metrics.increment("delivery.crashed")
+            finally:
+                with self._lock:
+                    self._pending[channel_id].popleft()
+                    self._queued_ids.discard(delivery["id"])
+
+    def _deliver(self, delivery: dict) -> bool:
+        channel_id = delivery["channel_id"]
+
+        progress = delivery.setdefault("progress", {})
+        before_post = partial(self._before_post, delivery)
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.sender(
+                    channel_id,
+                    delivery["message"],
+                    progress=progress,
+                    before_post=before_post,
+                )
+            except SlackRateLimitedError as error:
+                logger.warning(f"{error} - retrying in {error.retry_after}s")
+                metrics.increment("delivery.rate_limited")
+                self.sleep(error.retry_after)
+                continue
+            except SlackPermanentError as error:
+                logger.warning(
+                    f"Delivery {delivery['id']} can never succeed ({error}), moving it to {DEAD_LETTER_DIRECTORY}"
+                )
+                self._dead_letter(delivery)
+                metrics.increment("delivery.dead_lettered")
+                return False
+            except Exception as error:
+                logger.warning(
+                    f"Delivery {delivery['id']} failed ({error}), {attempt=}"
+                )
+                metrics.increment("delivery.errors")
+                if attempt < self.max_attempts:
+                    self.sleep(min(2**attempt, 60))
+                continue
+
+            with suppress(FileNotFoundError):
+                os.remove(self._path(delivery))
+            metrics.increment("delivery.sent")
+            metrics.observe(
+                "delivery.wait_seconds", time.time() - delivery["enqueued_at"]
+            )
+            return True
+
+        logger.warning(
+            f"Giving up on delivery {delivery['id']} for now, it stays on disk for a later retry"
+        )
+        metrics.increment("delivery.failed")
+        return False
+
+    def _before_post(self, delivery: dict, progress: dict) -> None:
+        # Every chat.postMessage call costs one token, and the parts already
+        # posted are saved so a restart resumes the thread instead of reposting
+        if progress.get("parts_sent"):
+            self._persist(delivery)
+        self.sleep(
+            max(
+                self._channel_bucket(delivery["channel_id"]).reserve(),
+                self.global_bucket.reserve(),
+            )
+        )
+
+    def _channel_bucket(self, channel_id: str) -> TokenBucket:
+        with self._lock:
+            if channel_id not in self._channel_buckets:
+                self._channel_buckets[channel_id] = TokenBucket(
+                    self.channel_rate, max(self.channel_rate, 1)
+                )
+            return self._channel_buckets[channel_id]
+
+    def _persist(self, delivery: dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(delivery)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(delivery, file)
+        os.replace(f"{path}.tmp", path)
+
+    def _dead_letter(self, delivery: dict) -> None:
+        directory = os.path.join(self.directory, DEAD_LETTER_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        with suppress(FileNotFoundError):
+            os.replace(
+                self._path(delivery), os.path.join(directory, f"{delivery['id']}.json")
+            )
+
+    def _path(self, delivery: dict) -> str:
+        return os.path.join(self.directory, f"{delivery['id']}.json")
+
+
+def queue_slack_message(channel_id: str, message: str) -> str:
+    return delivery_queue.enqueue(channel_id, message)
+
+
+def schedule_delivery_jobs() -> None:
+    retry_minutes = int(os.getenv("DELIVERY_RETRY_MINUTES", 10))
+    logger.info(f"Scheduling undelivered message retries every {retry_minutes} minutes")
+    delivery_queue.retry_undelivered()
+    maintenance_scheduler.every(retry_minutes).minutes.do(
+        delivery_queue.retry_undelivered
+    )
+
+
+delivery_queue = DeliveryQueue.from_env()
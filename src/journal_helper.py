@@ -0,0 +1,187 @@
+from collections.abc import Callable
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from src.domain import Book, State
+from src.lock_helper import file_lock
+from src.metrics_helper import metrics
+from src.storage_helper import FSYNC_POLICIES
+
+logger = logging.getLogger("daily_learner")
+
+# recorded_at, isbn, current_chapter, current_page, state, crc32 of the fields
+RECORD = struct.Struct("<d32sIIB3xI")
+ISBN_BYTES = 32
+STATE_CODES = {State.ON_GOING: 0, State.FINISHED: 1}
+STATES = {code: state for state, code in STATE_CODES.items()}
+PROGRESS_FIELDS = ("current_chapter", "current_page", "state")
+
+
+class ProgressJournal:
+    def __init__(
+        self,
+        path: str,
+        fsync: str = "always",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise Exception(f"Invalid progress journal given {fsync=}")
+
+        self.path = path
+        self.fsync = fsync
+        self.clock = clock
+        self._latest: dict[str, dict] | None = None
+        self._offset = 0
+        self._head = b""
+        self._lock = threading.Lock()
+        self._file_lock = file_lock(path)
+
+    @staticmethod
+    def from_env() -> "ProgressJournal":
+        return ProgressJournal(
+            os.getenv("PROGRESS_JOURNAL", "progress.journal"),
+            fsync=os.getenv("DB_FSYNC", "always"),
+        )
+
+    def append(self, book: Book) -> dict:
+        isbn = book.isbn.encode()
+        if not isbn or len(isbn) > ISBN_BYTES:
+            raise Exception(f"Invalid isbn for the progress journal {book.isbn=}")
+
+        event = {
+            "isbn": book.isbn,
+            "current_chapter": book.current_chapter,
+            "current_page": book.current_page,
+            "state": book.state.value,
+            "recorded_at": self.clock(),
+        }
+        record = _pack(event)
+
+        with self._lock, self._file_lock:
+            latest = self._replay()
+            with open(self.path, "ab") as file:
+                file.write(record)
+                if self.fsync == "always":
+                    file.flush()
+                    os.fsync(file.fileno())
+            latest[book.isbn] = event
+            self._offset += RECORD.size
+            self._head = self._head or record
+
+        metrics.increment("journal.appends")
+        return event
+
+    def entries(self) -> list[dict]:
+        with self._lock, self._file_lock:
+            return self._read(0)
+
+    def latest(self) -> dict[str, dict]:
+        with self._lock, self._file_lock:
+            return dict(self._replay())
+
+    def apply(self, document: dict) -> dict:
+        with self._lock, self._file_lock:
+            event = self._replay().get(document.get("isbn", ""))
+        if event is None:
+            return document
+        return {**document, **{field: event[field] for field in PROGRESS_FIELDS}}
+
+    def compact(self, snapshot: Callable[[list[dict]], None]) -> int:
+        with self._lock, self._file_lock:
+            events = list(self._replay().values())
+            if not events:
+                return 0
+
+            started = time.perf_counter()
+            snapshot(events)
+            with open(self.path, "wb") as file:
+                if self.fsync == "always":
+                    os.fsync(file.fileno())
+            self._latest, self._offset, self._head = {}, 0, b""
+            elapsed = time.perf_counter() - started
+
+        logger.info(
+            f"Compacted {len(events)} progress events of {self.path} in {elapsed:.3f}s"
+        )
+        metrics.increment("journal.compactions")
+        metrics.increment("journal.compacted_events", len(events))
+        return len(events)
+
+    def _replay(self) -> dict[str, dict]:
+        # Other processes append to and compact the same file, so the cache is
+        # only extended while the file still starts with the records it saw.
+        try:
+            with open(self.path, "rb") as file:
+                head = file.read(RECORD.size)
+                size = os.fstat(file.fileno()).st_size
+        except FileNotFoundError:
+            head, size = b"", 0
+
+        replaying = (
+            self._latest is None
+            or size < self._offset
+            or head[: len(self._head)] != self._head
+        )
+        if replaying:
+            self._latest, self._offset, self._head = {}, 0, b""
+
+        if size > self._offset:
+            for event in self._read(self._offset):
+                self._latest[event["isbn"]] = event
+                self._offset += RECORD.size
+            if self._offset:
+                self._head = self._head or head
+        if replaying:
+            logger.info(f"Replayed {len(self._latest)} books from {self.path}")
+        return self._latest
+
+    def _read(self, offset: int) -> list[dict]:
+        try:
+            with open(self.path, "rb") as file:
+                file.seek(offset)
+                content = file.read()
+        except FileNotFoundError:
+            return []
+
+        events = []
+        for start in range(0, len(content) - RECORD.size + 1, RECORD.size):
+            event = _unpack(content[start : start + RECORD.size])
+            if event is None:
+                break
+            events.append(event)
+
+        valid = len(events) * RECORD.size
+        if valid != len(content):
+            logger.warning(
+                f"Dropping {len(content) - valid} torn or corrupted bytes at the end of {self.path}"
+            )
+            os.truncate(self.path, offset + valid)
+        return events
+
+
+def _pack(event: dict) -> bytes:
+    fields = (
+        event["recorded_at"],
+        event["isbn"].encode(),
+        event["current_chapter"],
+        event["current_page"],
+        STATE_CODES[State(event["state"])],
+    )
+    body = RECORD.pack(*fields, 0)[:-4]
+    return RECORD.pack(*fields, zlib.crc32(body))
+
+
+def _unpack(record: bytes) -> dict | None:
+    recorded_at, isbn, chapter, page, state, checksum = RECORD.unpack(record)
+    if zlib.crc32(record[:-4]) != checksum:
+        return None
+    return {
+        "isbn": isbn.rstrip(b"\0").decode(),
+        "current_chapter": chapter,
+        "current_page": page,
+        "state": STATES[state].value,
+        "recorded_at": recorded_at,
+    }
@@ -0,0 +1,186 @@
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+import fcntl
+import os
+import threading
+
+
+class ReadWriteLock:
+    def __init__(self) -> None:
+        self._mutex = threading.Lock()
+        self._readers_ok = threading.Condition(self._mutex)
+        self._writers_ok = threading.Condition(self._mutex)
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer: int | None = None
+        self._writer_depth = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        me = threading.get_ident()
+        depth = getattr(self._local, "reads", 0)
+        counted = False
+
+        with self._mutex:
+            if self._writer != me and depth == 0:
+                while self._writer is not None or self._waiting_writers:
+                    self._readers_ok.wait()
+                self._readers += 1
+                counted = True
+        self._local.reads = depth + 1
+
+        try:
+            yield
+        finally:
+            self._local.reads = depth
+            if counted:
+                with self._mutex:
+                    self._readers -= 1
+                    if not self._readers and self._waiting_writers:
+                        self._writers_ok.notify()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        me = threading.get_ident()
+
+        with self._mutex:
+            if self._writer == me:
+                self._writer_depth += 1
+            else:
+                if getattr(self._local, "reads", 0):
+                    raise Exception("Cannot upgrade a read lock to a write lock")
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._writers_ok.wait()
+                self._waiting_writers -= 1
+                self._writer = me
+                self._writer_depth = 1
+
+        try:
+            yield
+        finally:
+            with self._mutex:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    if self._waiting_writers:
+                        self._writers_ok.notify()
+                    else:
+                        self._readers_ok.notify_all()
+
+
+class FileLock:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._descriptor: int | None = None
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "FileLock":
+        self._lock.acquire()
+        try:
+            if not self._depth:
+                if self._descriptor is None:
+                    self._descriptor = os.open(self.path, os.O_RDWR | os.O_CREAT)
+                fcntl.flock(self._descriptor, fcntl.LOCK_EX)
+        except BaseException:
+            self._lock.release()
+            raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if not self._depth:
+            fcntl.flock(self._descriptor, fcntl.LOCK_UN)
+        self._lock.release()
+
+    def _reset_after_fork(self) -> None:
+        if self._descriptor is not None:
+            os.close(self._descriptor)
+        self._descriptor = None
+        self._depth = 0
+        self._lock = threading.RLock()
+
+
+_file_locks: dict[str, FileLock] = {}
+_file_locks_lock = threading.Lock()
+
+
+def file_lock(path: str) -> FileLock:
+    lock_path = f"{os.path.abspath(path)}.lock"
+    with _file_locks_lock:
+        if lock_path not in _file_locks:
+            _file_locks[lock_path] = FileLock(lock_path)
+        return _file_locks[lock_path]
+
+
+def _reset_file_locks_after_fork() -> None:
+    global _file_locks_lock
+
+    _file_locks_lock = threading.Lock()
+    for lock in _file_locks.values():
+        lock._reset_after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_file_locks_after_fork)
+
+
+class LockedRepository:
+    def __init__(self, repository, path: str, flush_writes: bool = False) -> None:
+        self.repository = repository
+        self.path = path
+        self.flush_writes = flush_writes
+        self.rw_lock = ReadWriteLock()
+        self.file_lock = file_lock(path)
+        self._writes = 0
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self.rw_lock.write(), self.file_lock:
+            if not self._writes and self.flush_writes:
+                self.repository.reload()
+            self._writes += 1
+            try:
+                yield
+            finally:
+                self._writes -= 1
+            if not self._writes and self.flush_writes:
+                self.repository.flush()
+
+    def find(self, field: str, value: str) -> dict | None:
+        with self.rw_lock.read():
+            return self.repository.find(field, value)
+
+    def of_type(self, object_type: str) -> list[dict]:
+        with self.rw_lock.read():
+            return self.repository.of_type(object_type)
+
+    def all(self) -> list[dict]:
+        with self.rw_lock.read():
+            return self.repository.all()
+
+    def upsert(self, document: dict, field: str) -> int:
+        with self.write():
+            return self.repository.upsert(document, field)
+
+    def remove(self, field: str, value: str) -> bool:
+        with self.write():
+            return self.repository.remove(field, value)
+
+    def insert_many(self, documents: Iterable[dict]) -> int:
+        with self.write():
+            return self.repository.insert_many(documents)
+
+    def truncate(self) -> None:
+        with self.write():
+            self.repository.truncate()
+
+    def flush(self) -> None:
+        with self.write():
+            self.repository.flush()
+
+    def close(self) -> None:
+        with self.write():
+            self.repository.close()
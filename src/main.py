@@ -1,3 +1,5 @@
+import asyncio
+from datetime import date
 import schedule
 from starlette.datastructures import UploadFile
 from src.schedule_helper import schedule_jobs, run_all_jobs
@@ -6,18 +8,35 @@ from src.db_helper import (
     load_books,
     load_technologies,
     load_technology_by_name,
-    save_jobs,
+    record_progress,
+    save_job,
     write_book_to_db,
     write_technology_to_db,
 )
 from src.ai_helper import (
+    build_chapter_request,
+    build_page_request,
+    build_page_requests,
+    build_streamed_page_request,
+    build_technology_request,
     get_summary_for_book_by_chapter,
+    get_summary_for_book_by_chapter_async,
     get_summary_for_book_by_page,
+    get_summary_for_book_by_page_async,
     get_summary_for_technology,
+    get_summary_for_technology_async,
+    stream_summary,
 )
 from src.domain import Book, ObjectType, State, Technology, Type, Channel
-from src.slack_helper import send_slack_message, get_channel_id
+from src.slack_helper import get_channel_id, stream_slack_message
+from src.delivery_helper import delivery_queue, queue_slack_message
 from src.external_helper import get_book_information, get_book_isbn
+from src.cache_helper import summary_cache
+from src.metrics_helper import metrics
+from src.prefetch_helper import prefetch_queue
+from src.rate_limit_helper import PromptLimiter
+from src.router_helper import model_router
+from src.usage_helper import track_origin, usage_store
 from dotenv import load_dotenv
 import os
 import logging
@@ -27,31 +46,51 @@ logger = logging.getLogger("daily_learner")
 load_dotenv()
 
 
-def send_daily_book_summary(book: Book) -> None:
+def send_daily_book_summary(book: Book, stream: bool = False) -> None:
+    with track_origin(book.isbn, book.title, book.channel_id):
+        _send_daily_book_summary(book, stream)
+
+
+def _send_daily_book_summary(book: Book, stream: bool) -> None:
     logger.info(f"Summarizing book {book.title=}")
     summary: str | None = None
     target_page: int = 0
 
     if book.type == Type.BY_CHAPTER:
         logger.info("Getting summary for book by chapter")
-        summary = get_summary_for_book_by_chapter(
-            book.title, book.author, book.current_chapter
+        prefetch_queue.claim(
+            build_chapter_request(book.title, book.author, book.current_chapter)[0]
         )
+        if stream:
+            summary = _stream_summary(book.channel_id, book, kind="chapter")
+        else:
+            summary = get_summary_for_book_by_chapter(
+                book.title, book.author, book.current_chapter
+            )
     if book.type == Type.BY_PAGE:
         logger.info("Getting summary for book by page")
         target_page = _get_pages_for_summary(book)
-        summary = get_summary_for_book_by_page(
-            book.title, book.author, target_page, book.current_page
+        prefetch_queue.claim(
+            build_page_request(book.title, book.author, target_page, book.current_page)[
+                0
+            ]
         )
+        if stream:
+            summary = _stream_summary(book.channel_id, book, kind="page")
+        else:
+            summary = get_summary_for_book_by_page(
+                book.title, book.author, target_page, book.current_page
+            )
 
     if not summary:
         raise Exception(f"An error occured getting the summary for book {book.title}")
 
-    logger.info(
-        f"Sending slack message that contains summary... on channel {book.channel_id}"
-    )
+    if not stream:
+        logger.info(
+            f"Sending slack message that contains summary... on channel {book.channel_id}"
+        )
 
-    send_slack_message(book.channel_id, summary)
+        queue_slack_message(book.channel_id, summary)
 
     if book.type == Type.BY_CHAPTER:
         logger.info("Update current chapter number and status")
@@ -63,7 +102,7 @@ def send_daily_book_summary(book: Book) -> None:
             logger.info(
                 f"Sending last message for {book.title} on channel {book.channel_id}"
             )
-            send_slack_message(book.channel_id, message)
+            queue_slack_message(book.channel_id, message)
     else:
         logger.info("Update current page number and status")
         book.current_page = target_page
@@ -80,28 +119,138 @@ def send_daily_book_summary(book: Book) -> None:
             logger.info(
                 f"Sending last message for {book.title} on channel {book.channel_id}"
             )
-            send_slack_message(book.channel_id, message)
+            queue_slack_message(book.channel_id, message)
 
-    logger.info("Writing updated book to database")
+    logger.info("Recording updated progress")
 
-    write_book_to_db(Book.to_json(book))
+    record_progress(book)
 
+    prefetch_queue.enqueue(book)
 
-def send_daily_tech_summary(technology: Technology) -> None:
+
+def send_daily_tech_summary(technology: Technology, stream: bool = False) -> None:
+    with track_origin(technology.name, technology.name, technology.channel_id):
+        _send_daily_tech_summary(technology, stream)
+
+
+def _send_daily_tech_summary(technology: Technology, stream: bool) -> None:
     logger.info(f"Tips and tricks for {technology.name=}")
 
-    summary = get_summary_for_technology(technology.name)
+    if stream:
+        summary = _stream_summary(technology.channel_id, technology, kind="tech")
+    else:
+        summary = get_summary_for_technology(technology.name)
 
     if not summary:
         raise Exception(
             f"An error occured getting tips & tricks for tech {technology.name}"
         )
 
-    logging.info(
-        f"Sending tips for {technology.name} on channel {technology.channel_id}"
+    if not stream:
+        logging.info(
+            f"Sending tips for {technology.name} on channel {technology.channel_id}"
+        )
+
+        queue_slack_message(technology.channel_id, summary)
+
+
+def _stream_summary(channel_id: str, object: Book | Technology, kind: str) -> str:
+    logger.info(f"Streaming summary on channel {channel_id}")
+    model = model_router.choose(kind)
+    if isinstance(object, Book) and object.type != Type.BY_CHAPTER:
+        key, prompt = build_streamed_page_request(
+            object.title,
+            object.author,
+            _get_pages_for_summary(object),
+            object.current_page,
+            model,
+        )
+    else:
+        key, prompt = build_daily_request(object, model=model)
+    return stream_slack_message(
+        channel_id, stream_summary(key, prompt, kind=kind, model=model)
+    )
+
+
+def build_daily_request(
+    object: Book | Technology, day: date | None = None, model: str | None = None
+) -> tuple[str, str]:
+    if isinstance(object, Technology):
+        return build_technology_request(object.name, day, model)
+    if object.type == Type.BY_CHAPTER:
+        return build_chapter_request(
+            object.title, object.author, object.current_chapter, model
+        )
+    return build_page_request(
+        object.title,
+        object.author,
+        _get_pages_for_summary(object),
+        object.current_page,
+        model,
+    )
+
+
+def build_daily_requests(
+    object: Book | Technology, day: date | None = None, model: str | None = None
+) -> list[tuple[str, str]]:
+    # Large page ranges are requested per range, like the map-reduce summary
+    if isinstance(object, Book) and object.type != Type.BY_CHAPTER:
+        return build_page_requests(
+            object.title,
+            object.author,
+            _get_pages_for_summary(object),
+            object.current_page,
+            model,
+        )
+    return [build_daily_request(object, day, model)]
+
+
+async def generate_daily_summary(
+    object: Book | Technology, limiter: PromptLimiter
+) -> str:
+    if isinstance(object, Technology):
+        with track_origin(object.name, object.name, object.channel_id):
+            return await _generate_daily_summary(object, limiter)
+
+    with track_origin(object.isbn, object.title, object.channel_id):
+        return await _generate_daily_summary(object, limiter)
+
+
+async def _generate_daily_summary(
+    object: Book | Technology, limiter: PromptLimiter
+) -> str:
+    if isinstance(object, Technology):
+        logger.info(f"Generating tips ahead of delivery for {object.name=}")
+        return await get_summary_for_technology_async(object.name, limiter)
+
+    logger.info(f"Generating summary ahead of delivery for {object.title=}")
+    if object.type == Type.BY_CHAPTER:
+        return await get_summary_for_book_by_chapter_async(
+            object.title, object.author, object.current_chapter, limiter
+        )
+    return await get_summary_for_book_by_page_async(
+        object.title,
+        object.author,
+        _get_pages_for_summary(object),
+        object.current_page,
+        limiter,
+    )
+
+
+async def generate_daily_summaries(objects: list[Book | Technology]) -> int:
+    logger.info(f"Generating {len(objects)} summaries concurrently")
+    limiter = PromptLimiter.from_env()
+
+    results = await asyncio.gather(
+        *(generate_daily_summary(object, limiter) for object in objects),
+        return_exceptions=True,
     )
 
-    send_slack_message(technology.channel_id, summary)
+    failures = [result for result in results if isinstance(result, BaseException)]
+    for failure in failures:
+        logger.warning(f"Summary generation failed, job will retry live: {failure}")
+
+    return len(results) - len(failures)
 
 
 def _get_pages_for_summary(book: Book) -> int:
@@ -174,7 +323,7 @@ def handle_readme_command(book_name: UploadFile | str | None) -> str:
     if book:
         logger.info(f"Registering {book_name=} on schedule and jobs DB")
         schedule_jobs(book)
-        save_jobs()
+        save_job(book)
         return f"{book.title} will be summarized for you everyday a new chapter at 9am on channel <#{book.channel_id}>"
     return "An error occured while registering the book"
 
@@ -222,7 +371,7 @@ def handle_tips_command(technology_name: UploadFile | str | None) -> str:
 
         logger.info("Saving job information")
 
-        save_jobs()
+        save_job(technology)
 
         return f"We will give you tips and tricks about {technology.name} everyday on channel <#{technology.channel_id}>"
     return "An error occured while registering the technology"
@@ -262,6 +411,76 @@ def handle_list_command() -> str:
     )
 
 
+def handle_stats_command() -> str:
+    logger.info("Handling stats command")
+
+    snapshot = metrics.snapshot()
+    lines = [
+        f"{name}: {value:g}" for name, value in sorted(snapshot["counters"].items())
+    ]
+    lines += [
+        f"{name}: p50={sample['p50']:.2f} p95={sample['p95']:.2f} max={sample['max']:.2f} (n={sample['count']})"
+        for name, sample in sorted(snapshot["samples"].items())
+    ]
+
+    cache = summary_cache.stats()
+    prefetch = prefetch_queue.stats()
+    lines.append(f"summary cache: {cache['hits']} hits / {cache['misses']} misses")
+    lines.append(
+        f"prefetch: hit rate {prefetch['hit_rate']:.0%} - {prefetch['pending']} pending - {prefetch['ready']} ready"
+    )
+
+    delivery = delivery_queue.stats()
+    lines.append(
+        f"delivery: {delivery['depth']} queued over {delivery['channels']} channels - {delivery['undelivered']} undelivered"
+    )
+
+    routing = model_router.stats()
+    lines += [
+        f"route {kind}: {model}" for kind, model in sorted(routing["routes"].items())
+    ]
+    lines += [
+        f"model {model}: p50={health['p50']:.2f} p95={health['p95']:.2f} errors={health['error_rate']:.0%} (n={health['count']})"
+        for model, health in routing["models"].items()
+    ]
+    lines += [
+        f"routed {decision['kind']} to {decision['model']}: {decision['reason']}"
+        for decision in routing["decisions"][-5:]
+    ]
+
+    return "Current metrics:\n" + "\n".join(lines)
+
+
+def handle_usage_command(text: UploadFile | str | None = None) -> str:
+    logger.info("Handling usage command")
+
+    if text is not None and not isinstance(text, str):
+        raise Exception(f"Invalid usage argument type given {type(text)}")
+
+    argument = (text or "").strip()
+    if argument and (not argument.isdecimal() or int(argument) < 1):
+        return "Usage: /usage <N> - N is how many subscriptions to show, at least 1"
+    count = int(argument) if argument else 5
+
+    lines = [f"Top {count} most expensive subscriptions:"]
+    lines += [_format_usage(row["name"], row) for row in usage_store.top(count)]
+    lines.append(f"Top {count} slowest subscriptions:")
+    lines += [
+        _format_usage(row["name"], row) for row in usage_store.top(count, by="seconds")
+    ]
+    lines.append("Daily usage:")
+    lines += [
+        _format_usage(row["key"], row) for row in usage_store.aggregate("day")[-7:]
+    ]
+
+    return "\n".join(lines)
+
+
+def _format_usage(label: str, row: dict) -> str:
+    tokens = row["prompt_tokens"] + row["completion_tokens"]
+    return f"{label}: {tokens} tokens - {row['seconds']:.1f}s over {row['calls']} calls"
+
+
 def get_all_channel() -> list[Channel]:
     logger.info("Loading books for channels")
 
@@ -0,0 +1,59 @@
+from collections import defaultdict, deque
+import logging
+import threading
+
+logger = logging.getLogger("daily_learner")
+
+MAX_SAMPLES = 1000
+
+
+class Metrics:
+    def __init__(self, max_samples: int = MAX_SAMPLES) -> None:
+        self.max_samples = max_samples
+        self.counters: defaultdict[str, float] = defaultdict(float)
+        self.samples: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.max_samples)
+        )
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self.samples[name].append(value)
+
+    def percentile(self, name: str, percentile: float) -> float:
+        with self._lock:
+            values = sorted(self.samples.get(name, []))
+        if not values:
+            return 0.0
+        index = min(len(values) - 1, int(round(percentile / 100 * (len(values) - 1))))
+        return values[index]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            names = list(self.samples)
+            counters = dict(self.counters)
+        return {
+            "counters": counters,
+            "samples": {
+                name: {
+                    "count": len(self.samples[name]),
+                    "p50": self.percentile(name, 50),
+                    "p95": self.percentile(name, 95),
+                    "max": self.percentile(name, 100),
+                }
+                for name in names
+            },
+        }
+
+    def reset(self) -> None:
+        logger.info("Resetting metrics")
+        with self._lock:
+            self.counters.clear()
+            self.samples.clear()
+
+
+metrics = Metrics()
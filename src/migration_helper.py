@@ -0,0 +1,58 @@
+import argparse
+import json
+import logging
+import os
+from src.repository_helper import SQLITE_SCHEME, SqliteRepository
+
+logger = logging.getLogger("daily_learner")
+
+
+def read_tinydb_documents(path: str) -> list[dict]:
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        logger.info(f"Nothing to migrate in {path}")
+        return []
+
+    with open(path, encoding="utf-8") as file:
+        tables = json.load(file)
+
+    table = tables.get("_default", {})
+    return [table[doc_id] for doc_id in sorted(table, key=int)]
+
+
+def migrate(source: str, target: str) -> int:
+    if not target.startswith(SQLITE_SCHEME):
+        raise Exception(f"Invalid migration target given {target}")
+
+    documents = read_tinydb_documents(source)
+
+    repository = SqliteRepository(target.removeprefix(SQLITE_SCHEME))
+    try:
+        if repository.all():
+            raise Exception(f"Migration target {target} is not empty")
+        migrated = repository.insert_many(documents)
+    finally:
+        repository.close()
+
+    logger.info(f"Migrated {migrated} documents from {source} to {target}")
+    return migrated
+
+
+def main(arguments: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Import TinyDB files into SQLite databases"
+    )
+    parser.add_argument(
+        "migrations",
+        nargs="+",
+        metavar="SOURCE=TARGET",
+        help="for example books.json=sqlite:///books.db",
+    )
+    parsed = parser.parse_args(arguments)
+
+    for migration in parsed.migrations:
+        source, _, target = migration.partition("=")
+        print(f"{source}: {migrate(source, target)} documents migrated to {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import asyncio
+from dataclasses import replace
+import logging
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from src.ai_helper import close_async_client
+from src.domain import Book, State
+from src.metrics_helper import metrics
+from src.rate_limit_helper import PromptLimiter
+from src.schedule_helper import maintenance_scheduler
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+
+class PrefetchQueue:
+    def __init__(self) -> None:
+        self._pending: dict[str, Book] = {}
+        self._ready: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, book: Book) -> None:
+        if book.state == State.FINISHED:
+            logger.info(f"{book.title} is finished, nothing to prefetch")
+            return
+
+        logger.info(f"Queueing prefetch of the next summary for {book.title}")
+        with self._lock:
+            self._pending[book.isbn] = replace(book)
+
+    def run(self) -> int:
+        with self._lock:
+            books = list(self._pending.values())
+            self._pending.clear()
+
+        if not books:
+            logger.info("Nothing to prefetch")
+            return 0
+
+        logger.info(f"Prefetching next summary for {len(books)} books")
+        keys = asyncio.run(_prefetch(books))
+
+        now = time.time()
+        max_age = float(os.getenv("PREFETCH_MAX_AGE_SECONDS", 2 * 24 * 3600))
+        with self._lock:
+            for key in keys:
+                self._ready[key] = now
+            expired = [k for k, at in self._ready.items() if now - at > max_age]
+            for key in expired:
+                del self._ready[key]
+
+        metrics.increment("prefetch.expired", len(expired))
+        metrics.increment("prefetch.generated", len(keys))
+        return len(keys)
+
+    def claim(self, key: str) -> bool:
+        with self._lock:
+            prefetched_at = self._ready.pop(key, None)
+
+        if prefetched_at is None:
+            metrics.increment("prefetch.misses")
+            return False
+
+        metrics.increment("prefetch.hits")
+        metrics.observe("prefetch.staleness_seconds", time.time() - prefetched_at)
+        return True
+
+    def stats(self) -> dict:
+        hits = metrics.counters.get("prefetch.hits", 0)
+        misses = metrics.counters.get("prefetch.misses", 0)
+        return {
+            "pending": len(self._pending),
+            "ready": len(self._ready),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+async def _prefetch(books: list[Book]) -> list[str]:
+    from src.main import build_daily_request, generate_daily_summary
+
+    limiter = PromptLimiter.from_env()
+    # Each prefetch runs on a fresh event loop, so its AI client must not outlive it
+    try:
+        results = await asyncio.gather(
+            *(generate_daily_summary(book, limiter) for book in books),
+            return_exceptions=True,
+        )
+    finally:
+        await close_async_client()
+
+    keys = []
+    for book, result in zip(books, results):
+        if isinstance(result, BaseException) or not result:
+            logger.warning(f"Prefetch failed for {book.title}: {result}")
+            continue
+        keys.append(build_daily_request(book)[0])
+    return keys
+
+
+def run_prefetch() -> None:
+    thread = threading.Thread(name="Prefetch summaries", target=prefetch_queue.run)
+    thread.start()
+
+
+def schedule_prefetch_jobs() -> None:
+    prefetch_time = os.getenv("PREFETCH_TIME", "03:00")
+    logger.info(f"Scheduling summary prefetch at {prefetch_time}")
+    maintenance_scheduler.every().day.at(prefetch_time).do(run_prefetch)
+
+
+prefetch_queue = PrefetchQueue()
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+import logging
+
+logger = logging.getLogger("daily_learner")
+
+SHARED_INSTRUCTIONS = "Please refrain from using emojis etc.. Also I want your answer to ONLY CONTAIN THE REQUESTED CONTENT, nothing else no hello or bye or question JUST the content."
+
+SUMMARY_INSTRUCTIONS = "The summary can be detailed, it should be able to be read in under five minutes. Only use headings if necessary, use slack-flavored markdown for headers and highlighting the important words, phrases."
+
+TIP_INSTRUCTIONS = "The tip or trick should be detailed with code example when necessary. Use slack-flavored markdown for headers and highlighting the important words, phrases."
+
+MERGE_INSTRUCTIONS = "Merge the partial summaries, in reading order, into a single summary of the whole range."
+
+SUMMARY_PREFIX = "\n\n".join([SHARED_INSTRUCTIONS, SUMMARY_INSTRUCTIONS])
+
+TIP_PREFIX = "\n\n".join([SHARED_INSTRUCTIONS, TIP_INSTRUCTIONS])
+
+MERGE_PREFIX = "\n\n".join([SUMMARY_PREFIX, MERGE_INSTRUCTIONS])
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: str
+    request: str
+    prefix: str
+
+    def render(self, **values: object) -> str:
+        try:
+            request = self.request.format(**values)
+        except KeyError as error:
+            raise Exception(
+                f"Missing value {error} for prompt template {self.name}"
+            ) from error
+        return f"{self.prefix}\n\nRequest:\n{request}"
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+
+PAGE_TEMPLATE = PromptTemplate(
+    name="page",
+    version="3",
+    request="Please make a summary of the pages {current_page} to {target_page} of the book {title} by {author}.",
+    prefix=SUMMARY_PREFIX,
+)
+
+CHAPTER_TEMPLATE = PromptTemplate(
+    name="chapter",
+    version="3",
+    request="Please make a summary of the chapter {current_chapter} of the book {title} by {author}.",
+    prefix=SUMMARY_PREFIX,
+)
+
+TECHNOLOGY_TEMPLATE = PromptTemplate(
+    name="tech",
+    version="3",
+    request="Please give me a tip or trick for using technology: {technology_name}.",
+    prefix=TIP_PREFIX,
+)
+
+MERGE_TEMPLATE = PromptTemplate(
+    name="merge",
+    version="3",
+    request="Here are {count} partial summaries, in reading order, of the pages {current_page} to {target_page} of the book {title} by {author}. Please merge them into a single summary of those pages.\n\n{partials}",
+    prefix=MERGE_PREFIX,
+)
@@ -0,0 +1,74 @@
+from collections import deque
+from collections.abc import Callable
+import asyncio
+import logging
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+
+class PromptLimiter:
+    def __init__(self, max_concurrency: int, tokens_per_minute: int) -> None:
+        if max_concurrency <= 0 or tokens_per_minute <= 0:
+            raise Exception(
+                f"Invalid limits given {max_concurrency=} - {tokens_per_minute=}"
+            )
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._window: deque[tuple[float, int]] = deque()
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def from_env() -> "PromptLimiter":
+        return PromptLimiter(
+            max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", 8)),
+            tokens_per_minute=int(os.getenv("AI_TOKENS_PER_MINUTE", 200000)),
+        )
+
+    async def reserve(self, tokens: int) -> None:
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while self._used(time.monotonic()) + tokens > self.tokens_per_minute:
+                wait = self._window[0][0] + 60 - time.monotonic()
+                logger.info(f"Token budget exhausted, waiting {wait:.2f}s")
+                await asyncio.sleep(max(wait, 0))
+            self._window.append((time.monotonic(), tokens))
+
+    def _used(self, now: float) -> int:
+        while self._window and now - self._window[0][0] >= 60:
+            self._window.popleft()
+        return sum(tokens for _, tokens in self._window)
+
+
+class TokenBucket:
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise Exception(f"Invalid bucket given {rate=} - {capacity=}")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+
+def estimate_tokens(prompt: str) -> int:
+    return len(prompt) // 4 + int(os.getenv("AI_OUTPUT_TOKENS_ESTIMATE", 1500))
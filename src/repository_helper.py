@@ -0,0 +1,296 @@
+from collections.abc import Iterable
+import json
+import logging
+import os
+import sqlite3
+import threading
+from tinydb import TinyDB
+from tinydb.table import Document
+
+logger = logging.getLogger("daily_learner")
+
+UNIQUE_INDEXES = ("isbn", "name")
+SQLITE_SCHEME = "sqlite:///"
+
+
+class IndexedRepository:
+    def __init__(self, db: TinyDB, path: str | None = None) -> None:
+        self.db = db
+        self.path = path
+        self._documents: dict[int, dict] = {}
+        self._unique: dict[str, dict[str, int]] = {
+            field: {} for field in UNIQUE_INDEXES
+        }
+        self._by_type: dict[str, dict[int, None]] = {}
+        self._signature: tuple[int, int] | int | None = None
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def find(self, field: str, value: str) -> dict | None:
+        if field not in UNIQUE_INDEXES:
+            raise Exception(f"No index on {field=}")
+
+        with self._lock:
+            self._refresh()
+            doc_id = self._unique[field].get(value)
+            return None if doc_id is None else self._documents[doc_id]
+
+    def of_type(self, object_type: str) -> list[dict]:
+        with self._lock:
+            self._refresh()
+            return [
+                self._documents[doc_id] for doc_id in self._by_type.get(object_type, {})
+            ]
+
+    def all(self) -> list[dict]:
+        with self._lock:
+            self._refresh()
+            return list(self._documents.values())
+
+    def upsert(self, document: dict, field: str) -> int:
+        if field not in UNIQUE_INDEXES:
+            raise Exception(f"No index on {field=}")
+
+        with self._lock:
+            self._refresh()
+            value = document.get(field)
+            doc_id = self._unique[field].get(value) if value is not None else None
+
+            if doc_id is None:
+                doc_id = self.db.insert(Document(document, doc_id=self._next_doc_id()))
+                self._index(doc_id, dict(document))
+            else:
+                self.db.update(document, doc_ids=[doc_id])
+                updated = {**self._documents[doc_id], **document}
+                self._unindex(doc_id)
+                self._index(doc_id, updated)
+
+            self._signature = self._stat()
+            return doc_id
+
+    def remove(self, field: str, value: str) -> bool:
+        if field not in UNIQUE_INDEXES:
+            raise Exception(f"No index on {field=}")
+
+        with self._lock:
+            self._refresh()
+            doc_id = self._unique[field].get(value)
+            if doc_id is None:
+                return False
+            self.db.remove(doc_ids=[doc_id])
+            self._unindex(doc_id)
+            self._signature = self._stat()
+            return True
+
+    def insert_many(self, documents: Iterable[dict]) -> int:
+        with self._lock:
+            self._refresh()
+            first = self._next_doc_id()
+            doc_ids = self.db.insert_multiple(
+                Document(document, doc_id=first + offset)
+                for offset, document in enumerate(documents)
+            )
+            self._loaded = False
+        return len(doc_ids)
+
+    def flush(self) -> None:
+        if flush := getattr(self.db.storage, "flush", None):
+            flush()
+
+    def reload(self) -> None:
+        if reload := getattr(self.db.storage, "reload", None):
+            reload()
+        with self._lock:
+            self._loaded = False
+
+    def close(self) -> None:
+        self.db.close()
+
+    def truncate(self) -> None:
+        with self._lock:
+            self.db.truncate()
+            self._clear()
+            self._loaded = True
+            self._signature = self._stat()
+
+    def rebuild(self) -> int:
+        with self._lock:
+            self._clear()
+            for document in self.db.all():
+                self._index(document.doc_id, dict(document))
+            self._loaded = True
+            self._signature = self._stat()
+
+        logger.info(f"Indexed {len(self._documents)} documents of {self.path}")
+        return len(self._documents)
+
+    def _next_doc_id(self) -> int:
+        return max(self._documents, default=0) + 1
+
+    def _refresh(self) -> None:
+        if not self._loaded or self._stat() != self._signature:
+            self.rebuild()
+
+    def _stat(self) -> tuple[int, int] | int | None:
+        if version := getattr(self.db.storage, "version", None):
+            return version()
+        if not self.path:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _index(self, doc_id: int, document: dict) -> None:
+        self._documents[doc_id] = document
+        for field in UNIQUE_INDEXES:
+            if (value := document.get(field)) is not None:
+                self._unique[field].setdefault(value, doc_id)
+        if (object_type := document.get("object_type")) is not None:
+            self._by_type.setdefault(object_type, {})[doc_id] = None
+
+    def _unindex(self, doc_id: int) -> None:
+        document = self._documents.pop(doc_id)
+        for field in UNIQUE_INDEXES:
+            if self._unique[field].get(document.get(field)) == doc_id:
+                del self._unique[field][document[field]]
+        if (object_type := document.get("object_type")) is not None:
+            self._by_type[object_type].pop(doc_id, None)
+
+    def _clear(self) -> None:
+        self._documents = {}
+        self._unique = {field: {} for field in UNIQUE_INDEXES}
+        self._by_type = {}
+
+
+class SqliteRepository:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def find(self, field: str, value: str) -> dict | None:
+        if field not in UNIQUE_INDEXES:
+            raise Exception(f"No index on {field=}")
+
+        row = self._fetch(
+            f"SELECT body FROM documents WHERE {field} = ? ORDER BY id LIMIT 1",
+            (value,),
+        )
+        return json.loads(row[0][0]) if row else None
+
+    def of_type(self, object_type: str) -> list[dict]:
+        rows = self._fetch(
+            "SELECT body FROM documents WHERE object_type = ? ORDER BY id",
+            (object_type,),
+        )
+        return [json.loads(body) for (body,) in rows]
+
+    def all(self) -> list[dict]:
+        rows = self._fetch("SELECT body FROM documents ORDER BY id", ())
+        return [json.loads(body) for (body,) in rows]
+
+    def upsert(self, document: dict, field: str) -> int:
+        if field not in UNIQUE_INDEXES:
+            raise Exception(f"No index on {field=}")
+
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                value = document.get(field)
+                row = (
+                    connection.execute(
+                        f"SELECT id, body FROM documents WHERE {field} = ? ORDER BY id LIMIT 1",
+                        (value,),
+                    ).fetchone()
+                    if value is not None
+                    else None
+                )
+                if row is None:
+                    return connection.execute(
+                        "INSERT INTO documents (isbn, name, object_type, body) VALUES (?, ?, ?, ?)",
+                        _columns(document),
+                    ).lastrowid
+                doc_id, body = row
+                connection.execute(
+                    "UPDATE documents SET isbn = ?, name = ?, object_type = ?, body = ? WHERE id = ?",
+                    (*_columns({**json.loads(body), **document}), doc_id),
+                )
+                return doc_id
+
+    def remove(self, field: str, value: str) -> bool:
+        if field not in UNIQUE_INDEXES:
+            raise Exception(f"No index on {field=}")
+
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                cursor = connection.execute(
+                    f"DELETE FROM documents WHERE id = (SELECT id FROM documents WHERE {field} = ? ORDER BY id LIMIT 1)",
+                    (value,),
+                )
+        return cursor.rowcount > 0
+
+    def insert_many(self, documents: Iterable[dict]) -> int:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                cursor = connection.executemany(
+                    "INSERT INTO documents (isbn, name, object_type, body) VALUES (?, ?, ?, ?)",
+                    (_columns(document) for document in documents),
+                )
+        return cursor.rowcount
+
+    def truncate(self) -> None:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM documents")
+
+    def flush(self) -> None:
+        pass
+
+    def reload(self) -> None:
+        pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _fetch(self, query: str, parameters: tuple) -> list[tuple]:
+        with self._lock:
+            return self._connect().execute(query, parameters).fetchall()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            logger.info(f"Opening SQLite database {self.path}")
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    isbn TEXT,
+                    name TEXT,
+                    object_type TEXT,
+                    body TEXT NOT NULL
+                )"""
+            )
+            for column in ("isbn", "name", "object_type"):
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS documents_by_{column} ON documents ({column})"
+                )
+            self._connection.commit()
+        return self._connection
+
+
+def _columns(document: dict) -> tuple:
+    return (
+        document.get("isbn"),
+        document.get("name"),
+        document.get("object_type"),
+        json.dumps(document),
+    )
@@ -0,0 +1,222 @@
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from dotenv import load_dotenv
+from openai import APIConnectionError, APITimeoutError
+from src.metrics_helper import metrics
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_env() -> "CircuitBreaker":
+        return CircuitBreaker(
+            failure_threshold=int(os.getenv("AI_CIRCUIT_FAILURES", 5)),
+            reset_timeout=float(os.getenv("AI_CIRCUIT_RESET_SECONDS", 60)),
+        )
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "open":
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    metrics.increment("ai.circuit_rejections")
+                    raise CircuitOpenError("AI provider circuit is open, failing fast")
+                logger.info("AI provider circuit half-open, sending a probe")
+                self.state = "half_open"
+                self._probing = False
+
+            if self.state == "half_open":
+                if self._probing:
+                    metrics.increment("ai.circuit_rejections")
+                    raise CircuitOpenError(
+                        "AI provider circuit is probing, failing fast"
+                    )
+                self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info("AI provider circuit closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                logger.warning(f"AI provider circuit opened after {self.failures=}")
+                metrics.increment("ai.circuit_opened")
+                self.state = "open"
+                self.opened_at = self.clock()
+                self._probing = False
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        call_timeout: float,
+        deadline: float,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.call_timeout = call_timeout
+        self.deadline = deadline
+
+    @staticmethod
+    def from_env() -> "RetryPolicy":
+        return RetryPolicy(
+            max_attempts=int(os.getenv("AI_RETRY_ATTEMPTS", 4)),
+            base_delay=float(os.getenv("AI_RETRY_BASE_SECONDS", 1)),
+            max_delay=float(os.getenv("AI_RETRY_MAX_SECONDS", 30)),
+            call_timeout=float(os.getenv("AI_CALL_TIMEOUT_SECONDS", 60)),
+            deadline=float(os.getenv("AI_DEADLINE_SECONDS", 180)),
+        )
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+def is_retryable(exception: BaseException) -> bool:
+    if isinstance(
+        exception, APITimeoutError | APIConnectionError | TimeoutError | ConnectionError
+    ):
+        return True
+    return getattr(exception, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def get_retry_after(exception: BaseException) -> float | None:
+    headers = getattr(getattr(exception, "response", None), "headers", None) or {}
+
+    if retry_after_ms := headers.get("retry-after-ms"):
+        return float(retry_after_ms) / 1000
+
+    if not (retry_after := headers.get("retry-after")):
+        return None
+
+    try:
+        return float(retry_after)
+    except ValueError:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+
+
+def call_with_resilience(
+    call: Callable[[float], T],
+    policy: RetryPolicy | None = None,
+    breaker: "CircuitBreaker | None" = None,
+) -> T:
+    policy = policy or retry_policy
+    breaker = breaker or ai_circuit_breaker
+    deadline = time.monotonic() + policy.deadline
+    attempt = 0
+
+    while True:
+        breaker.before_call()
+        try:
+            result = call(min(policy.call_timeout, deadline - time.monotonic()))
+        except Exception as exception:
+            attempt += 1
+            delay = _next_delay(exception, attempt, policy, breaker, deadline)
+            logger.warning(
+                f"AI call failed ({exception}), retry {attempt} in {delay:.2f}s"
+            )
+            time.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result
+
+
+async def call_with_resilience_async(
+    call: Callable[[float], Awaitable[T]],
+    policy: RetryPolicy | None = None,
+    breaker: "CircuitBreaker | None" = None,
+) -> T:
+    policy = policy or retry_policy
+    breaker = breaker or ai_circuit_breaker
+    deadline = time.monotonic() + policy.deadline
+    attempt = 0
+
+    while True:
+        breaker.before_call()
+        try:
+            result = await call(min(policy.call_timeout, deadline - time.monotonic()))
+        except Exception as exception:
+            attempt += 1
+            delay = _next_delay(exception, attempt, policy, breaker, deadline)
+            logger.warning(
+                f"AI call failed ({exception}), retry {attempt} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result
+
+
+def _next_delay(
+    exception: Exception,
+    attempt: int,
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    deadline: float,
+) -> float:
+    if not is_retryable(exception):
+        breaker.record_success()
+        raise exception
+
+    breaker.record_failure()
+
+    if attempt >= policy.max_attempts:
+        raise Exception(f"AI call failed after {attempt} attempts") from exception
+
+    delay = policy.delay(attempt, get_retry_after(exception))
+    if time.monotonic() + delay >= deadline:
+        raise Exception(
+            f"AI call deadline exceeded after {attempt} attempts"
+        ) from exception
+
+    metrics.increment("ai.retries")
+    return delay
+
+
+retry_policy = RetryPolicy.from_env()
+ai_circuit_breaker = CircuitBreaker.from_env()
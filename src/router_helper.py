@@ -0,0 +1,174 @@
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import logging
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from src.constant import DEFAULT_AI_MODEL
+from src.metrics_helper import metrics
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+LATENCY_BUCKETS = [1, 2, 5, 10, 20, 30, 60]
+MAX_DECISIONS = 100
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        primary: str,
+        fallbacks: list[str],
+        latency_slo: float,
+        max_error_rate: float,
+        window: int = 50,
+        min_samples: int = 5,
+        recovery_seconds: float = 900,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if latency_slo <= 0 or not 0 < max_error_rate <= 1 or min_samples <= 0:
+            raise Exception(
+                f"Invalid routing limits given {latency_slo=} - {max_error_rate=} - {min_samples=}"
+            )
+
+        self.primary = primary
+        self.fallbacks = [model for model in fallbacks if model != primary]
+        self.latency_slo = latency_slo
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.recovery_seconds = recovery_seconds
+        self.clock = clock
+        self.routes: dict[str, tuple[str, float]] = {}
+        self.decisions: deque[dict] = deque(maxlen=MAX_DECISIONS)
+        self._samples: dict[str, deque[tuple[float, bool]]] = {
+            model: deque(maxlen=window) for model in [self.primary, *self.fallbacks]
+        }
+        self._histograms: dict[str, list[int]] = {
+            model: [0] * (len(LATENCY_BUCKETS) + 1) for model in self._samples
+        }
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_env() -> "ModelRouter":
+        fallbacks = os.getenv("AI_FALLBACK_MODELS", "")
+        return ModelRouter(
+            primary=os.getenv("AI_MODEL", DEFAULT_AI_MODEL),
+            fallbacks=[
+                model.strip() for model in fallbacks.split(",") if model.strip()
+            ],
+            latency_slo=float(os.getenv("AI_LATENCY_SLO_SECONDS", 30)),
+            max_error_rate=float(os.getenv("AI_MAX_ERROR_RATE", 0.5)),
+            window=int(os.getenv("AI_ROUTER_WINDOW", 50)),
+            min_samples=int(os.getenv("AI_ROUTER_MIN_SAMPLES", 5)),
+            recovery_seconds=float(os.getenv("AI_ROUTER_RECOVERY_SECONDS", 900)),
+        )
+
+    def choose(self, kind: str) -> str:
+        with self._lock:
+            model, routed_at = self.routes.get(kind, (self.primary, self.clock()))
+
+            if model != self.primary and (
+                self.clock() - routed_at >= self.recovery_seconds
+            ):
+                self._samples[self.primary].clear()
+                return self._route(kind, self.primary, "recovery window elapsed")
+
+            if not self._is_healthy(model):
+                if healthy := next(
+                    (m for m in self.fallbacks if m != model and self._is_healthy(m)),
+                    None,
+                ):
+                    return self._route(kind, healthy, f"{model} breached its SLO")
+
+            if kind not in self.routes:
+                return self._route(kind, model, "first request")
+
+            return model
+
+    def record(self, model: str, seconds: float, ok: bool) -> None:
+        metrics.observe(f"ai.latency.{model}", seconds)
+        if not ok:
+            metrics.increment(f"ai.errors.{model}")
+
+        with self._lock:
+            if model not in self._samples:
+                return
+            self._samples[model].append((seconds, ok))
+            bucket = next(
+                (i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+                len(LATENCY_BUCKETS),
+            )
+            self._histograms[model][bucket] += 1
+
+    @contextmanager
+    def track(self, model: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(model, time.perf_counter() - started, ok=False)
+            raise
+        self.record(model, time.perf_counter() - started, ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "routes": {kind: model for kind, (model, _) in self.routes.items()},
+                "models": {
+                    model: {
+                        **self._health(model),
+                        "histogram": dict(
+                            zip(
+                                [f"<={bound}s" for bound in LATENCY_BUCKETS]
+                                + [f">{LATENCY_BUCKETS[-1]}s"],
+                                self._histograms[model],
+                            )
+                        ),
+                    }
+                    for model in self._samples
+                },
+                "decisions": list(self.decisions),
+            }
+
+    def _route(self, kind: str, model: str, reason: str) -> str:
+        logger.info(f"Routing {kind} requests to {model}: {reason}")
+        metrics.increment(f"router.switches.{kind}")
+        self.routes[kind] = (model, self.clock())
+        self.decisions.append(
+            {"kind": kind, "model": model, "reason": reason, "at": time.time()}
+        )
+        return model
+
+    def _is_healthy(self, model: str) -> bool:
+        health = self._health(model)
+        if health["count"] < self.min_samples:
+            return True
+        return (
+            health["p95"] <= self.latency_slo
+            and health["error_rate"] <= self.max_error_rate
+        )
+
+    def _health(self, model: str) -> dict:
+        samples = list(self._samples[model])
+        latencies = sorted(seconds for seconds, ok in samples if ok)
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            "count": len(samples),
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "error_rate": errors / len(samples) if samples else 0.0,
+        }
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    return values[
+        min(len(values) - 1, int(round(percentile / 100 * (len(values) - 1))))
+    ]
+
+
+model_router = ModelRouter.from_env()
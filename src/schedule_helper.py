@@ -1,4 +1,10 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import os
 import schedule
+import traceback
+from src.ai_helper import close_async_client
 from src.constant import DEFAULT_SCHEDULE_TIME
 from src.domain import Book, Technology
 import logging
@@ -6,6 +12,8 @@ import threading
 
 logger = logging.getLogger("daily_learner")
 
+maintenance_scheduler = schedule.Scheduler()
+
 
 def schedule_jobs(object: Book | Technology | None) -> None:
     from src.main import send_daily_book_summary, send_daily_tech_summary
@@ -27,10 +35,118 @@ def schedule_jobs(object: Book | Technology | None) -> None:
         )
 
 
+def schedule_many(objects: list[Book | Technology]) -> int:
+    from src.main import send_daily_book_summary, send_daily_tech_summary
+
+    for object in objects:
+        job_func = (
+            send_daily_book_summary
+            if isinstance(object, Book)
+            else send_daily_tech_summary
+        )
+        schedule.every().day.at(DEFAULT_SCHEDULE_TIME).do(job_func, object)
+
+    logger.info(f"Scheduled {len(objects)} jobs in one batch")
+    return len(objects)
+
+
+async def run_pending_jobs() -> None:
+    from src.main import generate_daily_summaries
+
+    # Jobs do blocking file, network and AI calls, keep them off the event loop
+    try:
+        await asyncio.to_thread(maintenance_scheduler.run_pending)
+    except Exception:
+        logger.warning(f"A maintenance job failed: {traceback.format_exc()}")
+
+    due_objects = [
+        job.job_func.args[0]
+        for job in schedule.jobs
+        if job.should_run and job.job_func and job.job_func.args
+    ]
+
+    if due_objects:
+        logger.info(f"Pre-generating summaries for {len(due_objects)} due jobs")
+        await generate_daily_summaries(due_objects)
+
+    due_jobs = sorted(job for job in schedule.jobs if job.should_run)
+    if due_jobs:
+        await asyncio.to_thread(_run_jobs, due_jobs)
+
+
+def _run_all() -> None:
+    if os.getenv("STREAMING_MODE", "false") == "true":
+        _stream_all()
+        return
+
+    objects = [
+        job.job_func.args[0]
+        for job in schedule.jobs
+        if job.job_func and job.job_func.args
+    ]
+
+    logger.info(f"Pre-generating summaries for {len(objects)} jobs")
+    asyncio.run(_generate_all(objects))
+
+    _run_jobs(schedule.jobs[:])
+
+
+def _run_jobs(jobs: list[schedule.Job]) -> None:
+    for job in jobs:
+        _run_job(job)
+
+
+def _run_job(job: schedule.Job) -> None:
+    # schedule only moves a job to its next run once it returns, so a failed
+    # job would stay due and block every job after it
+    try:
+        if job.run() is schedule.CancelJob:
+            schedule.cancel_job(job)
+    except Exception:
+        logger.warning(f"Scheduled job {job} failed: {traceback.format_exc()}")
+        job.last_run = datetime.datetime.now()
+        job._schedule_next_run()
+
+
+async def _generate_all(objects: list[Book | Technology]) -> None:
+    from src.main import generate_daily_summaries
+
+    # Every run gets a fresh event loop, so its AI client must not outlive it
+    try:
+        await generate_daily_summaries(objects)
+    finally:
+        await close_async_client()
+
+
+def _stream_all() -> None:
+    jobs = [job for job in schedule.jobs if job.job_func and job.job_func.args]
+    logger.info(f"Streaming {len(jobs)} jobs progressively")
+
+    with ThreadPoolExecutor(
+        max_workers=int(os.getenv("AI_MAX_CONCURRENCY", 8)),
+        thread_name_prefix="Stream scheduled job",
+    ) as executor:
+        futures = [executor.submit(_stream_job, job) for job in jobs]
+
+    for future in futures:
+        if exception := future.exception():
+            logger.warning(f"Streaming job failed: {exception}")
+
+
+def _stream_job(job: schedule.Job) -> None:
+    # Same bookkeeping as Job.run, which cannot forward the stream flag
+    job_func = job.job_func
+    if job_func is None:
+        raise Exception(f"Cannot stream a job without a function {job}")
+    job_func(stream=True)
+    job.last_run = datetime.datetime.now()
+    job._schedule_next_run()
+
+
 def run_all_jobs() -> None:
     logger.info("Run all jobs..")
 
-    thread = threading.Thread(name="Run all scheduled jobs", target=schedule.run_all)
+    thread = threading.Thread(name="Run all scheduled jobs", target=_run_all)
 
     logger.info("Started thread for jobs...")
 
@@ -1,16 +1,35 @@
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.client import HTTPMessage
+from io import BytesIO
+from urllib.error import HTTPError, URLError
+from urllib.request import Request
+import asyncio
 import re
+import ssl
+import threading
 import time
 import traceback
 from slack_sdk.web.slack_response import SlackResponse
 from typing_extensions import TYPE_CHECKING
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from requests.adapters import HTTPAdapter
+import requests.exceptions
 import hmac
 import hashlib
 import os
 from dotenv import load_dotenv
 
-from src.constant import MARKDOWN_RULES
+from src.constant import (
+    FENCE_MARKDOWN_REGEX,
+    MARKDOWN_TOKEN_REGEX,
+    SLACK_BULLET,
+    STREAMING_PLACEHOLDER,
+)
 import logging
 
 logger = logging.getLogger("daily_learner")
@@ -20,9 +39,161 @@ load_dotenv()
 if TYPE_CHECKING:
     from tests.test_utils import TestClient
 
+CHANNEL_PAGE_SIZE = 1000
+CHANNEL_PAGE_ATTEMPTS = 5
+SECTION_TEXT_LIMIT = 3000
+MESSAGE_BLOCK_LIMIT = 50
+CHANNEL_NAME_LIMIT = 80
+CODE_FENCE = "```"
+PERMANENT_SLACK_ERRORS = {
+    "channel_not_found",
+    "is_archived",
+    "not_in_channel",
+    "msg_too_long",
+}
 
-def send_slack_message(
+
+class SlackRateLimitedError(Exception):
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SlackPermanentError(Exception):
+    pass
+
+
+class SSLContextAdapter(HTTPAdapter):
+    def __init__(self, ssl_context: ssl.SSLContext | None = None, **kwargs) -> None:
+        self.ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        if self.ssl_context is not None:
+            kwargs["ssl_context"] = self.ssl_context
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy: str, **kwargs):
+        if self.ssl_context is not None:
+            kwargs["ssl_context"] = self.ssl_context
+        return super().proxy_manager_for(proxy, **kwargs)
+
+
+class PooledWebClient(WebClient):
+    def __init__(self, pool_size: int = 10, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.session = requests.Session()
+        adapter = SSLContextAdapter(
+            self.ssl, pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if self.ssl is not None:
+            self.session.verify = self.ssl.verify_mode != ssl.CERT_NONE
+
+    def _perform_urllib_http_request_internal(self, url: str, req: Request) -> dict:
+        # The SDK's retry handlers only know urllib's exceptions, so a dropped
+        # pooled connection is reported the way urlopen would report it.
+        try:
+            response = self.session.post(
+                url,
+                data=req.data,
+                headers=dict(req.header_items()),
+                timeout=self.timeout,
+                proxies={"http": self.proxy, "https": self.proxy}
+                if self.proxy
+                else None,
+            )
+        except requests.exceptions.ConnectionError as error:
+            raise URLError(error) from error
+        except requests.exceptions.Timeout as error:
+            raise TimeoutError(str(error)) from error
+
+        if response.status_code >= 400:
+            headers = HTTPMessage()
+            for key, value in response.headers.items():
+                headers[key] = value
+            raise HTTPError(
+                url,
+                response.status_code,
+                response.reason,
+                headers,
+                BytesIO(response.content),
+            )
+        return {
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": response.content.decode(response.encoding or "utf-8"),
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_slack_client: PooledWebClient | None = None
+_slack_executor: ThreadPoolExecutor | None = None
+_slack_client_lock = threading.Lock()
+
+
+def get_slack_client() -> PooledWebClient:
+    global _slack_client
+
+    with _slack_client_lock:
+        if _slack_client is None:
+            pool_size = _slack_pool_size()
+            logger.info(f"Creating shared Slack client with {pool_size=}")
+            _slack_client = PooledWebClient(
+                pool_size=pool_size,
+                token=os.getenv("SLACK_BOT_TOKEN"),
+                base_url=os.getenv("SLACK_API_URL", WebClient.BASE_URL),
+            )
+        return _slack_client
+
+
+async def run_slack_call(function: Callable, *args, **kwargs):
+    global _slack_executor
+
+    with _slack_client_lock:
+        if _slack_executor is None:
+            _slack_executor = ThreadPoolExecutor(
+                max_workers=_slack_pool_size(), thread_name_prefix="Slack call"
+            )
+
+    return await asyncio.get_running_loop().run_in_executor(
+        _slack_executor, partial(function, *args, **kwargs)
+    )
+
+
+async def send_slack_message_async(
     channel_id: str, message: str, client: "TestClient | None | WebClient" = None
+) -> bool | SlackResponse:
+    return await run_slack_call(send_slack_message, channel_id, message, client)
+
+
+def close_slack_client() -> None:
+    global _slack_client, _slack_executor
+
+    with _slack_client_lock:
+        if _slack_client is not None:
+            logger.info("Closing shared Slack client")
+            _slack_client.close()
+        if _slack_executor is not None:
+            _slack_executor.shutdown(wait=False)
+        _slack_client = None
+        _slack_executor = None
+
+
+def _slack_pool_size() -> int:
+    return int(os.getenv("SLACK_POOL_SIZE", 10))
+
+
+def send_slack_message(
+    channel_id: str,
+    message: str,
+    client: "TestClient | None | WebClient" = None,
+    structured: bool = False,
+    progress: dict | None = None,
+    before_post: Callable[[dict], None] | None = None,
 ) -> bool | SlackResponse:
     try:
         if not channel_id or not message:
@@ -31,7 +202,19 @@ def send_slack_message(
         logger.info(f"Sending slack message in {channel_id=}")
 
         logger.info("Loading web client..")
-        client = client or WebClient(token=os.getenv("SLACK_BOT_TOKEN"))
+        client = client or get_slack_client()
+
+        if structured:
+            return _send_blocks(
+                channel_id,
+                _markdown_to_slackdown(message),
+                client,
+                progress if progress is not None else {},
+                before_post,
+            )
+
+        if before_post:
+            before_post(progress if progress is not None else {})
 
         logger.info("Posting message...")
         response = client.chat_postMessage(
@@ -42,19 +225,377 @@ def send_slack_message(
         return response.validate()
     except SlackApiError as e:
         logger.warning(traceback.format_exc())
+        if getattr(e.response, "status_code", None) == 429:
+            raise SlackRateLimitedError(
+                f"Rate limited sending message in {channel_id=}",
+                _retry_after(e.response),
+            )
+        if e.response["error"] in PERMANENT_SLACK_ERRORS:
+            raise SlackPermanentError(f"Error sending message: {e.response['error']}")
         raise Exception(f"Error sending message: {e.response['error']}")
 
 
+def _send_blocks(
+    channel_id: str,
+    text: str,
+    client: "TestClient | WebClient",
+    progress: dict,
+    before_post: Callable[[dict], None] | None = None,
+) -> bool | SlackResponse:
+    # progress survives retries: parts already posted are skipped and the
+    # remaining ones are still threaded under the original parent message
+    response: bool | SlackResponse = True
+    parent = None
+    parts_sent = progress.get("parts_sent", 0)
+    thread_ts = progress.get("thread_ts")
+
+    for index, batch in enumerate(_iter_batches(text)):
+        if index < parts_sent:
+            continue
+        if before_post:
+            before_post(progress)
+        logger.info(f"Posting {len(batch)} blocks, {thread_ts=}")
+        response = client.chat_postMessage(
+            channel=channel_id,
+            text=batch[0]["text"]["text"],
+            blocks=batch,
+            thread_ts=thread_ts,
+        ).validate()
+        if index == 0:
+            parent = response
+            thread_ts = None if isinstance(response, bool) else response["ts"]
+        progress["thread_ts"] = thread_ts
+        progress["parts_sent"] = index + 1
+
+    return parent if parent is not None else response
+
+
+def _iter_batches(text: str) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for section in _iter_sections(text, SECTION_TEXT_LIMIT):
+        if len(batch) == MESSAGE_BLOCK_LIMIT:
+            yield batch
+            batch = []
+        batch.append({"type": "section", "text": {"type": "mrkdwn", "text": section}})
+    if batch:
+        yield batch
+
+
+_SECTION_BREAK_PATTERN = re.compile(
+    r"\n(?:[ \t]*\n)+|\n(?=[ \t]*\*[^*\n]+\*[ \t]*$)", flags=re.MULTILINE
+)
+
+
+def _iter_sections(text: str, limit: int) -> Iterator[str]:
+    in_code_block = False
+
+    for section in _iter_section_spans(text, limit - 2 * len(CODE_FENCE) - 2):
+        prefix = f"{CODE_FENCE}\n" if in_code_block else ""
+        if len(_FENCE_PATTERN.findall(section)) % 2:
+            in_code_block = not in_code_block
+        suffix = f"\n{CODE_FENCE}" if in_code_block else ""
+        yield f"{prefix}{section}{suffix}"
+
+
+def _iter_section_spans(text: str, budget: int) -> Iterator[str]:
+    start = end = resume = 0
+
+    for boundary in chain(_SECTION_BREAK_PATTERN.finditer(text), [None]):
+        stop = boundary.start() if boundary else len(text)
+
+        if stop - start > budget and end > start:
+            yield text[start:end]
+            start = resume
+
+        while stop - start > budget:
+            cut = _find_cut(text, start, start + budget)
+            yield text[start:cut]
+            start = cut + 1 if text[cut] in " \n" else cut
+
+        end = stop
+        resume = boundary.end() if boundary else len(text)
+
+    if end > start:
+        yield text[start:end]
+
+
+def _find_cut(text: str, start: int, end: int) -> int:
+    for separator in ("\n", " "):
+        cut = text.rfind(separator, start + 1, end)
+        if cut != -1:
+            return cut
+    return end
+
+
+def update_slack_message(
+    channel_id: str,
+    ts: str,
+    message: str,
+    client: "TestClient | None | WebClient" = None,
+) -> bool | SlackResponse:
+    try:
+        if not channel_id or not ts or not message:
+            raise Exception(f"Wrong argument given {channel_id} - {ts} - {message}")
+
+        logger.info(f"Updating slack message {ts=} in {channel_id=}")
+
+        client = client or get_slack_client()
+
+        response = client.chat_update(channel=channel_id, ts=ts, text=message)
+
+        return response.validate()
+    except SlackApiError as e:
+        logger.warning(traceback.format_exc())
+        if getattr(e.response, "status_code", None) == 429:
+            raise SlackRateLimitedError(
+                f"Rate limited updating message {ts=} in {channel_id=}",
+                _retry_after(e.response),
+            )
+        raise Exception(f"Error updating message: {e.response['error']}")
+
+
+def _retry_after(response: SlackResponse) -> float:
+    headers = {key.lower(): value for key, value in response.headers.items()}
+    return float(headers.get("retry-after", 1))
+
+
+def stream_slack_message(
+    channel_id: str,
+    chunks: Iterable[str],
+    client: "TestClient | None | WebClient" = None,
+) -> str:
+    logger.info(f"Streaming slack message in {channel_id=}")
+
+    client = client or get_slack_client()
+    update_tokens = int(os.getenv("STREAMING_UPDATE_TOKENS", 50))
+    update_interval = float(os.getenv("STREAMING_UPDATE_SECONDS", 1))
+
+    placeholder = send_slack_message(channel_id, STREAMING_PLACEHOLDER, client)
+    ts = "" if isinstance(placeholder, bool) else placeholder.get("ts", "")
+
+    converter = _SlackdownStream()
+    pending_tokens = 0
+    last_update = time.monotonic()
+    held_until = 0.0
+
+    try:
+        for chunk in chunks:
+            converter.feed(chunk)
+            pending_tokens += 1
+            if time.monotonic() < held_until:
+                continue
+            if (
+                pending_tokens >= update_tokens
+                or time.monotonic() - last_update >= update_interval
+            ):
+                # Refreshes are best effort, only the final update must land
+                try:
+                    update_slack_message(channel_id, ts, converter.render(), client)
+                except SlackRateLimitedError as error:
+                    logger.warning(f"{error} - pausing refreshes {error.retry_after}s")
+                    held_until = time.monotonic() + error.retry_after
+                except Exception as exception:
+                    logger.warning(f"Skipping a refresh of {ts=}: {exception}")
+                pending_tokens = 0
+                last_update = time.monotonic()
+
+        message = converter.render()
+        if not message:
+            raise Exception(f"Empty stream received for {channel_id=}")
+
+        time.sleep(max(0.0, held_until - time.monotonic()))
+        update_slack_message(channel_id, ts, message, client)
+    except Exception:
+        if ts:
+            _delete_placeholder(channel_id, ts, client)
+        raise
+
+    return converter.raw
+
+
+def _delete_placeholder(
+    channel_id: str, ts: str, client: "TestClient | WebClient"
+) -> None:
+    logger.info(f"Deleting the unfinished streamed message {ts=} in {channel_id=}")
+    try:
+        client.chat_delete(channel=channel_id, ts=ts)
+    except Exception:
+        logger.warning(
+            f"Could not delete the streamed message {ts=}: {traceback.format_exc()}"
+        )
+
+
+class _SlackdownStream:
+    def __init__(self) -> None:
+        self.raw = ""
+        self._converted = ""
+        self._tail = ""
+        self._converter = _SlackdownConverter()
+
+    def feed(self, chunk: str) -> None:
+        self.raw += chunk
+        self._tail += chunk
+        if "\n" in self._tail:
+            complete, self._tail = self._tail.rsplit("\n", 1)
+            self._converted += self._converter.convert(complete) + "\n"
+
+    def render(self) -> str:
+        if not self._tail:
+            return self._converted
+        return self._converted + self._converter.convert(self._tail, commit=False)
+
+
+_FENCE_PATTERN = re.compile(FENCE_MARKDOWN_REGEX, flags=re.MULTILINE)
+_TOKEN_PATTERN = re.compile(MARKDOWN_TOKEN_REGEX)
+
+
+class _SlackdownConverter:
+    def __init__(self) -> None:
+        self.in_code_block = False
+
+    def convert(self, text: str, commit: bool = True) -> str:
+        in_code_block = self.in_code_block
+        parts = []
+        position = 0
+
+        for fence in _FENCE_PATTERN.finditer(text):
+            parts.append(_convert_text(text[position : fence.start()], in_code_block))
+            parts.append(fence.group(1))
+            in_code_block = not in_code_block
+            position = fence.end()
+        parts.append(_convert_text(text[position:], in_code_block))
+
+        if commit:
+            self.in_code_block = in_code_block
+        return "".join(parts)
+
+
+def _convert_text(text: str, in_code_block: bool) -> str:
+    if in_code_block or not text:
+        return text
+    return _TOKEN_PATTERN.sub(_convert_token, f"\n{text}")[1:]
+
+
+def _convert_token(token: re.Match) -> str:
+    kind = token.lastgroup
+    if kind == "bullet":
+        return f"\n{token.group(kind)}{SLACK_BULLET} "
+    if kind in ("bold", "underscore_bold"):
+        return f"*{_TOKEN_PATTERN.sub(_convert_token, token.group(kind))}*"
+    if kind == "italic":
+        return f"_{token.group(kind)}_"
+    if kind == "heading":
+        text = _TOKEN_PATTERN.sub(_convert_heading_token, token.group(kind))
+        return f"\n{token.group('heading_indent')}*{text}*"
+    if kind == "link_url":
+        return f"<{token.group('link_url')}|{token.group('link_text')}>"
+    if kind == "bold_italic":
+        return f"*_{token.group(kind)}_*"
+    if kind == "strike":
+        return f"~{token.group(kind)}~"
+    return token.group()
+
+
+def _convert_heading_token(token: re.Match) -> str:
+    # The whole heading is already bold, so only the emphasis inside it is kept
+    kind = token.lastgroup
+    if kind in ("bold", "underscore_bold"):
+        return _TOKEN_PATTERN.sub(_convert_heading_token, token.group(kind))
+    if kind == "bold_italic":
+        return f"_{token.group(kind)}_"
+    return _convert_token(token)
+
+
 def _markdown_to_slackdown(message: str) -> str:
     if not message:
         raise Exception(f"Empty message given {message}")
 
     logger.info("Processing markdown to slackdown..")
 
-    for pattern, replacement in MARKDOWN_RULES:
-        message = re.sub(pattern, replacement, message, flags=re.MULTILINE)
+    return _SlackdownConverter().convert(message)
+
+
+class ChannelDirectory:
+    def __init__(
+        self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._index: dict[str, str] = {}
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+
+    def get(
+        self, name: str, client: "TestClient | None | WebClient" = None
+    ) -> str | None:
+        if self.is_stale():
+            self.refresh(client)
+        return self._index.get(name)
+
+    def is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or self.clock() - self._loaded_at >= self.ttl_seconds
+        )
 
-    return message
+    def refresh(self, client: "TestClient | None | WebClient" = None) -> int:
+        client = client or get_slack_client()
+        index: dict[str, str] = {}
+        cursor = ""
+        pages = 0
+
+        logger.info("Loading the channel directory from Slack...")
+        while True:
+            response = _list_channel_page(client, cursor)
+            pages += 1
+            for channel in response.get("channels", []):
+                index[channel.get("name", "")] = channel.get("id", "")
+
+            cursor = (response.get("response_metadata") or {}).get("next_cursor", "")
+            if not cursor:
+                break
+
+        with self._lock:
+            self._index = index
+            self._loaded_at = self.clock()
+
+        logger.info(f"Channel directory loaded {len(index)} channels in {pages} pages")
+        return len(index)
+
+    def add(self, name: str, channel_id: str) -> None:
+        with self._lock:
+            self._index[name] = channel_id
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = {}
+            self._loaded_at = None
+
+
+def _list_channel_page(
+    client: "TestClient | WebClient", cursor: str
+) -> "dict | SlackResponse":
+    # Paging a large workspace runs into Slack's rate limit, so the page is
+    # retried after Retry-After instead of failing the whole refresh
+    attempts = 1
+    while True:
+        try:
+            return client.conversations_list(
+                types="public_channel",
+                exclude_archived=True,
+                limit=CHANNEL_PAGE_SIZE,
+                cursor=cursor,
+            )
+        except SlackApiError as e:
+            if (
+                getattr(e.response, "status_code", None) != 429
+                or attempts >= CHANNEL_PAGE_ATTEMPTS
+            ):
+                raise
+            delay = _retry_after(e.response)
+            logger.warning(f"Rate limited listing channels - retrying in {delay}s")
+            time.sleep(delay)
+            attempts += 1
 
 
 def get_channel_id(
@@ -66,22 +607,26 @@ def get_channel_id(
 
         logger.info(f"Get channel_id for {object_name=}")
 
-        client = client or WebClient(token=os.getenv("SLACK_BOT_TOKEN"))
-
-        logger.info("Get the list of channels from Slack...")
-        response = client.conversations_list(types="public_channel")
-
         sanitized_object_name = _sanitize_book_name(object_name)
 
-        for channel in response.get("channels", {}):
-            if channel.get("name") == sanitized_object_name:
-                logger.info(f"Existing channel found for {object_name=} - Returning ID")
-                return channel.get("id", "")
+        if channel_id := channel_directory.get(sanitized_object_name, client):
+            logger.info(f"Existing channel found for {object_name=} - Returning ID")
+            return channel_id
 
         logger.info(
             f"No existing channel was found for {object_name=} - Creating channel"
         )
-        return create_channel(sanitized_object_name)
+        try:
+            channel_id = create_channel(sanitized_object_name)
+        except Exception:
+            logger.warning("Channel creation failed, reloading the channel directory")
+            channel_directory.refresh(client)
+            if channel_id := channel_directory.get(sanitized_object_name, client):
+                return channel_id
+            raise
+
+        channel_directory.add(sanitized_object_name, channel_id)
+        return channel_id
     except SlackApiError as e:
         raise Exception(f"Error getting channel's id: {e.response['error']}")
 
@@ -101,7 +646,7 @@ def create_channel(
 
         logger.info(f"Creating channel for {object_name=}")
 
-        client = client or WebClient(token=os.getenv("SLACK_BOT_TOKEN"))
+        client = client or get_slack_client()
 
         channel = client.conversations_create(name=object_name)
 
@@ -112,24 +657,99 @@ def create_channel(
         raise Exception(f"Error creating channels: {e.response['error']}")
 
 
+def get_channel_state(
+    channel_id: str, client: "TestClient | WebClient | None" = None
+) -> str:
+    try:
+        logger.info(f"Checking {channel_id=}")
+        client = client or get_slack_client()
+        channel = client.conversations_info(channel=channel_id).get("channel", {})
+        return "archived" if channel.get("is_archived") else "active"
+    except SlackApiError as e:
+        if e.response["error"] == "channel_not_found":
+            return "not_found"
+        raise Exception(f"Error getting channel's info: {e.response['error']}")
+
+
+def unarchive_channel(
+    channel_id: str, client: "TestClient | WebClient | None" = None
+) -> None:
+    try:
+        logger.info(f"Unarchiving {channel_id=}")
+        client = client or get_slack_client()
+        client.conversations_unarchive(channel=channel_id)
+    except SlackApiError as e:
+        raise Exception(f"Error unarchiving channel: {e.response['error']}")
+
+
+class SignatureVerifier:
+    def __init__(
+        self,
+        secret: str,
+        max_age_seconds: float = 60 * 5,
+        max_nonces: int = 300_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_age_seconds = max_age_seconds
+        self.max_nonces = max_nonces
+        self.clock = clock
+        self._mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, timestamp: str, slack_signature: str, body: bytes) -> bool:
+        if not timestamp or not slack_signature:
+            return False
+
+        now = self.clock()
+        try:
+            sent_at = int(timestamp)
+        except ValueError:
+            return False
+        if abs(now - sent_at) > self.max_age_seconds:
+            return False
+
+        mac = self._mac.copy()
+        mac.update(b"v0:")
+        mac.update(timestamp.encode())
+        mac.update(b":")
+        mac.update(body)
+        if not hmac.compare_digest(f"v0={mac.hexdigest()}", slack_signature):
+            return False
+
+        with self._lock:
+            while self._seen and next(iter(self._seen.values())) < now:
+                self._seen.popitem(last=False)
+            if slack_signature in self._seen:
+                logger.warning(f"Rejecting replayed slack request from {timestamp=}")
+                return False
+            if len(self._seen) >= self.max_nonces:
+                # Evicting an unexpired nonce would let it be replayed, so a
+                # full cache only frees expired entries and otherwise refuses
+                self._seen = OrderedDict(
+                    (seen, expires)
+                    for seen, expires in self._seen.items()
+                    if expires >= now
+                )
+            if len(self._seen) >= self.max_nonces:
+                logger.warning("Rejecting slack request, the replay cache is full")
+                return False
+            self._seen[slack_signature] = sent_at + self.max_age_seconds
+
+        return True
+
+
 def verify_slack_request(timestamp: str, slack_signature: str, body: bytes) -> bool:
     logger.info("verifying Slack request")
 
-    if not timestamp or not slack_signature:
-        return False
+    return signature_verifier.verify(timestamp, slack_signature, body)
 
-    if abs(time.time() - int(timestamp)) > 60 * 5:
-        return False
 
-    basestring = f"v0:{timestamp}:{body.decode('utf-8')}"
-
-    expected_signature = (
-        "v0="
-        + hmac.new(
-            os.getenv("SLACK_SIGNING_SECRET", "").encode(),
-            basestring.encode(),
-            hashlib.sha256,
-        ).hexdigest()
-    )
+channel_directory = ChannelDirectory(
+    ttl_seconds=float(os.getenv("CHANNEL_DIRECTORY_TTL_SECONDS", 3600))
+)
 
-    return hmac.compare_digest(expected_signature, slack_signature)
+signature_verifier = SignatureVerifier(
+    os.getenv("SLACK_SIGNING_SECRET", ""),
+    max_nonces=int(os.getenv("SLACK_REPLAY_CACHE_SIZE", 300_000)),
+)
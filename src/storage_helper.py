@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import threading
+import time
+from tinydb.storages import Storage
+from src.lock_helper import file_lock
+from src.metrics_helper import metrics
+
+logger = logging.getLogger("daily_learner")
+
+FSYNC_POLICIES = ("always", "never")
+
+
+class WriteBehindStorage(Storage):
+    def __init__(
+        self,
+        path: str,
+        max_pending_writes: int = 100,
+        flush_interval: float = 5.0,
+        fsync: str = "always",
+    ) -> None:
+        if fsync not in FSYNC_POLICIES or max_pending_writes < 1:
+            raise Exception(
+                f"Invalid write-behind storage given {fsync=} - {max_pending_writes=}"
+            )
+
+        self.path = path
+        self.max_pending_writes = max_pending_writes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.loads = 0
+        self._loaded = False
+        self._data: dict | None = None
+        self._pending = 0
+        self._signature: tuple[int, int] | None = None
+        self._timer: threading.Timer | None = None
+        self._lock = threading.RLock()
+        self._file_lock = file_lock(path)
+
+    def read(self) -> dict | None:
+        with self._lock:
+            self._reload_if_changed()
+            return self._data
+
+    def write(self, data: dict) -> None:
+        with self._file_lock, self._lock:
+            self._data = data
+            self._pending += 1
+            if self._pending >= self.max_pending_writes:
+                self.flush()
+            elif self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def reload(self) -> None:
+        with self._lock:
+            if not self._pending:
+                self._loaded = False
+
+    def version(self) -> int:
+        with self._lock:
+            self._reload_if_changed()
+            return self.loads
+
+    def flush(self) -> int:
+        with self._file_lock, self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+
+            started = time.perf_counter()
+            payload = json.dumps(self._data).encode()
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "wb") as file:
+                file.write(payload)
+                if self.fsync == "always":
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(temporary, self.path)
+            if self.fsync == "always":
+                _fsync_directory(self.path)
+
+            pending, self._pending = self._pending, 0
+            self._signature = self._stat()
+            elapsed = time.perf_counter() - started
+
+        logger.info(
+            f"Flushed {pending} writes to {self.path}: {len(payload)} bytes in {elapsed:.3f}s"
+        )
+        metrics.increment("storage.flushes")
+        metrics.increment("storage.coalesced_writes", pending)
+        metrics.observe("storage.flush_bytes", len(payload))
+        metrics.observe("storage.flush_seconds", elapsed)
+        return len(payload)
+
+    def close(self) -> None:
+        self.flush()
+
+    def _reload_if_changed(self) -> None:
+        if self._pending:
+            return
+        signature = self._stat()
+        if self._loaded and signature == self._signature:
+            return
+
+        if signature is None or signature[1] == 0:
+            self._data = None
+        else:
+            with open(self.path, encoding="utf-8") as file:
+                self._data = json.load(file)
+        self._signature = signature
+        self._loaded = True
+        self.loads += 1
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+def _fsync_directory(path: str) -> None:
+    descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
@@ -0,0 +1,145 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime
+import logging
+import os
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+AGGREGATIONS = {"object": "object_id", "channel": "channel_id", "day": "day"}
+RANKINGS = {"tokens": "prompt_tokens + completion_tokens", "seconds": "seconds"}
+
+
+@dataclass
+class UsageOrigin:
+    object_id: str
+    name: str
+    channel_id: str
+
+
+usage_origin = ContextVar[UsageOrigin | None]("usage_origin", default=None)
+
+
+@contextmanager
+def track_origin(object_id: str, name: str, channel_id: str) -> Iterator[None]:
+    token = usage_origin.set(UsageOrigin(object_id, name, channel_id))
+    try:
+        yield
+    finally:
+        usage_origin.reset(token)
+
+
+class UsageStore:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS usage (
+                at REAL NOT NULL,
+                day TEXT NOT NULL,
+                object_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                channel_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL,
+                completion_tokens INTEGER NOT NULL,
+                seconds REAL NOT NULL
+            )"""
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS usage_by_day ON usage (day)"
+        )
+        self._connection.commit()
+
+    def record(
+        self,
+        kind: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        seconds: float,
+        at: datetime | None = None,
+    ) -> None:
+        at = at or datetime.now()
+        origin = usage_origin.get() or UsageOrigin("unknown", "unknown", "")
+
+        logger.info(
+            f"Recording usage of {origin.name}: {prompt_tokens=} {completion_tokens=} {seconds=:.2f}"
+        )
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    at.timestamp(),
+                    at.date().isoformat(),
+                    origin.object_id,
+                    origin.name,
+                    origin.channel_id,
+                    kind,
+                    model,
+                    prompt_tokens,
+                    completion_tokens,
+                    seconds,
+                ),
+            )
+            self._connection.commit()
+
+    def aggregate(self, by: str, since: date | None = None) -> list[dict]:
+        if by not in AGGREGATIONS:
+            raise Exception(f"Invalid aggregation given {by=}")
+
+        column = AGGREGATIONS[by]
+        return self._query(
+            f"""SELECT {column}, MAX(name), COUNT(*), SUM(prompt_tokens),
+                SUM(completion_tokens), SUM(seconds)
+            FROM usage WHERE day >= ? GROUP BY {column} ORDER BY {column}""",
+            (since or date.min).isoformat(),
+        )
+
+    def top(
+        self, count: int, by: str = "tokens", since: date | None = None
+    ) -> list[dict]:
+        if by not in RANKINGS or count <= 0:
+            raise Exception(f"Invalid ranking given {by=} - {count=}")
+
+        return self._query(
+            f"""SELECT object_id, MAX(name), COUNT(*), SUM(prompt_tokens),
+                SUM(completion_tokens), SUM(seconds)
+            FROM usage WHERE day >= ? GROUP BY object_id
+            ORDER BY SUM({RANKINGS[by]}) DESC LIMIT {int(count)}""",
+            (since or date.min).isoformat(),
+        )
+
+    def clear(self) -> None:
+        logger.info("Clearing usage store")
+        with self._lock:
+            self._connection.execute("DELETE FROM usage")
+            self._connection.commit()
+
+    def _query(self, query: str, *parameters: str) -> list[dict]:
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+        return [
+            {
+                "key": key,
+                "name": name,
+                "calls": calls,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "seconds": seconds,
+            }
+            for key, name, calls, prompt_tokens, completion_tokens, seconds in rows
+        ]
+
+
+usage_store = UsageStore(os.getenv("USAGE_DB_NAME", "usage.db"))
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import traceback
+from dotenv import load_dotenv
+from src.db_helper import (
+    load_books,
+    load_technologies,
+    write_book_to_db,
+    write_technology_to_db,
+)
+from src.domain import Book, State, Technology
+from src.slack_helper import (
+    CHANNEL_NAME_LIMIT,
+    _sanitize_book_name,
+    channel_directory,
+    create_channel,
+    get_channel_state,
+    get_slack_client,
+    run_slack_call,
+    unarchive_channel,
+)
+
+logger = logging.getLogger("daily_learner")
+
+load_dotenv()
+
+CHANNEL_NAME_ATTEMPTS = 5
+
+
+async def reconcile_channels() -> dict:
+    books = [book for book in load_books() if book.state != State.FINISHED]
+    subscriptions: list[Book | Technology] = [*books, *load_technologies()]
+
+    logger.info(f"Reconciling channels of {len(subscriptions)} subscriptions")
+    await run_slack_call(channel_directory.refresh)
+    states = await asyncio.gather(
+        *(run_slack_call(_stored_channel_state, s) for s in subscriptions)
+    )
+
+    missing: dict[str, list[Book | Technology]] = {}
+    updated = unarchived = 0
+    for subscription, state in zip(subscriptions, states):
+        if state in ("active", "unknown"):
+            continue
+        if state == "archived":
+            try:
+                await run_slack_call(unarchive_channel, subscription.channel_id)
+                unarchived += 1
+                continue
+            except Exception as error:
+                logger.warning(
+                    f"Could not unarchive {subscription.channel_id}: {error}"
+                )
+
+        name = _sanitize_book_name(_subscription_name(subscription))
+        channel_id = channel_directory.get(name)
+        if channel_id is None:
+            missing.setdefault(name, []).append(subscription)
+        elif channel_id != subscription.channel_id:
+            _save_channel(subscription, channel_id)
+            updated += 1
+
+    logger.info(f"Creating {len(missing)} missing channels")
+    results = await asyncio.gather(
+        *(run_slack_call(_create_free_channel, name) for name in missing),
+        return_exceptions=True,
+    )
+
+    created = failed = 0
+    for (name, waiting), result in zip(missing.items(), results):
+        if isinstance(result, BaseException) or not result[1]:
+            logger.warning(f"Could not create channel {name}: {result}")
+            failed += 1
+            continue
+        channel_name, channel_id = result
+        channel_directory.add(channel_name, channel_id)
+        for subscription in waiting:
+            _save_channel(subscription, channel_id)
+        created += 1
+
+    logger.info(f"Channels reconciled: {updated=} {unarchived=} {created=} {failed=}")
+    return {
+        "updated": updated,
+        "unarchived": unarchived,
+        "created": created,
+        "failed": failed,
+    }
+
+
+async def warm_connections(count: int) -> None:
+    logger.info(f"Opening {count} Slack connections")
+    client = get_slack_client()
+    await asyncio.gather(*(run_slack_call(client.api_test) for _ in range(count)))
+
+
+async def warm_up() -> None:
+    try:
+        await warm_connections(int(os.getenv("WARMUP_CONNECTIONS", 4)))
+        await reconcile_channels()
+    except Exception:
+        logger.warning(f"Warm-up failed, continuing startup: {traceback.format_exc()}")
+
+
+def _subscription_name(subscription: Book | Technology) -> str:
+    if isinstance(subscription, Book):
+        return subscription.title
+    return subscription.name
+
+
+def _stored_channel_state(subscription: Book | Technology) -> str:
+    if not subscription.channel_id:
+        return "not_found"
+    try:
+        return get_channel_state(subscription.channel_id)
+    except Exception as error:
+        logger.warning(
+            f"Keeping {subscription.channel_id}, it could not be checked: {error}"
+        )
+        return "unknown"
+
+
+def _create_free_channel(name: str) -> tuple[str, str]:
+    for attempt in range(1, CHANNEL_NAME_ATTEMPTS + 1):
+        suffix = f"-{attempt}" if attempt > 1 else ""
+        candidate = f"{name[: CHANNEL_NAME_LIMIT - len(suffix)]}{suffix}"
+        try:
+            return candidate, create_channel(candidate)
+        except Exception as error:
+            if "name_taken" not in str(error):
+                raise
+            logger.warning(f"Channel name {candidate} is taken, trying another one")
+    raise Exception(f"No free channel name found for {name}")
+
+
+def _save_channel(subscription: Book | Technology, channel_id: str) -> None:
+    logger.info(f"Moving {_subscription_name(subscription)} to {channel_id=}")
+    subscription.channel_id = channel_id
+    if isinstance(subscription, Book):
+        write_book_to_db(Book.to_json(subscription))
+    else:
+        write_technology_to_db(Technology.to_json(subscription))
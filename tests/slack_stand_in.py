@@ -0,0 +1,149 @@
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+import json
+import random
+import threading
+import time
+
+
+class SlackStandIn:
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        handshake_seconds: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 1.0,
+        error_rate: float = 0.0,
+        channel_count: int = 0,
+        seed: int = 42,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.handshake_seconds = handshake_seconds
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.channels = [
+            {"name": f"channel-{index}", "id": f"C{index:08d}"}
+            for index in range(channel_count)
+        ]
+        self.messages: defaultdict[str, list[dict]] = defaultdict(list)
+        self.calls: Counter[str] = Counter()
+        self.rate_limited = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise Exception("Slack stand-in is not running")
+        return f"http://127.0.0.1:{self._server.server_port}/api/"
+
+    def start(self) -> "SlackStandIn":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler_for(self))
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "SlackStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def handle(self, method: str, arguments: dict) -> tuple[int, dict, dict]:
+        time.sleep(self.latency_seconds)
+
+        with self._lock:
+            self.calls[method] += 1
+            calls = sum(self.calls.values())
+            if self.rate_limit_every and calls % self.rate_limit_every == 0:
+                self.rate_limited += 1
+                return (
+                    429,
+                    {"Retry-After": str(self.retry_after)},
+                    {"ok": False, "error": "ratelimited"},
+                )
+            if self._random.random() < self.error_rate:
+                self.errors += 1
+                return 200, {}, {"ok": False, "error": "internal_error"}
+
+            return 200, {}, self._dispatch(method, arguments)
+
+    def _dispatch(self, method: str, arguments: dict) -> dict:
+        if method == "chat.postMessage":
+            channel = arguments.get("channel", "")
+            ts = f"{time.time():.6f}"
+            self.messages[channel].append({**arguments, "ts": ts})
+            return {"ok": True, "channel": channel, "ts": ts}
+        if method == "chat.update":
+            channel = arguments.get("channel", "")
+            for message in self.messages[channel]:
+                if message["ts"] == arguments.get("ts"):
+                    message.update(arguments)
+                    return {"ok": True, "channel": channel, "ts": message["ts"]}
+            return {"ok": False, "error": "message_not_found"}
+        if method == "conversations.list":
+            start = int(arguments.get("cursor") or 0)
+            end = start + int(arguments.get("limit") or 100)
+            return {
+                "ok": True,
+                "channels": self.channels[start:end],
+                "response_metadata": {
+                    "next_cursor": str(end) if end < len(self.channels) else ""
+                },
+            }
+        if method == "conversations.create":
+            name = arguments.get("name", "")
+            if any(channel["name"] == name for channel in self.channels):
+                return {"ok": False, "error": "name_taken"}
+            channel = {"name": name, "id": f"C{len(self.channels):08d}"}
+            self.channels.append(channel)
+            return {"ok": True, "channel": channel}
+        if method == "api.test":
+            return {"ok": True}
+        return {"ok": False, "error": "unknown_method"}
+
+
+def _handler_for(stand_in: SlackStandIn) -> type[BaseHTTPRequestHandler]:
+    class SlackStandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self) -> None:
+            super().setup()
+            time.sleep(stand_in.handshake_seconds)
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                arguments = json.loads(body or b"{}")
+            else:
+                arguments = dict(parse_qsl(body.decode("utf-8")))
+
+            method = self.path.rsplit("/", 1)[-1]
+            status, headers, payload = stand_in.handle(method, arguments)
+
+            content = json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return SlackStandInHandler
@@ -1,15 +1,38 @@
+import asyncio
 from src.ai_helper import (
     _send_prompt,
+    _send_prompt_async,
+    _stream_prompt,
+    build_page_request,
+    build_page_requests,
+    build_streamed_page_request,
+    chapter_cache_key,
+    close_async_client,
+    get_async_client,
     get_summary_for_book_by_chapter,
+    get_summary_for_book_by_chapter_async,
     get_summary_for_book_by_page,
+    get_summary_for_book_by_page_async,
     get_summary_for_technology,
+    get_summary_for_technology_async,
+    page_cache_key,
+    split_page_range,
+    stream_summary,
 )
+from src.cache_helper import summary_cache
+from src.constant import DEFAULT_AI_MODEL
+from src.metrics_helper import metrics
+from src.prompt_helper import MERGE_PREFIX, SUMMARY_PREFIX, TIP_PREFIX
+from src.rate_limit_helper import PromptLimiter
 import pytest
-from unittest.mock import patch
-from tests.test_utils import TestClient
+from unittest.mock import AsyncMock, patch
+from tests.test_utils import AsyncTestClient, StreamingTestClient, TestClient
 
 
 class TestAiHelper:
+    def setup_method(self):
+        summary_cache.clear()
+
     def test_send_good_prompt_should_return_good_prompt(self):
         prompt = (
             'This is a test prompt, answer only with the word "TEST OK" nothing else'
@@ -26,14 +49,16 @@ class TestAiHelper:
         )
 
     def test_get_summary_for_book_by_chapter_should_call_a_correct_prompt(self):
-        expected_prompt = "Please make a summary of the chapter 3 of the book MyTest by John - This summary should be detailed, it should be able to be read in under five minutes - Please refrain from using emojis etc.. use slack-flavored markdown for headers and highlighting the important words, phrases. Also I want your answer to ONLY CONTAIN THE SUMMARY, nothing else no hello or bye or question JUST the summary"
+        expected_prompt = f"{SUMMARY_PREFIX}\n\nRequest:\nPlease make a summary of the chapter 3 of the book MyTest by John."
 
         with patch("src.ai_helper._send_prompt") as mock_send_prompt:
             mock_send_prompt.return_value = "TEST OK"
 
             get_summary_for_book_by_chapter("MyTest", "John", 3)
 
-            mock_send_prompt.assert_called_once_with(prompt=expected_prompt)
+            mock_send_prompt.assert_called_once_with(
+                prompt=expected_prompt, kind="chapter", model=DEFAULT_AI_MODEL
+            )
 
     @pytest.mark.parametrize(
         "book_name, author, chapter", [("", "", 1), ("MyBook", "John", -1)]
@@ -67,24 +92,28 @@ class TestAiHelper:
         )
 
     def test_get_summary_for_book_by_page_should_call_a_correct_prompt(self):
-        expected_prompt = "Please make a summary of the pages 23 to 32 for the book MyBook by John - This summary can be detailed, it should be able to be read in under five minutes - Please refrain from using emojis etc.. Only use headings if necessary, highlight the important words, phrases. Also I want your answer to ONLY CONTAIN THE SUMMARY, nothing else no hello or bye or question JUST the summary"
+        expected_prompt = f"{SUMMARY_PREFIX}\n\nRequest:\nPlease make a summary of the pages 23 to 32 of the book MyBook by John."
 
         with patch("src.ai_helper._send_prompt") as mock_send_prompt:
             mock_send_prompt.return_value = "TEST OK"
 
             get_summary_for_book_by_page("MyBook", "John", 32, 23)
 
-            mock_send_prompt.assert_called_once_with(prompt=expected_prompt)
+            mock_send_prompt.assert_called_once_with(
+                prompt=expected_prompt, kind="page", model=DEFAULT_AI_MODEL
+            )
 
     def test_get_tips_for_technology_should_call_the_correct_prompt(self):
-        expected_prompt = "Please give me a tip or trick for using technology: SQLAlchemy - This tip or trick should be detailed with code example when necessary, Please refrain from using emojis etc.. use slack-flavored markdown for headers and highlighting the importan words, phrases. Also I want you answer to ONLY CONTAIN THE TIPS OR TRICKS, nothing else no hello or by or question JUST the tip"
+        expected_prompt = f"{TIP_PREFIX}\n\nRequest:\nPlease give me a tip or trick for using technology: SQLAlchemy."
 
         with patch("src.ai_helper._send_prompt") as mock_send_prompt:
             mock_send_prompt.return_value = "TEST OK"
 
             get_summary_for_technology("SQLAlchemy")
 
-            mock_send_prompt.assert_called_once_with(prompt=expected_prompt)
+            mock_send_prompt.assert_called_once_with(
+                prompt=expected_prompt, kind="tech", model=DEFAULT_AI_MODEL
+            )
 
     @pytest.mark.parametrize("technology_name", [(""), (None)])
     def test_get_tip_for_technology_with_invalid_value_should_raise_exception(
@@ -96,3 +125,255 @@ class TestAiHelper:
             str(exception.value)
             == f"Invalid value was given, aborting before send request {technology_name=}"
         )
+
+    def test_second_chapter_summary_should_be_served_from_cache(self):
+        with patch("src.ai_helper._send_prompt") as mock_send_prompt:
+            mock_send_prompt.return_value = "TEST OK"
+
+            first = get_summary_for_book_by_chapter("MyTest", "John", 3)
+            second = get_summary_for_book_by_chapter(" mytest ", "John", 3)
+
+            mock_send_prompt.assert_called_once()
+            assert first == second == "TEST OK"
+
+    def test_page_summary_should_be_served_from_cache(self):
+        with patch("src.ai_helper._send_prompt") as mock_send_prompt:
+            mock_send_prompt.return_value = "TEST OK"
+
+            get_summary_for_book_by_page("MyBook", "John", 32, 23)
+            get_summary_for_book_by_page("MyBook", "John", 32, 23)
+
+            mock_send_prompt.assert_called_once()
+
+    def test_cache_key_should_follow_the_routed_model(self):
+        with (
+            patch("src.ai_helper.model_router.choose", return_value="gpt-fallback"),
+            patch("src.ai_helper._send_prompt") as mock_send_prompt,
+        ):
+            mock_send_prompt.return_value = "FALLBACK"
+            get_summary_for_book_by_chapter("MyTest", "John", 3)
+
+        assert mock_send_prompt.call_args.kwargs["model"] == "gpt-fallback"
+        assert (
+            summary_cache.get(chapter_cache_key("MyTest", "John", 3, "gpt-fallback"))
+            == "FALLBACK"
+        )
+        assert (
+            summary_cache.get(chapter_cache_key("MyTest", "John", 3, DEFAULT_AI_MODEL))
+            is None
+        )
+
+    def test_technology_tip_should_be_served_from_cache_on_the_same_day(self):
+        with patch("src.ai_helper._send_prompt") as mock_send_prompt:
+            mock_send_prompt.return_value = "TEST OK"
+
+            get_summary_for_technology("SQLAlchemy")
+            get_summary_for_technology("SQLAlchemy")
+
+            mock_send_prompt.assert_called_once()
+
+    def test_empty_answer_should_not_be_cached(self):
+        with patch("src.ai_helper._send_prompt") as mock_send_prompt:
+            mock_send_prompt.return_value = ""
+
+            get_summary_for_book_by_chapter("MyTest", "John", 3)
+            get_summary_for_book_by_chapter("MyTest", "John", 3)
+
+            assert mock_send_prompt.call_count == 2
+
+
+class TestAsyncAiHelper:
+    def setup_method(self):
+        summary_cache.clear()
+        self.limiter = PromptLimiter(max_concurrency=2, tokens_per_minute=100000)
+
+    def test_send_prompt_async_should_return_output(self):
+        client = AsyncTestClient()
+        result = asyncio.run(
+            _send_prompt_async(prompt="prompt", limiter=self.limiter, client=client)
+        )
+        assert result == "TEST OK"
+        assert client.calls == 1
+
+    def test_send_empty_prompt_async_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            asyncio.run(_send_prompt_async(prompt="", limiter=self.limiter))
+        assert (
+            str(exception.value)
+            == "Empty prompt was given, aborting before sending request"
+        )
+
+    def test_async_client_should_be_shared_within_a_loop(self):
+        async def get_clients():
+            return get_async_client(), get_async_client()
+
+        with patch("src.ai_helper.AsyncOpenAI") as mock_client:
+            first, second = asyncio.run(get_clients())
+
+        mock_client.assert_called_once()
+        assert first is second
+
+    def test_async_client_should_be_closed_with_its_loop(self):
+        async def open_and_close():
+            client = get_async_client()
+            await close_async_client()
+            await close_async_client()
+            return client, get_async_client()
+
+        with patch("src.ai_helper.AsyncOpenAI") as mock_client:
+            mock_client.return_value.close = AsyncMock()
+            first, second = asyncio.run(open_and_close())
+
+        first.close.assert_awaited_once()
+        assert mock_client.call_count == 2
+
+    @pytest.mark.parametrize(
+        "call",
+        [
+            lambda limiter: get_summary_for_book_by_chapter_async(
+                "MyTest", "John", 3, limiter
+            ),
+            lambda limiter: get_summary_for_book_by_page_async(
+                "MyBook", "John", 32, 23, limiter
+            ),
+            lambda limiter: get_summary_for_technology_async("SQLAlchemy", limiter),
+        ],
+    )
+    def test_async_summaries_should_share_the_sync_cache(self, call):
+        with patch("src.ai_helper._send_prompt_async") as mock_send_prompt:
+            mock_send_prompt.return_value = "TEST OK"
+
+            assert asyncio.run(call(self.limiter)) == "TEST OK"
+            assert asyncio.run(call(self.limiter)) == "TEST OK"
+
+            mock_send_prompt.assert_called_once()
+
+
+class TestStreamSummary:
+    def setup_method(self):
+        summary_cache.clear()
+
+    def test_stream_should_yield_deltas_and_cache_the_summary(self):
+        client = StreamingTestClient(deltas=["Hello ", "world"])
+
+        assert list(stream_summary("key", "prompt", client)) == ["Hello ", "world"]
+        assert summary_cache.get("key") == "Hello world"
+
+    def test_cached_summary_should_be_yielded_at_once(self):
+        summary_cache.set("key", "Cached summary")
+
+        with patch("src.ai_helper._stream_prompt") as mock_stream:
+            assert list(stream_summary("key", "prompt")) == ["Cached summary"]
+
+        mock_stream.assert_not_called()
+
+    def test_stream_empty_prompt_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            list(_stream_prompt(prompt="", client=StreamingTestClient()))
+        assert (
+            str(exception.value)
+            == "Empty prompt was given, aborting before sending request"
+        )
+
+
+class TestMapReducePages:
+    def setup_method(self):
+        summary_cache.clear()
+        metrics.reset()
+
+    @pytest.mark.parametrize(
+        "current_page, target_page, max_pages, expected",
+        [
+            (0, 80, 30, [(0, 30), (31, 61), (62, 80)]),
+            (0, 62, 30, [(0, 30), (31, 61), (62, 62)]),
+            (10, 20, 30, [(10, 20)]),
+            (20, 20, 30, [(20, 20)]),
+        ],
+    )
+    def test_split_page_range(self, current_page, target_page, max_pages, expected):
+        assert split_page_range(current_page, target_page, max_pages) == expected
+
+    def test_split_with_invalid_size_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            split_page_range(0, 10, 0)
+        assert str(exception.value) == "Invalid split size given max_pages=0"
+
+    def test_large_range_should_be_summarized_then_merged(self):
+        with patch("src.ai_helper._send_prompt") as mock_send_prompt:
+            mock_send_prompt.side_effect = lambda prompt, kind, model: (
+                "merged"
+                if "Here are" in prompt
+                else prompt.split("pages ")[1].split(" of")[0]
+            )
+
+            summary = get_summary_for_book_by_page("MyBook", "John", 80, 0)
+
+        assert summary == "merged"
+        assert mock_send_prompt.call_count == 4
+        merge_prompt = mock_send_prompt.call_args.kwargs["prompt"]
+        assert merge_prompt.startswith(MERGE_PREFIX)
+        assert "Request:\nHere are 3 partial summaries" in merge_prompt
+        assert "Part 1:\n0 to 30\n" in merge_prompt
+        assert "Part 2:\n31 to 61\n" in merge_prompt
+        assert "Part 3:\n62 to 80" in merge_prompt
+        samples = metrics.snapshot()["samples"]
+        assert samples["map_reduce.map_seconds"]["count"] == 1
+        assert samples["map_reduce.reduce_seconds"]["count"] == 1
+
+    def test_large_range_should_be_requested_per_page_range(self):
+        requests = build_page_requests("MyBook", "John", 80, 0, DEFAULT_AI_MODEL)
+
+        assert [
+            prompt.split("pages ")[1].split(" of")[0] for _, prompt in requests
+        ] == [
+            "0 to 30",
+            "31 to 61",
+            "62 to 80",
+        ]
+        assert requests[0][0] == page_cache_key(
+            "MyBook", "John", 0, 30, DEFAULT_AI_MODEL
+        )
+        assert build_page_requests("MyBook", "John", 20, 0) == [
+            build_page_request("MyBook", "John", 20, 0)
+        ]
+
+    def test_streamed_large_range_should_only_stream_the_merge(self):
+        with patch("src.ai_helper._send_prompt") as mock_send_prompt:
+            mock_send_prompt.return_value = "partial"
+
+            key, prompt = build_streamed_page_request(
+                "MyBook", "John", 80, 0, DEFAULT_AI_MODEL
+            )
+
+        assert mock_send_prompt.call_count == 3
+        assert key == page_cache_key("MyBook", "John", 0, 80, DEFAULT_AI_MODEL)
+        assert "Request:\nHere are 3 partial summaries" in prompt
+        assert prompt.count(":\npartial") == 3
+
+    def test_streamed_request_should_not_map_small_or_cached_ranges(self):
+        key, prompt = build_page_request("MyBook", "John", 80, 0, DEFAULT_AI_MODEL)
+        summary_cache.set(key, "cached")
+
+        with patch("src.ai_helper._send_prompt") as mock_send_prompt:
+            assert build_streamed_page_request(
+                "MyBook", "John", 80, 0, DEFAULT_AI_MODEL
+            ) == (key, prompt)
+            assert build_streamed_page_request(
+                "MyBook", "John", 20, 0, DEFAULT_AI_MODEL
+            ) == build_page_request("MyBook", "John", 20, 0, DEFAULT_AI_MODEL)
+
+        mock_send_prompt.assert_not_called()
+
+    def test_large_range_should_be_merged_asynchronously(self):
+        limiter = PromptLimiter(max_concurrency=2, tokens_per_minute=100000)
+
+        with patch("src.ai_helper._send_prompt_async") as mock_send_prompt:
+            mock_send_prompt.return_value = "partial"
+
+            summary = asyncio.run(
+                get_summary_for_book_by_page_async("MyBook", "John", 80, 0, limiter)
+            )
+
+        assert summary == "partial"
+        assert mock_send_prompt.call_count == 4
+        assert mock_send_prompt.call_args.kwargs["prompt"].count(":\npartial") == 3
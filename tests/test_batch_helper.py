@@ -0,0 +1,220 @@
+from datetime import date
+import json
+import os
+import shutil
+from unittest.mock import MagicMock, patch
+import pytest
+import schedule
+from src.ai_helper import get_summary_for_book_by_page, get_summary_for_technology
+from src.batch_helper import (
+    BatchFailedError,
+    OpenAIBatchBackend,
+    _extract_output_text,
+    collect_daily_batch,
+    collect_due_requests,
+    schedule_batch_jobs,
+    submit_daily_batch,
+)
+from src.cache_helper import summary_cache
+from src.schedule_helper import maintenance_scheduler, schedule_jobs
+from tests.test_utils import (
+    LocalBatchBackend,
+    default_book_per_page,
+    default_finished_book_per_page_from_google,
+    default_technology,
+)
+
+
+class TestBatchPipeline:
+    def setup_method(self):
+        shutil.rmtree(os.getenv("BATCH_DIR", "test_batches"), ignore_errors=True)
+        os.makedirs("test_batch_backend", exist_ok=True)
+        summary_cache.clear()
+        schedule.clear()
+        default_book_per_page.current_page = 0
+        schedule_jobs(default_book_per_page)
+        schedule_jobs(default_technology)
+        schedule_jobs(default_finished_book_per_page_from_google)
+
+    def teardown_method(self):
+        shutil.rmtree("test_batch_backend", ignore_errors=True)
+        schedule.clear()
+
+    def test_collect_due_requests_should_skip_finished_books(self):
+        requests = collect_due_requests(date(2026, 1, 2))
+
+        assert len(requests) == 2
+        assert {request["url"] for request in requests} == {"/v1/responses"}
+        assert "Clean Code" in requests[0]["body"]["input"]
+        assert "SQLAlchemy" in requests[1]["body"]["input"]
+
+    def test_large_page_range_should_be_requested_per_range(self):
+        page_count = default_book_per_page.page_count
+        default_book_per_page.page_count = 1500
+        try:
+            requests = collect_due_requests(date(2026, 1, 2))
+        finally:
+            default_book_per_page.page_count = page_count
+
+        assert [request["body"]["input"].count("pages ") for request in requests] == [
+            1,
+            1,
+            1,
+            1,
+            0,
+        ]
+        assert "pages 93 to 100 of the book" in requests[3]["body"]["input"]
+
+    def test_collect_due_requests_should_ignore_jobs_without_subscription(self):
+        schedule.clear()
+        schedule.every().day.do(print)
+
+        assert collect_due_requests(date(2026, 1, 2)) == []
+
+    def test_no_due_prompts_should_skip_submission(self):
+        schedule.clear()
+        assert submit_daily_batch(LocalBatchBackend("test_batch_backend")) is None
+
+    def test_batch_results_should_be_served_at_delivery_time(self):
+        backend = LocalBatchBackend("test_batch_backend")
+
+        batch_id = submit_daily_batch(backend, date.today())
+
+        with open(os.path.join(os.getenv("BATCH_DIR", ""), "pending.json")) as file:
+            assert json.load(file) == [batch_id]
+
+        assert collect_daily_batch(backend) == 2
+
+        with patch("src.ai_helper._send_prompt") as mock_send_prompt:
+            assert get_summary_for_book_by_page(
+                "Clean Code", "ThatGuy", 8, 0
+            ).startswith("BATCH")
+            assert get_summary_for_technology("SQLAlchemy").startswith("BATCH")
+            mock_send_prompt.assert_not_called()
+
+        assert collect_daily_batch(backend) == 0
+
+    def test_running_batch_should_stay_pending(self):
+        backend = LocalBatchBackend("test_batch_backend", complete=False)
+        submit_daily_batch(backend)
+
+        assert collect_daily_batch(backend) == 0
+        with open(os.path.join(os.getenv("BATCH_DIR", ""), "pending.json")) as file:
+            assert len(json.load(file)) == 1
+
+    def test_failed_batch_should_be_dropped_from_pending(self):
+        client = MagicMock()
+        client.batches.retrieve.return_value.status = "failed"
+        backend = OpenAIBatchBackend(client)
+        with patch.object(backend, "submit", return_value="batch_failed"):
+            submit_daily_batch(backend)
+
+        assert collect_daily_batch(backend) == 0
+        with open(os.path.join(os.getenv("BATCH_DIR", ""), "pending.json")) as file:
+            assert json.load(file) == []
+
+    def test_unreachable_batch_should_stay_pending(self):
+        client = MagicMock()
+        client.batches.retrieve.side_effect = Exception("502 Bad Gateway")
+        backend = OpenAIBatchBackend(client)
+        with patch.object(backend, "submit", return_value="batch_running"):
+            submit_daily_batch(backend)
+
+        assert collect_daily_batch(backend) == 0
+        with open(os.path.join(os.getenv("BATCH_DIR", ""), "pending.json")) as file:
+            assert json.load(file) == ["batch_running"]
+
+    def test_failed_results_should_not_be_cached(self):
+        backend = MagicMock()
+        backend.submit.return_value = "batch_failed"
+        backend.is_complete.return_value = True
+        backend.results.return_value = [
+            {"custom_id": "key", "response": {"status_code": 500}}
+        ]
+        submit_daily_batch(backend)
+
+        assert collect_daily_batch(backend) == 0
+        assert summary_cache.get("key") is None
+
+    def test_schedule_batch_jobs_should_register_maintenance_jobs(self):
+        maintenance_scheduler.clear()
+
+        schedule_batch_jobs(LocalBatchBackend("test_batch_backend"))
+
+        assert len(maintenance_scheduler.jobs) == 2
+        assert schedule.jobs[0] not in maintenance_scheduler.jobs
+        maintenance_scheduler.clear()
+
+
+class TestOpenAIBatchBackend:
+    def setup_method(self):
+        self.client = MagicMock()
+        self.backend = OpenAIBatchBackend(client=self.client)
+
+    def test_submit_should_upload_file_and_create_batch(self):
+        os.makedirs("test_batch_backend", exist_ok=True)
+        with open("test_batch_backend/requests.jsonl", "w") as file:
+            file.write("{}\n")
+        self.client.files.create.return_value.id = "file_1"
+        self.client.batches.create.return_value.id = "batch_1"
+
+        assert self.backend.submit("test_batch_backend/requests.jsonl") == "batch_1"
+        self.client.batches.create.assert_called_once_with(
+            input_file_id="file_1", endpoint="/v1/responses", completion_window="24h"
+        )
+        shutil.rmtree("test_batch_backend")
+
+    @pytest.mark.parametrize(
+        "status, expected", [("completed", True), ("in_progress", False)]
+    )
+    def test_is_complete_should_follow_batch_status(self, status, expected):
+        self.client.batches.retrieve.return_value.status = status
+        assert self.backend.is_complete("batch_1") is expected
+
+    def test_failed_batch_should_raise_exception(self):
+        self.client.batches.retrieve.return_value.status = "expired"
+        with pytest.raises(BatchFailedError) as exception:
+            self.backend.is_complete("batch_1")
+        assert str(exception.value) == "Batch batch_1 ended with status expired"
+
+    def test_results_should_parse_output_file(self):
+        self.client.batches.retrieve.return_value.output_file_id = "file_2"
+        self.client.files.content.return_value.text = '{"custom_id": "a"}\n\n'
+
+        assert self.backend.results("batch_1") == [{"custom_id": "a"}]
+
+    def test_results_without_output_file_should_raise_exception(self):
+        self.client.batches.retrieve.return_value.output_file_id = None
+        with pytest.raises(BatchFailedError) as exception:
+            self.backend.results("batch_1")
+        assert str(exception.value) == "Batch batch_1 has no output file"
+
+    def test_default_client_should_be_openai(self):
+        with patch("src.batch_helper.OpenAI") as mock_openai:
+            assert OpenAIBatchBackend().client == mock_openai.return_value
+
+
+class TestExtractOutputText:
+    def test_non_message_items_should_be_ignored(self):
+        result = {
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "output": [
+                        {"type": "reasoning"},
+                        {
+                            "type": "message",
+                            "content": [
+                                {"type": "output_text", "text": "Hello "},
+                                {"type": "refusal"},
+                                {"type": "output_text", "text": "world"},
+                            ],
+                        },
+                    ]
+                },
+            }
+        }
+        assert _extract_output_text(result) == "Hello world"
+
+    def test_missing_response_should_return_empty_string(self):
+        assert _extract_output_text({"error": {"code": "boom"}}) == ""
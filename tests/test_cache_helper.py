@@ -0,0 +1,73 @@
+import os
+import pytest
+from src.cache_helper import SummaryCache
+
+
+class TestSummaryCache:
+    def setup_method(self):
+        self.cache = SummaryCache(
+            directory="test_summary_cache_unit", max_entries=2, max_bytes=10
+        )
+        self.cache.clear()
+
+    def teardown_method(self):
+        self.cache.clear()
+
+    def test_build_key_should_normalize_inputs(self):
+        assert SummaryCache.build_key(" Clean  Code ", 3) == SummaryCache.build_key(
+            "clean code", "3"
+        )
+        assert SummaryCache.build_key("Clean Code", 3) != SummaryCache.build_key(
+            "Clean Code", 4
+        )
+
+    def test_unknown_key_should_be_a_miss(self):
+        assert self.cache.get("unknown") is None
+        assert self.cache.stats()["misses"] == 1
+
+    def test_set_then_get_should_be_a_memory_hit(self):
+        self.cache.set("key", "summary")
+        assert self.cache.get("key") == "summary"
+        assert self.cache.stats()["hits"] == 1
+
+    def test_empty_summary_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            self.cache.set("key", "")
+        assert str(exception.value) == "Empty summary given for key='key'"
+
+    def test_memory_tier_should_evict_least_recently_used(self):
+        self.cache.set("first", "1")
+        self.cache.set("second", "2")
+        self.cache.get("first")
+        self.cache.set("third", "3")
+        assert list(self.cache._memory) == ["first", "third"]
+
+    def test_disk_tier_should_survive_a_new_instance(self):
+        self.cache.set("key", "summary")
+        fresh_cache = SummaryCache(
+            directory="test_summary_cache_unit", max_entries=2, max_bytes=10
+        )
+        assert fresh_cache.get("key") == "summary"
+        assert fresh_cache.stats()["memory_entries"] == 1
+
+    def test_disk_tier_should_evict_oldest_entries_over_budget(self):
+        self.cache.set("first", "12345")
+        os.utime(self.cache._path("first"), (0, 0))
+        self.cache.set("second", "12345")
+        self.cache.set("second", "123456")
+        assert not os.path.exists(self.cache._path("first"))
+        assert os.path.exists(self.cache._path("second"))
+        assert self.cache.stats()["disk_bytes"] == 6
+
+    def test_disk_size_should_be_computed_from_existing_entries(self):
+        self.cache.set("first", "12345")
+        fresh_cache = SummaryCache(
+            directory="test_summary_cache_unit", max_entries=2, max_bytes=10
+        )
+        fresh_cache.set("second", "1234")
+        assert fresh_cache.stats()["disk_bytes"] == 9
+
+    def test_clear_without_directory_should_not_fail(self):
+        cache = SummaryCache(directory="missing_cache_dir", max_entries=2, max_bytes=10)
+        cache.clear()
+        assert cache.stats()["disk_bytes"] == 0
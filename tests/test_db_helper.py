@@ -1,13 +1,20 @@
 from tinydb import TinyDB, Query
 import os
-from src.main import send_daily_book_summary, send_daily_tech_summary
 from src.db_helper import (
+    compact_progress,
+    progress_journal,
+    record_progress,
+    run_db_call,
+    schedule_progress_compaction,
+    jobs_repository,
+    repository,
+    open_repository,
+    save_job,
     load_book_by_isbn,
     load_books,
     load_jobs,
     load_technology_by_name,
     reset_jobs,
-    save_jobs,
     write_book_to_db,
     write_technology_to_db,
 )
@@ -19,10 +26,23 @@ from tests.test_utils import (
     second_book_json,
     default_book_per_page,
 )
+from src.lock_helper import LockedRepository
+from src.repository_helper import IndexedRepository, SqliteRepository
+from src.schedule_helper import maintenance_scheduler
+from src.domain import State
+from dataclasses import replace
+import asyncio
+import threading
+from unittest.mock import patch
 import pytest
 import schedule
 
 
+def _read_back(variable: str, default: str, query=None) -> list[dict]:
+    with TinyDB(os.getenv(variable, default)) as persisted:
+        return persisted.all() if query is None else persisted.search(query)
+
+
 class TestLoadBooks:
     def setup_method(self):
         self.db = TinyDB(os.getenv("DB_NAME", "books.json"))
@@ -93,17 +113,69 @@ class TestWriteBookToJSON:
 
     def test_write_valid_book_to_json(self):
         write_book_to_db(book=second_book_json)
-        result = self.db.search(Query().isbn == second_book_json.get("isbn"))
+        result = _read_back(
+            "DB_NAME", "books.json", Query().isbn == second_book_json.get("isbn")
+        )
         assert result[0] == second_book_json
 
     def test_update_valid_book_to_json(self):
         updated_dict = default_dict_from_json.copy()
         updated_dict["state"] = "finished"
         write_book_to_db(book=updated_dict)
-        result = self.db.search(Query().isbn == updated_dict.get("isbn"))
+        result = _read_back(
+            "DB_NAME", "books.json", Query().isbn == updated_dict.get("isbn")
+        )
         assert result[0] == updated_dict
 
 
+class TestProgressJournal:
+    def setup_method(self):
+        write_book_to_db(dict(default_dict_from_json))
+        compact_progress()
+
+    def test_recorded_progress_should_be_visible_before_compaction(self):
+        record_progress(replace(default_book_per_page, current_page=8))
+
+        assert load_book_by_isbn(default_book_per_page.isbn).current_page == 8
+        assert replace(default_book_per_page, current_page=8) in load_books()
+        assert (
+            _read_back(
+                "DB_NAME", "books.json", Query().isbn == default_book_per_page.isbn
+            )[0]["current_page"]
+            == 0
+        )
+
+    def test_compaction_should_write_the_progress_to_the_database(self):
+        record_progress(replace(default_book_per_page, current_page=8))
+        record_progress(
+            replace(default_book_per_page, current_page=16, state=State.FINISHED)
+        )
+
+        assert compact_progress() == 1
+
+        assert progress_journal.latest() == {}
+        persisted = _read_back(
+            "DB_NAME", "books.json", Query().isbn == default_book_per_page.isbn
+        )[0]
+        assert persisted["current_page"] == 16
+        assert persisted["state"] == "finished"
+        assert persisted["title"] == default_dict_from_json["title"]
+
+    def test_compaction_should_drop_progress_of_unknown_books(self):
+        record_progress(replace(default_book_per_page, isbn="0000000000000"))
+
+        assert compact_progress() == 1
+
+        assert load_book_by_isbn("0000000000000") is None
+
+    def test_compaction_should_run_periodically(self):
+        schedule_progress_compaction()
+
+        assert maintenance_scheduler.jobs[-1].interval == 60
+        assert maintenance_scheduler.jobs[-1].job_func.func is compact_progress
+        maintenance_scheduler.cancel_job(maintenance_scheduler.jobs[-1])
+
+
 class TestWriteTechnologyToJSON:
     def setup_method(self):
         self.db = TinyDB(os.getenv("DB_NAME", "books.json"))
@@ -119,19 +191,27 @@ class TestWriteTechnologyToJSON:
 
     def test_write_valid_book_to_json(self):
         write_technology_to_db(technology=second_technology_from_json)
-        result = self.db.search(Query().name == second_technology_from_json.get("name"))
+        result = _read_back(
+            "DB_NAME",
+            "books.json",
+            Query().name == second_technology_from_json.get("name"),
+        )
         assert result[0] == second_technology_from_json
 
     def test_update_valid_book_to_json(self):
         updated_dict = default_technology_from_json.copy()
         updated_dict["name"] = "Go"
         write_technology_to_db(technology=updated_dict)
-        result = self.db.search(Query().name == updated_dict.get("name"))
+        result = _read_back(
+            "DB_NAME", "books.json", Query().name == updated_dict.get("name")
+        )
         assert result[0] == updated_dict
 
 
 class TestLoadJobs:
     def setup_method(self):
+        write_book_to_db(second_book_json)
+        write_technology_to_db(default_technology_from_json)
         self.db = TinyDB(os.getenv("JOBS_DB_NAME", "test.json"))
         self.db.truncate()
         self.db.insert(
@@ -146,7 +226,7 @@ class TestLoadJobs:
 
     def test_loads_jobs_into_schedule(self):
         schedule.clear()
-        load_jobs()
+        assert load_jobs() == 2
 
         assert len(schedule.jobs) == 2
         for job in schedule.jobs:
@@ -155,31 +235,56 @@ class TestLoadJobs:
                 "send_daily_tech_summary",
             ]
 
+    def test_dangling_jobs_should_be_skipped(self):
+        self.db.insert({"isbn": "0000000000000", "object_type": "book"})
+        self.db.insert({"name": "Unknown technology", "object_type": "tech"})
+        self.db.insert({"object_type": "tech"})
+        schedule.clear()
 
-class TestSaveJobs:
-    def _test_job(self) -> None:
-        pass
+        with patch("src.db_helper.metrics.increment") as mock_increment:
+            assert load_jobs() == 2
 
-    def setup_method(self):
-        self.db = TinyDB(os.getenv("JOBS_DB_NAME", "test.json"))
+        assert len(schedule.jobs) == 2
+        mock_increment.assert_called_once_with("jobs.dangling", 3)
 
-    def test_saves_book_jobs_from_schedule(self):
+    def test_repository_should_be_scanned_once(self):
         schedule.clear()
-        schedule.every(1).seconds.do(send_daily_book_summary, default_book_per_page)
 
-        save_jobs()
-        jobs = self.db.all()
-        inserted_job = jobs[0]
-        assert inserted_job["isbn"] == default_book_per_page.isbn
+        with (
+            patch("src.db_helper.repository.all", wraps=repository.all) as mock_all,
+            patch("src.db_helper.repository.find") as mock_find,
+        ):
+            load_jobs()
+
+        mock_all.assert_called_once()
+        mock_find.assert_not_called()
 
-    def test_saves_tech_jobs_from_schedule(self):
+
+class TestSaveJob:
+    def setup_method(self):
+        jobs_repository.truncate()
         schedule.clear()
-        schedule.every(1).seconds.do(send_daily_tech_summary, default_technology)
 
-        save_jobs()
-        jobs = self.db.all()
-        inserted_job = jobs[0]
-        assert inserted_job["name"] == default_technology.name
+    def test_save_job_should_be_idempotent(self):
+        save_job(default_book_per_page)
+        save_job(default_book_per_page)
+        save_job(default_technology)
+
+        assert _read_back("JOBS_DB_NAME", "test.json") == [
+            {"isbn": default_book_per_page.isbn, "object_type": "book"},
+            {"name": default_technology.name, "object_type": "tech"},
+        ]
+
+    def test_invalid_subscription_should_raise(self):
+        with pytest.raises(Exception) as exception:
+            save_job(replace(default_technology, name=""))
+        assert "Invalid job subscription given" in str(exception.value)
+
+    def test_save_job_should_be_flushed_right_away(self):
+        with patch.object(jobs_repository, "flush") as mock_flush:
+            save_job(default_technology)
+
+        mock_flush.assert_called_once()
 
 
 class TestResetJobs:
@@ -196,5 +301,34 @@ class TestResetJobs:
 
         reset_jobs()
         assert len(schedule.jobs) == 0
-        jobs = self.db.all()
+        jobs = _read_back("JOBS_DB_NAME", "test.json")
         assert len(jobs) == 0
+
+
+class TestRunDbCall:
+    def test_calls_should_run_on_the_document_store_pool(self):
+        thread = asyncio.run(run_db_call(threading.current_thread))
+
+        assert thread.name.startswith("Document store")
+        assert thread is not threading.current_thread()
+
+
+class TestOpenRepository:
+    def test_sqlite_scheme_should_select_the_sqlite_backend(self):
+        repository = open_repository("sqlite:///test_repository.db")
+
+        assert isinstance(repository, LockedRepository)
+        assert isinstance(repository.repository, SqliteRepository)
+        assert repository.path == "test_repository.db"
+
+    def test_other_names_should_use_tinydb(self):
+        repository = open_repository(os.getenv("DB_NAME", "books.json"))
+
+        assert isinstance(repository.repository, IndexedRepository)
+        assert repository.flush_writes is False
+
+    def test_multi_process_mode_should_flush_every_write(self):
+        with patch.dict(os.environ, {"DB_MULTI_PROCESS": "true"}):
+            repository = open_repository("sqlite:///test_repository.db")
+
+        assert repository.flush_writes is True
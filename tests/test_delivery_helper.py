@@ -0,0 +1,318 @@
+import json
+import os
+import shutil
+import threading
+from functools import partial
+from unittest.mock import patch
+import pytest
+from slack_sdk.errors import SlackApiError
+from src.delivery_helper import (
+    DeliveryQueue,
+    queue_slack_message,
+    schedule_delivery_jobs,
+)
+from src.metrics_helper import metrics
+from src.rate_limit_helper import TokenBucket
+from src.schedule_helper import maintenance_scheduler
+from src.slack_helper import (
+    SlackPermanentError,
+    SlackRateLimitedError,
+    send_slack_message,
+)
+
+from tests.test_utils import BlockKitTestClient
+
+DIRECTORY = "test_deliveries_unit"
+
+
+class RecordingSender:
+    def __init__(self, failures: list[Exception] | None = None):
+        self.failures = list(failures or [])
+        self.sent: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def __call__(
+        self, channel_id: str, message: str, progress=None, before_post=None
+    ) -> bool:
+        if before_post:
+            before_post(progress)
+        with self._lock:
+            if self.failures:
+                raise self.failures.pop(0)
+            self.sent.append((channel_id, message))
+        return True
+
+
+class FlakyBlockKitClient(BlockKitTestClient):
+    def __init__(self):
+        super().__init__()
+        self.failed = False
+
+    def chat_postMessage(self, channel: str, text: str, blocks=None, thread_ts=None):
+        if thread_ts and not self.failed:
+            self.failed = True
+            raise Exception("connection reset")
+        return super().chat_postMessage(channel, text, blocks, thread_ts)
+
+
+class TestTokenBucket:
+    def test_bucket_should_delay_once_empty(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0.5
+        now[0] = 1.5
+        assert bucket.reserve() == 0
+
+    def test_invalid_bucket_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            TokenBucket(rate=0, capacity=1)
+        assert str(exception.value) == "Invalid bucket given rate=0 - capacity=1"
+
+
+class TestDeliveryQueue:
+    def setup_method(self):
+        shutil.rmtree(DIRECTORY, ignore_errors=True)
+        metrics.reset()
+        self.sleeps: list[float] = []
+
+    def teardown_method(self):
+        shutil.rmtree(DIRECTORY, ignore_errors=True)
+
+    def _queue(self, sender, max_attempts=3, channel_rate=1.0):
+        return DeliveryQueue(
+            directory=DIRECTORY,
+            channel_rate=channel_rate,
+            global_rate=100,
+            max_workers=4,
+            max_attempts=max_attempts,
+            sender=sender,
+            sleep=self.sleeps.append,
+        )
+
+    def test_messages_should_be_delivered_in_order_per_channel(self):
+        sender = RecordingSender()
+        queue = self._queue(sender)
+
+        for index in range(3):
+            queue.enqueue("C1", f"message {index}")
+        queue.enqueue("C2", "other channel")
+        queue.join()
+
+        assert [m for c, m in sender.sent if c == "C1"] == [
+            "message 0",
+            "message 1",
+            "message 2",
+        ]
+        assert ("C2", "other channel") in sender.sent
+        assert queue.stats() == {"depth": 0, "channels": 0, "undelivered": 0}
+        assert metrics.counters["delivery.sent"] == 4
+        assert metrics.snapshot()["samples"]["delivery.wait_seconds"]["count"] == 4
+
+    def test_channel_bucket_should_pace_a_burst(self):
+        queue = self._queue(RecordingSender(), channel_rate=1)
+
+        for index in range(3):
+            queue.enqueue("C1", f"message {index}")
+        queue.join()
+
+        assert len([delay for delay in self.sleeps if delay > 0]) >= 1
+
+    def test_rate_limited_delivery_should_honor_retry_after(self):
+        sender = RecordingSender([SlackRateLimitedError("Rate limited", 7)])
+        queue = self._queue(sender)
+
+        queue.enqueue("C1", "hello")
+        queue.join()
+
+        assert 7 in self.sleeps
+        assert sender.sent == [("C1", "hello")]
+        assert metrics.counters["delivery.rate_limited"] == 1
+
+    def test_failed_delivery_should_stay_on_disk_and_be_retried(self):
+        sender = RecordingSender([Exception("boom")] * 2)
+        queue = self._queue(sender, max_attempts=2)
+
+        queue.enqueue("C1", "hello")
+        queue.join()
+
+        assert sender.sent == []
+        assert queue.stats()["undelivered"] == 1
+        assert metrics.counters["delivery.failed"] == 1
+
+        restarted = self._queue(sender)
+        assert restarted.retry_undelivered() == 1
+        restarted.join()
+
+        assert sender.sent == [("C1", "hello")]
+        assert os.listdir(DIRECTORY) == []
+
+    def test_retry_should_skip_missing_directory_and_queued_messages(self):
+        assert self._queue(RecordingSender()).retry_undelivered() == 0
+
+        os.makedirs(DIRECTORY)
+        with open(os.path.join(DIRECTORY, "ignored.tmp"), "w") as file:
+            file.write("{}")
+        assert self._queue(RecordingSender()).retry_undelivered() == 0
+
+    def test_retry_should_not_queue_a_message_twice(self):
+        release = threading.Event()
+        sender = RecordingSender()
+        queue = self._queue(
+            lambda channel, message, **kwargs: (
+                release.wait() and sender(channel, message)
+            )
+        )
+
+        queue.enqueue("C1", "hello")
+        assert queue.retry_undelivered() == 0
+        release.set()
+        queue.join()
+
+        assert sender.sent == [("C1", "hello")]
+
+    def test_retry_should_skip_files_that_vanish(self):
+        queue = self._queue(RecordingSender())
+        os.makedirs(DIRECTORY)
+        with open(os.path.join(DIRECTORY, "gone.json"), "w") as file:
+            file.write("{}")
+
+        with patch("builtins.open", side_effect=FileNotFoundError):
+            assert queue.retry_undelivered() == 0
+
+    def test_vanished_file_should_still_count_as_sent(self):
+        queue = self._queue(
+            lambda channel, message, **kwargs: os.remove(
+                os.path.join(DIRECTORY, os.listdir(DIRECTORY)[0])
+            )
+        )
+
+        queue.enqueue("C1", "hello")
+        queue.join()
+
+        assert metrics.counters["delivery.sent"] == 1
+        assert queue.stats() == {"depth": 0, "channels": 0, "undelivered": 0}
+
+    def test_crashing_delivery_should_not_wedge_the_channel(self):
+        sender = RecordingSender()
+        queue = self._queue(sender)
+
+        with patch.object(
+            queue, "_deliver", side_effect=[OSError("disk"), True]
+        ) as deliver:
+            queue.enqueue("C1", "first")
+            queue.join()
+            queue.enqueue("C1", "second")
+            queue.join()
+
+        assert deliver.call_count == 2
+        assert queue.stats()["depth"] == 0
+        assert metrics.counters["delivery.crashed"] == 1
+
+    def test_permanent_error_should_be_dead_lettered(self):
+        sender = RecordingSender([SlackPermanentError("channel_not_found")])
+        queue = self._queue(sender)
+
+        delivery_id = queue.enqueue("C1", "hello")
+        queue.join()
+
+        assert sender.sent == []
+        assert queue.stats()["undelivered"] == 0
+        assert os.listdir(os.path.join(DIRECTORY, "dead_letter")) == [
+            f"{delivery_id}.json"
+        ]
+        assert metrics.counters["delivery.dead_lettered"] == 1
+        assert queue.retry_undelivered() == 0
+
+    def test_every_post_should_take_a_token(self):
+        client = BlockKitTestClient()
+        queue = self._queue(partial(send_slack_message, client=client, structured=True))
+
+        queue.enqueue("C1", "word " * 40_000)
+        queue.join()
+
+        assert len(client.posts) == 2
+        assert len(self.sleeps) == 2
+        assert self.sleeps[1] > 0
+
+    def test_failed_thread_should_resume_where_it_stopped(self):
+        client = FlakyBlockKitClient()
+        sender = partial(send_slack_message, client=client, structured=True)
+
+        queue = self._queue(sender, max_attempts=1)
+        delivery_id = queue.enqueue("C1", "word " * 40_000)
+        queue.join()
+        with open(os.path.join(DIRECTORY, f"{delivery_id}.json")) as file:
+            assert json.load(file)["progress"] == {
+                "parts_sent": 1,
+                "thread_ts": "1700000000.000001",
+            }
+
+        restarted = self._queue(sender)
+        assert restarted.retry_undelivered() == 1
+        restarted.join()
+
+        assert [post["thread_ts"] for post in client.posts] == [
+            None,
+            "1700000000.000001",
+        ]
+        assert os.listdir(DIRECTORY) == []
+
+    def test_join_with_timeout_should_return(self):
+        release = threading.Event()
+        queue = self._queue(lambda channel, message, **kwargs: release.wait())
+
+        queue.enqueue("C1", "hello")
+        queue.join(timeout=0.01)
+        queue.enqueue("C1", "queued behind")
+        assert queue.stats()["depth"] == 2
+
+        release.set()
+        queue.join()
+
+    def test_invalid_message_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            self._queue(RecordingSender()).enqueue("", "hello")
+        assert str(exception.value) == "Wrong argument given  - hello"
+
+    def test_queue_slack_message_should_use_the_shared_queue(self):
+        with patch("src.delivery_helper.delivery_queue") as mock_queue:
+            mock_queue.enqueue.return_value = "id"
+            assert queue_slack_message("C1", "hello") == "id"
+        mock_queue.enqueue.assert_called_once_with("C1", "hello")
+
+    def test_schedule_delivery_jobs_should_retry_now_and_periodically(self):
+        with patch("src.delivery_helper.delivery_queue") as mock_queue:
+            schedule_delivery_jobs()
+
+        mock_queue.retry_undelivered.assert_called_once()
+        assert maintenance_scheduler.jobs[-1].interval == 10
+        maintenance_scheduler.cancel_job(maintenance_scheduler.jobs[-1])
+
+
+class TestSlackRateLimit:
+    def test_429_should_raise_rate_limited_error(self):
+        class FakeResponse(dict):
+            status_code = 429
+            headers = {"retry-after": "3"}
+
+        with patch("slack_sdk.WebClient.chat_postMessage") as patched:
+            patched.side_effect = SlackApiError(
+                message="ratelimited", response=FakeResponse(error="ratelimited")
+            )
+            with pytest.raises(SlackRateLimitedError) as exception:
+                send_slack_message(channel_id="C1", message="hello")
+
+        assert exception.value.retry_after == 3
+
+    def test_channel_not_found_should_raise_permanent_error(self):
+        with patch("slack_sdk.WebClient.chat_postMessage") as patched:
+            patched.side_effect = SlackApiError(
+                message="channel_not_found", response={"error": "channel_not_found"}
+            )
+            with pytest.raises(SlackPermanentError) as exception:
+                send_slack_message(channel_id="C1", message="hello")
+
+        assert str(exception.value) == "Error sending message: channel_not_found"
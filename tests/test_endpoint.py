@@ -1,6 +1,9 @@
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 from endpoint import app
+import hashlib
+import hmac
+import os
 import time
 
 
@@ -24,6 +27,35 @@ class TestSlackHello:
         assert response.json()["error"] == "Unsupported command"
 
 
+class TestSignatureMiddleware:
+    def _headers(self, timestamp: str, body: bytes) -> dict:
+        signature = hmac.new(
+            os.getenv("SLACK_SIGNING_SECRET", "").encode(),
+            f"v0:{timestamp}:".encode() + body,
+            hashlib.sha256,
+        ).hexdigest()
+        return {
+            "X-Slack-Request-Timestamp": timestamp,
+            "X-Slack-Signature": f"v0={signature}",
+        }
+
+    def test_replayed_request_should_be_rejected(self):
+        body = b"command=%2Fhello"
+        headers = self._headers(str(int(time.time())), body)
+
+        first = client.post("/slack/hello", content=body, headers=headers)
+        replay = client.post("/slack/hello", content=body, headers=headers)
+
+        assert first.status_code == 200
+        assert replay.status_code == 403
+
+    def test_other_routes_should_not_be_verified(self):
+        with patch("endpoint.verify_slack_request") as mock_verify:
+            response = client.get("/openapi.json")
+        assert response.status_code == 200
+        mock_verify.assert_not_called()
+
+
 class TestSlackResetSchedule:
     def test_reset_schedule_valid_signature(self):
         with (
@@ -175,13 +207,102 @@ class TestSlackEvents:
         assert json_data["text"] == "Oh oh! An error occured - Something went wrong"
 
 
+class TestSlackUsageCommand:
+    def test_usage_success(self):
+        with (
+            patch("endpoint.verify_slack_request", return_value=True),
+            patch("endpoint.handle_usage_command", return_value="Top 3") as mock_usage,
+        ):
+            response = client.post(
+                "/slack/events", data={"command": "/usage", "text": "3"}
+            )
+        assert response.json()["text"] == "Top 3"
+        mock_usage.assert_called_once_with("3")
+
+    def test_usage_failure(self):
+        with (
+            patch("endpoint.verify_slack_request", return_value=True),
+            patch(
+                "endpoint.handle_usage_command",
+                side_effect=Exception("Something went wrong"),
+            ),
+        ):
+            response = client.post("/slack/events", data={"command": "/usage"})
+        assert (
+            response.json()["text"] == "Oh oh! An error occured - Something went wrong"
+        )
+
+
+class TestSlackStatsCommand:
+    def test_stats_success(self):
+        with (
+            patch("endpoint.verify_slack_request", return_value=True),
+            patch("endpoint.handle_stats_command", return_value="Current metrics:"),
+        ):
+            response = client.post("/slack/events", data={"command": "/stats"})
+        assert response.json()["text"] == "Current metrics:"
+
+    def test_stats_failure(self):
+        with (
+            patch("endpoint.verify_slack_request", return_value=True),
+            patch(
+                "endpoint.handle_stats_command",
+                side_effect=Exception("Something went wrong"),
+            ),
+        ):
+            response = client.post("/slack/events", data={"command": "/stats"})
+        assert (
+            response.json()["text"] == "Oh oh! An error occured - Something went wrong"
+        )
+
+
 class TestSchedulerLifespan:
     def test_scheduler_loop_started_and_cancelled_on_shutdown(self):
         with (
             patch("endpoint.load_jobs") as mock_load_jobs,
-            patch("endpoint.schedule.run_pending") as mock_run_pending,
+            patch("endpoint.schedule_prefetch_jobs") as mock_schedule_prefetch,
+            patch("endpoint.run_pending_jobs") as mock_run_pending,
         ):
             with TestClient(app):
                 time.sleep(0.2)
         mock_load_jobs.assert_called_once()
+        mock_schedule_prefetch.assert_called_once()
         assert mock_run_pending.called
+
+    def test_batch_mode_should_schedule_offline_generation(self):
+        with (
+            patch("endpoint.load_jobs"),
+            patch("endpoint.schedule_prefetch_jobs"),
+            patch("endpoint.batch_mode", True),
+            patch("endpoint.OpenAIBatchBackend") as mock_backend,
+            patch("endpoint.schedule_batch_jobs") as mock_schedule_batch,
+            patch("endpoint.run_pending_jobs"),
+        ):
+            with TestClient(app):
+                time.sleep(0.2)
+        mock_schedule_batch.assert_called_once_with(mock_backend.return_value)
+
+    def test_warm_up_should_run_before_the_scheduler(self):
+        calls = []
+        with (
+            patch("endpoint.startup_warmup", True),
+            patch("endpoint.warm_up", side_effect=lambda: calls.append("warm_up")),
+            patch("endpoint.load_jobs", side_effect=lambda: calls.append("load_jobs")),
+            patch("endpoint.schedule_prefetch_jobs"),
+            patch("endpoint.run_pending_jobs"),
+        ):
+            with TestClient(app):
+                time.sleep(0.2)
+        assert calls == ["warm_up", "load_jobs"]
+
+    def test_failing_jobs_should_not_stop_the_scheduler(self):
+        with (
+            patch("endpoint.load_jobs"),
+            patch("endpoint.schedule_prefetch_jobs"),
+            patch(
+                "endpoint.run_pending_jobs", side_effect=Exception("boom")
+            ) as mock_run,
+        ):
+            with TestClient(app):
+                time.sleep(0.2)
+        mock_run.assert_called()
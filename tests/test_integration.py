@@ -8,6 +8,7 @@ import httpx
 import schedule
 from endpoint import app
 
+from src.cache_helper import summary_cache
 from src.main import send_daily_book_summary, send_daily_tech_summary
 from tests.test_utils import default_book_for_integration, default_tech_for_integation
 
@@ -21,6 +22,7 @@ class TestIntegrationTestBookHappyPath:
         self.jobs_db.truncate()
         self.db = TinyDB(os.getenv("DB_NAME", "test_db.json"))
         self.db.truncate()
+        summary_cache.clear()
         schedule.clear()
 
     @patch("src.main.get_channel_id")
@@ -28,7 +30,7 @@ class TestIntegrationTestBookHappyPath:
     @patch("endpoint.verify_slack_request")
     @patch("src.main.get_book_isbn")
     @patch("src.ai_helper._send_prompt")
-    @patch("src.main.send_slack_message")
+    @patch("src.main.queue_slack_message")
     def test_integration_book_happy_path(
         self,
         mock_send_slack,
@@ -76,12 +78,13 @@ class TestIntegrationTestTechHappyPath:
         self.jobs_db.truncate()
         self.db = TinyDB(os.getenv("DB_NAME", "test_db.json"))
         self.db.truncate()
+        summary_cache.clear()
         schedule.clear()
 
     @patch("src.main.get_channel_id")
     @patch("endpoint.verify_slack_request")
     @patch("src.ai_helper._send_prompt")
-    @patch("src.main.send_slack_message")
+    @patch("src.main.queue_slack_message")
     def test_integration_tech_happy_path(
         self,
         mock_send_slack,
@@ -0,0 +1,198 @@
+import multiprocessing
+import os
+from dataclasses import replace
+from unittest.mock import MagicMock
+import pytest
+from src.domain import State
+from src.journal_helper import RECORD, ProgressJournal
+from src.metrics_helper import metrics
+from tests.test_utils import default_book_per_page
+
+
+def _process_appender(path: str, worker: int, appends: int) -> None:
+    journal = ProgressJournal(path, fsync="never")
+    for page in range(appends):
+        journal.append(
+            replace(default_book_per_page, isbn=str(worker), current_page=page)
+        )
+
+
+class TestProgressJournal:
+    def setup_method(self):
+        self.path = "test_journal.journal"
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        metrics.reset()
+        self.journal = ProgressJournal(self.path, fsync="always", clock=lambda: 42.0)
+
+    def teardown_method(self):
+        for path in (self.path, f"{os.path.abspath(self.path)}.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_invalid_fsync_policy_should_raise(self):
+        with pytest.raises(Exception) as exception:
+            ProgressJournal(self.path, fsync="sometimes")
+        assert (
+            str(exception.value) == "Invalid progress journal given fsync='sometimes'"
+        )
+
+    def test_appends_should_be_fixed_size_records(self):
+        self.journal.append(default_book_per_page)
+        self.journal.append(replace(default_book_per_page, current_page=8))
+
+        assert os.path.getsize(self.path) == 2 * RECORD.size
+        assert metrics.counters["journal.appends"] == 2
+
+    def test_invalid_isbn_should_raise(self):
+        with pytest.raises(Exception) as exception:
+            self.journal.append(replace(default_book_per_page, isbn="9" * 33))
+        assert "Invalid isbn for the progress journal" in str(exception.value)
+        assert not os.path.exists(self.path)
+
+    def test_entries_should_be_an_audit_trail(self):
+        self.journal.append(default_book_per_page)
+        self.journal.append(
+            replace(default_book_per_page, current_page=8, state=State.FINISHED)
+        )
+
+        assert self.journal.entries() == [
+            {
+                "isbn": default_book_per_page.isbn,
+                "current_chapter": 0,
+                "current_page": 0,
+                "state": "on_going",
+                "recorded_at": 42.0,
+            },
+            {
+                "isbn": default_book_per_page.isbn,
+                "current_chapter": 0,
+                "current_page": 8,
+                "state": "finished",
+                "recorded_at": 42.0,
+            },
+        ]
+
+    def test_latest_progress_should_be_rebuilt_by_replay(self):
+        self.journal.append(replace(default_book_per_page, current_page=8))
+        self.journal.append(replace(default_book_per_page, current_page=16))
+        self.journal.append(replace(default_book_per_page, isbn="1", current_page=3))
+
+        replayed = ProgressJournal(self.path).latest()
+
+        assert replayed[default_book_per_page.isbn]["current_page"] == 16
+        assert replayed["1"]["current_page"] == 3
+
+    def test_torn_tail_should_be_dropped_on_replay(self):
+        self.journal.append(replace(default_book_per_page, current_page=8))
+        with open(self.path, "ab") as file:
+            file.write(b"\x01" * (RECORD.size // 2))
+
+        journal = ProgressJournal(self.path)
+        assert journal.latest()[default_book_per_page.isbn]["current_page"] == 8
+        assert os.path.getsize(self.path) == RECORD.size
+
+        journal.append(replace(default_book_per_page, current_page=16))
+        assert len(ProgressJournal(self.path).entries()) == 2
+
+    def test_corrupted_record_should_end_the_replay(self):
+        self.journal.append(replace(default_book_per_page, current_page=8))
+        self.journal.append(replace(default_book_per_page, current_page=16))
+        with open(self.path, "r+b") as file:
+            file.seek(RECORD.size + 10)
+            file.write(b"X")
+
+        assert ProgressJournal(self.path).entries()[-1]["current_page"] == 8
+        assert os.path.getsize(self.path) == RECORD.size
+
+    def test_apply_should_overlay_the_latest_progress(self):
+        document = {"isbn": default_book_per_page.isbn, "title": "Clean Code"}
+        assert self.journal.apply(document) is document
+
+        self.journal.append(
+            replace(default_book_per_page, current_page=8, state=State.FINISHED)
+        )
+
+        assert self.journal.apply(document) == {
+            "isbn": default_book_per_page.isbn,
+            "title": "Clean Code",
+            "current_chapter": 0,
+            "current_page": 8,
+            "state": "finished",
+        }
+
+    def test_compaction_should_snapshot_and_empty_the_journal(self):
+        self.journal.append(replace(default_book_per_page, current_page=8))
+        self.journal.append(replace(default_book_per_page, current_page=16))
+        snapshot = MagicMock()
+
+        assert self.journal.compact(snapshot) == 1
+
+        snapshot.assert_called_once()
+        assert snapshot.call_args.args[0][0]["current_page"] == 16
+        assert os.path.getsize(self.path) == 0
+        assert self.journal.latest() == {}
+        assert metrics.counters["journal.compacted_events"] == 1
+        assert self.journal.compact(snapshot) == 0
+
+    def test_failed_snapshot_should_keep_the_journal(self):
+        self.journal.append(replace(default_book_per_page, current_page=8))
+
+        with pytest.raises(Exception):
+            self.journal.compact(MagicMock(side_effect=Exception("disk full")))
+
+        assert os.path.getsize(self.path) == RECORD.size
+        assert self.journal.latest()[default_book_per_page.isbn]["current_page"] == 8
+
+    def test_missing_journal_should_have_no_entries(self):
+        assert self.journal.entries() == []
+        assert self.journal.latest() == {}
+
+    def test_instances_should_see_each_others_appends(self):
+        other = ProgressJournal(self.path, fsync="never")
+
+        self.journal.append(replace(default_book_per_page, current_page=8))
+        assert other.latest()[default_book_per_page.isbn]["current_page"] == 8
+
+        other.append(replace(default_book_per_page, current_page=16))
+        assert self.journal.latest()[default_book_per_page.isbn]["current_page"] == 16
+        assert (
+            self.journal.apply({"isbn": default_book_per_page.isbn})["current_page"]
+            == 16
+        )
+
+    def test_compaction_by_another_instance_should_drop_the_cache(self):
+        other = ProgressJournal(self.path, fsync="never")
+        self.journal.append(replace(default_book_per_page, current_page=8))
+        assert len(other.latest()) == 1
+
+        self.journal.compact(MagicMock())
+        assert other.latest() == {}
+
+        other.append(replace(default_book_per_page, current_page=16))
+        self.journal.compact(MagicMock())
+        self.journal.append(replace(default_book_per_page, isbn="1", current_page=3))
+        assert list(other.latest()) == ["1"]
+
+    def test_appending_processes_should_not_lose_records(self):
+        processes, appends = 4, 25
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_process_appender, args=(self.path, worker, appends))
+            for worker in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+
+        assert [worker.exitcode for worker in workers] == [0] * processes
+        assert len(self.journal.entries()) == processes * appends
+        assert {
+            isbn: event["current_page"] for isbn, event in self.journal.latest().items()
+        } == {str(worker): appends - 1 for worker in range(processes)}
+
+    def test_from_env_should_read_the_journal_path(self):
+        journal = ProgressJournal.from_env()
+        assert journal.path == "test_progress.journal"
+        assert journal.fsync == "never"
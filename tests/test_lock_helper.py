@@ -0,0 +1,326 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from tinydb import TinyDB
+from src.lock_helper import (
+    FileLock,
+    LockedRepository,
+    ReadWriteLock,
+    _reset_file_locks_after_fork,
+    file_lock,
+)
+from src.repository_helper import IndexedRepository, SqliteRepository
+from src.storage_helper import WriteBehindStorage
+
+LOCKED_PATH = "test_locked.json"
+
+
+def _remove(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _locked_repository(
+    path: str = LOCKED_PATH, flush_writes: bool = False, **storage
+) -> LockedRepository:
+    return LockedRepository(
+        IndexedRepository(
+            TinyDB(path, storage=WriteBehindStorage, fsync="never", **storage), path
+        ),
+        path,
+        flush_writes,
+    )
+
+
+def _increment(repository: LockedRepository) -> None:
+    with repository.write():
+        counter = repository.find("name", "counter")
+        repository.upsert({"name": "counter", "count": counter["count"] + 1}, "name")
+
+
+def _process_writer(worker: int, writes: int) -> None:
+    repository = _locked_repository(flush_writes=True)
+    for index in range(writes):
+        repository.upsert({"isbn": f"{worker}-{index}", "object_type": "book"}, "isbn")
+        _increment(repository)
+    repository.close()
+
+
+def _can_lock_from_another_process(path: str) -> bool:
+    return (
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import fcntl, os, sys; "
+                f"descriptor = os.open({path!r}, os.O_RDWR | os.O_CREAT); "
+                "fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)",
+            ],
+            capture_output=True,
+        ).returncode
+        == 0
+    )
+
+
+class TestReadWriteLock:
+    def setup_method(self):
+        self.lock = ReadWriteLock()
+
+    def _in_thread(self, target) -> threading.Thread:
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_readers_should_share_the_lock(self):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def read() -> None:
+            with self.lock.read():
+                barrier.wait()
+
+        threads = [self._in_thread(read) for _ in range(2)]
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+
+    def test_writer_should_exclude_readers(self):
+        acquired = threading.Event()
+
+        def read() -> None:
+            with self.lock.read():
+                acquired.set()
+
+        with self.lock.write():
+            thread = self._in_thread(read)
+            assert not acquired.wait(0.1)
+        assert acquired.wait(2)
+        thread.join()
+
+    def test_waiting_writer_should_go_before_new_readers(self):
+        order = []
+        writer_waiting = threading.Event()
+
+        def write() -> None:
+            writer_waiting.set()
+            with self.lock.write():
+                order.append("writer")
+
+        def read() -> None:
+            with self.lock.read():
+                order.append("reader")
+
+        with self.lock.read():
+            writer = self._in_thread(write)
+            writer_waiting.wait(2)
+            time.sleep(0.05)
+            reader = self._in_thread(read)
+            time.sleep(0.05)
+            assert order == []
+
+        writer.join(2)
+        reader.join(2)
+        assert order == ["writer", "reader"]
+
+    def test_locks_should_be_reentrant(self):
+        with self.lock.read():
+            with self.lock.read():
+                pass
+        with self.lock.write():
+            with self.lock.read():
+                with self.lock.write():
+                    pass
+
+        with self.lock.write():
+            pass
+
+    def test_upgrading_a_read_lock_should_raise(self):
+        with self.lock.read():
+            with pytest.raises(Exception) as exception:
+                with self.lock.write():
+                    pass
+        assert str(exception.value) == "Cannot upgrade a read lock to a write lock"
+
+
+class TestFileLock:
+    def setup_method(self):
+        self.path = f"{os.path.abspath(LOCKED_PATH)}.lock"
+        _remove(self.path)
+
+    def teardown_method(self):
+        _remove(self.path)
+
+    def test_lock_should_exclude_other_processes(self):
+        lock = file_lock(LOCKED_PATH)
+
+        with lock:
+            with lock:
+                assert not _can_lock_from_another_process(self.path)
+            assert not _can_lock_from_another_process(self.path)
+
+        assert _can_lock_from_another_process(self.path)
+
+    def test_locks_should_be_shared_per_path(self):
+        assert file_lock(LOCKED_PATH) is file_lock(os.path.abspath(LOCKED_PATH))
+        assert file_lock(LOCKED_PATH).path == self.path
+
+    def test_failed_lock_should_release_the_thread_lock(self):
+        lock = FileLock(self.path)
+
+        with patch("src.lock_helper.fcntl.flock", side_effect=OSError("no locks")):
+            with pytest.raises(OSError):
+                lock.__enter__()
+
+        released = threading.Thread(target=lambda: lock.__enter__().__exit__())
+        released.start()
+        released.join(2)
+        assert not released.is_alive()
+
+    def test_fork_should_reset_inherited_locks(self):
+        lock = file_lock(LOCKED_PATH)
+        with lock:
+            pass
+        assert lock._descriptor is not None
+
+        _reset_file_locks_after_fork()
+
+        assert lock._descriptor is None
+        with lock:
+            assert not _can_lock_from_another_process(self.path)
+
+
+class TestLockedRepository:
+    def setup_method(self):
+        _remove(LOCKED_PATH)
+
+    def teardown_method(self):
+        _remove(LOCKED_PATH, f"{os.path.abspath(LOCKED_PATH)}.lock")
+
+    def test_operations_should_be_delegated(self):
+        repository = _locked_repository(flush_interval=0)
+
+        repository.upsert({"isbn": "1", "object_type": "book"}, "isbn")
+        assert repository.insert_many([{"name": "Python", "object_type": "tech"}]) == 1
+        assert repository.find("isbn", "1") == {"isbn": "1", "object_type": "book"}
+        assert len(repository.of_type("tech")) == 1
+        assert repository.remove("name", "Python") is True
+        assert len(repository.all()) == 1
+
+        repository.truncate()
+        repository.flush()
+        assert repository.all() == []
+        repository.close()
+
+    def test_writes_should_stay_buffered_by_default(self):
+        repository = _locked_repository(flush_interval=0)
+
+        repository.upsert({"isbn": "1"}, "isbn")
+
+        assert not os.path.exists(LOCKED_PATH)
+        repository.close()
+
+    def test_multi_process_writes_should_be_flushed_once_per_write(self):
+        repository = _locked_repository(flush_writes=True, flush_interval=0)
+
+        with repository.write():
+            repository.upsert({"isbn": "1"}, "isbn")
+            assert repository.find("isbn", "1") == {"isbn": "1"}
+            repository.upsert({"isbn": "2"}, "isbn")
+            assert not os.path.exists(LOCKED_PATH)
+
+        with open(LOCKED_PATH, encoding="utf-8") as file:
+            assert len(json.load(file)["_default"]) == 2
+        repository.close()
+
+    def test_multi_process_writes_should_reload_other_processes_writes(self):
+        repository = _locked_repository(flush_writes=True, flush_interval=0)
+        repository.upsert({"isbn": "1"}, "isbn")
+
+        other = _locked_repository(flush_writes=True, flush_interval=0)
+        other.upsert({"isbn": "2"}, "isbn")
+        repository.upsert({"isbn": "3"}, "isbn")
+
+        with open(LOCKED_PATH, encoding="utf-8") as file:
+            stored = json.load(file)["_default"]
+        assert sorted(document["isbn"] for document in stored.values()) == [
+            "1",
+            "2",
+            "3",
+        ]
+
+    def test_sqlite_repository_should_accept_reloads(self):
+        repository = LockedRepository(
+            SqliteRepository("test_repository.db"), "test_repository.db", True
+        )
+        repository.truncate()
+        repository.upsert({"isbn": "1"}, "isbn")
+
+        assert repository.find("isbn", "1") == {"isbn": "1"}
+        repository.close()
+
+
+class TestConcurrentWriters:
+    def setup_method(self):
+        _remove(LOCKED_PATH)
+
+    def teardown_method(self):
+        _remove(LOCKED_PATH, f"{os.path.abspath(LOCKED_PATH)}.lock")
+
+    def test_hundreds_of_interleaved_writers_should_not_lose_updates(self):
+        repository = _locked_repository(max_pending_writes=7, flush_interval=0.001)
+        repository.upsert({"name": "counter", "count": 0}, "name")
+        writers, errors = 300, []
+
+        def write(worker: int) -> None:
+            try:
+                repository.upsert(
+                    {"isbn": f"{worker:013d}", "object_type": "book"}, "isbn"
+                )
+                _increment(repository)
+                assert repository.find("isbn", f"{worker:013d}") is not None
+                assert len(repository.of_type("book")) >= 1
+            except Exception as exception:
+                errors.append(exception)
+
+        threads = [
+            threading.Thread(target=write, args=(worker,)) for worker in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        repository.close()
+
+        assert errors == []
+        with open(LOCKED_PATH, encoding="utf-8") as file:
+            stored = list(json.load(file)["_default"].values())
+        assert len(stored) == writers + 1
+        assert {"name": "counter", "count": writers} in stored
+
+    def test_writer_processes_should_not_corrupt_the_file(self):
+        repository = _locked_repository(flush_writes=True)
+        repository.upsert({"name": "counter", "count": 0}, "name")
+        repository.close()
+        processes, writes = 4, 25
+
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_process_writer, args=(worker, writes))
+            for worker in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+
+        assert [worker.exitcode for worker in workers] == [0] * processes
+        with open(LOCKED_PATH, encoding="utf-8") as file:
+            stored = list(json.load(file)["_default"].values())
+        assert len(stored) == processes * writes + 1
+        assert {"name": "counter", "count": processes * writes} in stored
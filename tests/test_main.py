@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import MagicMock
 import schedule
 from dotenv import load_dotenv
@@ -10,11 +11,14 @@ from tests.test_utils import (
 from src.main import (
     _get_pages_for_summary,
     create_book,
+    build_daily_request,
     create_technology,
+    generate_daily_summaries,
     get_all_channel,
     handle_list_command,
     handle_readme_command,
     handle_run_command,
+    handle_stats_command,
     handle_tips_command,
     send_daily_book_summary,
     send_daily_tech_summary,
@@ -42,11 +46,11 @@ class TestGetPagesSummary:
 
 
 class TestSendDailySummary:
-    @patch("src.main.send_slack_message")
+    @patch("src.main.queue_slack_message")
     @patch("src.main.get_summary_for_book_by_chapter")
-    @patch("src.main.write_book_to_db")
+    @patch("src.main.record_progress")
     def test_by_chapter_book_happy_path(
-        self, mock_write_db, mock_get_summary, mock_send_slack
+        self, mock_record, mock_get_summary, mock_send_slack
     ):
         mock_get_summary.return_value = "chapter summary"
 
@@ -66,15 +70,15 @@ class TestSendDailySummary:
 
         mock_get_summary.assert_called_once_with("My Book", "Author", 1)
         mock_send_slack.assert_any_call("C123", "chapter summary")
-        mock_write_db.assert_called_once()
+        mock_record.assert_called_once_with(book)
         assert book.current_chapter == 2
         assert book.state != State.FINISHED
 
-    @patch("src.main.send_slack_message")
+    @patch("src.main.queue_slack_message")
     @patch("src.main.get_summary_for_book_by_chapter")
-    @patch("src.main.write_book_to_db")
+    @patch("src.main.record_progress")
     def test_by_chapter_book_last_chapter(
-        self, mock_write_db, mock_get_summary, mock_send_slack
+        self, mock_record, mock_get_summary, mock_send_slack
     ):
         mock_get_summary.return_value = "last summary"
 
@@ -97,12 +101,12 @@ class TestSendDailySummary:
         mock_send_slack.assert_any_call("C123", final_message)
         assert book.state == State.FINISHED
 
-    @patch("src.main.send_slack_message")
+    @patch("src.main.queue_slack_message")
     @patch("src.main.get_summary_for_book_by_page")
     @patch("src.main._get_pages_for_summary")
-    @patch("src.main.write_book_to_db")
+    @patch("src.main.record_progress")
     def test_by_page_book_happy_path(
-        self, mock_write_db, mock_get_pages, mock_get_summary, mock_send_slack
+        self, mock_record, mock_get_pages, mock_get_summary, mock_send_slack
     ):
         mock_get_pages.return_value = 10
         mock_get_summary.return_value = "page summary"
@@ -123,16 +127,16 @@ class TestSendDailySummary:
         mock_get_pages.assert_called_once_with(book)
         mock_get_summary.assert_called_once_with("My Book", "Author", 10, 5)
         mock_send_slack.assert_any_call("C123", "page summary")
-        mock_write_db.assert_called_once()
+        mock_record.assert_called_once_with(book)
         assert book.current_page == 10
         assert book.state != State.FINISHED
 
-    @patch("src.main.send_slack_message")
+    @patch("src.main.queue_slack_message")
     @patch("src.main.get_summary_for_book_by_page")
     @patch("src.main._get_pages_for_summary")
-    @patch("src.main.write_book_to_db")
+    @patch("src.main.record_progress")
     def test_by_page_book_last_page(
-        self, mock_write_db, mock_get_pages, mock_get_summary, mock_send_slack
+        self, mock_record, mock_get_pages, mock_get_summary, mock_send_slack
     ):
         mock_get_pages.return_value = 100
         mock_get_summary.return_value = "final page summary"
@@ -178,7 +182,7 @@ class TestSendDailySummary:
             exc.value
         )
 
-    @patch("src.main.send_slack_message")
+    @patch("src.main.queue_slack_message")
     @patch("src.main.get_summary_for_technology")
     def test_send_daily_tech_summary_success(self, mock_get_summary, mock_send_slack):
         mock_get_summary.return_value = "Some useful tech tips!"
@@ -189,7 +193,7 @@ class TestSendDailySummary:
         mock_get_summary.assert_called_once_with("Python")
         mock_send_slack.assert_called_once_with("C456", "Some useful tech tips!")
 
-    @patch("src.main.send_slack_message")
+    @patch("src.main.queue_slack_message")
     @patch("src.main.get_summary_for_technology")
     def test_send_daily_tech_summary_no_summary(
         self, mock_get_summary, mock_send_slack
@@ -324,7 +328,7 @@ class TestHandleTipsCommand:
 
         assert result == "An error occured while registering the technology"
 
-    @patch("src.main.save_jobs")
+    @patch("src.main.save_job")
     @patch("src.main.schedule_jobs")
     @patch("src.main.create_technology")
     def test_create_technology_returns_valid_technology(
@@ -336,7 +340,7 @@ class TestHandleTipsCommand:
         result = handle_tips_command("Python")
 
         mock_schedule.assert_called_once_with(tech)
-        mock_save.assert_called_once()
+        mock_save.assert_called_once_with(tech)
         assert (
             result
             == f"We will give you tips and tricks about {tech.name} everyday on channel <#{tech.channel_id}>"
@@ -356,7 +360,7 @@ class TestHandleReadmeCommand:
         result = handle_readme_command("MyBook")
         assert result == "some error"
 
-    @patch("src.main.save_jobs")
+    @patch("src.main.save_job")
     @patch("src.main.create_book")
     def test_create_book_returns_valid_book(self, mock_create, mock_schedule):
         book = default_book_per_page_from_google
@@ -460,3 +464,252 @@ class TestHandleRunCommand:
     def test_handle_run_command(self, mock_run_all_job: MagicMock):
         assert handle_run_command() == "I have succesfully started all scheduled jobs"
         mock_run_all_job.assert_called_once()
+
+
+class TestGenerateDailySummaries:
+    def setup_method(self):
+        self.chapter_book = Book(
+            isbn="1234567812341",
+            title="My Book",
+            author="Author",
+            channel_id="C123",
+            type=Type.BY_CHAPTER,
+            current_chapter=1,
+            chapter_number=3,
+            page_count=0,
+            state=State.ON_GOING,
+        )
+        self.page_book = Book(
+            isbn="1234567812342",
+            title="My Other Book",
+            author="Author",
+            channel_id="C124",
+            type=Type.BY_PAGE,
+            current_page=0,
+            page_count=150,
+            state=State.ON_GOING,
+        )
+
+    @patch("src.main.get_summary_for_technology_async")
+    @patch("src.main.get_summary_for_book_by_page_async")
+    @patch("src.main.get_summary_for_book_by_chapter_async")
+    def test_every_object_should_be_generated_concurrently(
+        self, mock_chapter, mock_page, mock_tech
+    ):
+        mock_chapter.return_value = "chapter summary"
+        mock_page.return_value = "page summary"
+        mock_tech.return_value = "tips"
+
+        generated = asyncio.run(
+            generate_daily_summaries(
+                [self.chapter_book, self.page_book, default_technology]
+            )
+        )
+
+        assert generated == 3
+        assert mock_chapter.call_args.args[:3] == ("My Book", "Author", 1)
+        assert mock_page.call_args.args[:4] == ("My Other Book", "Author", 10, 0)
+        assert mock_tech.call_args.args[0] == default_technology.name
+
+    @patch("src.main.get_summary_for_technology_async")
+    @patch("src.main.get_summary_for_book_by_chapter_async")
+    def test_failures_should_not_stop_other_generations(self, mock_chapter, mock_tech):
+        mock_chapter.side_effect = Exception("Model unavailable")
+        mock_tech.return_value = "tips"
+
+        generated = asyncio.run(
+            generate_daily_summaries([self.chapter_book, default_technology])
+        )
+
+        assert generated == 1
+        mock_tech.assert_called_once()
+
+
+class TestBuildDailyRequest:
+    def test_chapter_book_should_use_the_current_chapter(self):
+        book = Book(
+            isbn="1234567812341",
+            title="My Book",
+            author="Author",
+            type=Type.BY_CHAPTER,
+            current_chapter=4,
+            chapter_number=9,
+            page_count=0,
+            state=State.ON_GOING,
+        )
+
+        key, prompt = build_daily_request(book)
+
+        assert "chapter 4 of the book My Book" in prompt
+        assert len(key) == 64
+
+
+class TestPrefetchOnDelivery:
+    @patch("src.main.prefetch_queue")
+    @patch("src.main.queue_slack_message")
+    @patch("src.main.get_summary_for_book_by_chapter")
+    @patch("src.main.record_progress")
+    def test_next_chapter_should_be_queued_after_delivery(
+        self, mock_record, mock_get_summary, mock_send_slack, mock_prefetch
+    ):
+        mock_get_summary.return_value = "chapter summary"
+        book = Book(
+            isbn="1234567812341",
+            title="My Book",
+            author="Author",
+            channel_id="C123",
+            type=Type.BY_CHAPTER,
+            current_chapter=1,
+            chapter_number=3,
+            page_count=0,
+            state=State.ON_GOING,
+        )
+
+        send_daily_book_summary(book)
+
+        mock_prefetch.claim.assert_called_once()
+        mock_prefetch.enqueue.assert_called_once_with(book)
+        assert book.current_chapter == 2
+
+
+class TestHandleStatsCommand:
+    @patch("src.main.delivery_queue")
+    @patch("src.main.model_router")
+    @patch("src.main.prefetch_queue")
+    @patch("src.main.summary_cache")
+    @patch("src.main.metrics")
+    def test_stats_should_list_counters_and_samples(
+        self, mock_metrics, mock_cache, mock_prefetch, mock_router, mock_delivery
+    ):
+        mock_metrics.snapshot.return_value = {
+            "counters": {"prefetch.hits": 3},
+            "samples": {
+                "prefetch.staleness_seconds": {
+                    "count": 3,
+                    "p50": 1.0,
+                    "p95": 2.0,
+                    "max": 3.0,
+                }
+            },
+        }
+        mock_cache.stats.return_value = {"hits": 4, "misses": 1}
+        mock_prefetch.stats.return_value = {"hit_rate": 0.75, "pending": 1, "ready": 2}
+        mock_delivery.stats.return_value = {
+            "depth": 3,
+            "channels": 2,
+            "undelivered": 4,
+        }
+        mock_router.stats.return_value = {
+            "routes": {"tech": "fallback"},
+            "models": {
+                "primary": {"p50": 40.0, "p95": 50.0, "error_rate": 0.2, "count": 5}
+            },
+            "decisions": [
+                {"kind": "tech", "model": "fallback", "reason": "primary breached"}
+            ],
+        }
+
+        assert handle_stats_command() == (
+            "Current metrics:\n"
+            "prefetch.hits: 3\n"
+            "prefetch.staleness_seconds: p50=1.00 p95=2.00 max=3.00 (n=3)\n"
+            "summary cache: 4 hits / 1 misses\n"
+            "prefetch: hit rate 75% - 1 pending - 2 ready\n"
+            "delivery: 3 queued over 2 channels - 4 undelivered\n"
+            "route tech: fallback\n"
+            "model primary: p50=40.00 p95=50.00 errors=20% (n=5)\n"
+            "routed tech to fallback: primary breached"
+        )
+
+
+class TestStreamingDelivery:
+    def setup_method(self):
+        self.chapter_book = Book(
+            isbn="1234567812341",
+            title="My Book",
+            author="Author",
+            channel_id="C123",
+            type=Type.BY_CHAPTER,
+            current_chapter=1,
+            chapter_number=3,
+            page_count=0,
+            state=State.ON_GOING,
+        )
+        self.page_book = Book(
+            isbn="1234567812342",
+            title="My Other Book",
+            author="Author",
+            channel_id="C124",
+            type=Type.BY_PAGE,
+            current_page=0,
+            page_count=150,
+            state=State.ON_GOING,
+        )
+
+    @patch("src.main.queue_slack_message")
+    @patch("src.main.stream_summary")
+    @patch("src.main.stream_slack_message")
+    @patch("src.main.record_progress")
+    def test_chapter_book_should_stream_instead_of_posting(
+        self, mock_record, mock_stream_slack, mock_stream_summary, mock_send_slack
+    ):
+        mock_stream_slack.return_value = "streamed summary"
+
+        send_daily_book_summary(self.chapter_book, stream=True)
+
+        assert "chapter 1 of the book My Book" in mock_stream_summary.call_args.args[1]
+        mock_stream_slack.assert_called_once_with(
+            "C123", mock_stream_summary.return_value
+        )
+        mock_send_slack.assert_not_called()
+        assert self.chapter_book.current_chapter == 2
+
+    @patch("src.main.queue_slack_message")
+    @patch("src.main.stream_summary")
+    @patch("src.main.stream_slack_message")
+    @patch("src.main.record_progress")
+    def test_page_book_should_stream_instead_of_posting(
+        self, mock_record, mock_stream_slack, mock_stream_summary, mock_send_slack
+    ):
+        mock_stream_slack.return_value = "streamed summary"
+
+        send_daily_book_summary(self.page_book, stream=True)
+
+        assert "pages 0 to 10" in mock_stream_summary.call_args.args[1]
+        mock_send_slack.assert_not_called()
+        assert self.page_book.current_page == 10
+
+    @patch("src.ai_helper._send_prompt")
+    @patch("src.main.queue_slack_message")
+    @patch("src.main.stream_summary")
+    @patch("src.main.stream_slack_message")
+    @patch("src.main.record_progress")
+    def test_large_page_range_should_stream_the_merged_summary(
+        self,
+        mock_record,
+        mock_stream_slack,
+        mock_stream_summary,
+        mock_send_slack,
+        mock_send_prompt,
+    ):
+        mock_send_prompt.return_value = "partial"
+        self.page_book.page_count = 1500
+
+        send_daily_book_summary(self.page_book, stream=True)
+
+        assert mock_send_prompt.call_count == 4
+        assert "Here are 4 partial summaries" in mock_stream_summary.call_args.args[1]
+        assert self.page_book.current_page == 100
+
+    @patch("src.main.queue_slack_message")
+    @patch("src.main.stream_summary")
+    @patch("src.main.stream_slack_message")
+    def test_technology_should_stream_instead_of_posting(
+        self, mock_stream_slack, mock_stream_summary, mock_send_slack
+    ):
+        mock_stream_slack.return_value = "streamed tips"
+
+        send_daily_tech_summary(default_technology, stream=True)
+
+        assert "SQLAlchemy" in mock_stream_summary.call_args.args[1]
+        mock_send_slack.assert_not_called()
@@ -0,0 +1,31 @@
+from src.metrics_helper import Metrics
+
+
+class TestMetrics:
+    def setup_method(self):
+        self.metrics = Metrics(max_samples=3)
+
+    def test_increment_should_accumulate_counters(self):
+        self.metrics.increment("calls")
+        self.metrics.increment("calls", 2)
+        assert self.metrics.snapshot()["counters"] == {"calls": 3}
+
+    def test_percentile_without_samples_should_be_zero(self):
+        assert self.metrics.percentile("unknown", 95) == 0.0
+
+    def test_samples_should_keep_a_rolling_window(self):
+        for value in [100, 1, 2, 3]:
+            self.metrics.observe("latency", value)
+
+        assert self.metrics.snapshot()["samples"]["latency"] == {
+            "count": 3,
+            "p50": 2,
+            "p95": 3,
+            "max": 3,
+        }
+
+    def test_reset_should_clear_everything(self):
+        self.metrics.increment("calls")
+        self.metrics.observe("latency", 1)
+        self.metrics.reset()
+        assert self.metrics.snapshot() == {"counters": {}, "samples": {}}
@@ -0,0 +1,76 @@
+import os
+import runpy
+import sys
+import pytest
+from unittest.mock import patch
+from tinydb import TinyDB
+from src.migration_helper import main, migrate
+from src.repository_helper import SqliteRepository
+
+
+class TestMigrate:
+    def setup_method(self):
+        self.source = "test_migration.json"
+        self.target = "test_migration.db"
+        self._cleanup()
+        with TinyDB(self.source) as db:
+            db.insert({"isbn": "1", "title": "First", "object_type": "book"})
+            db.insert({"name": "Python", "object_type": "tech"})
+
+    def teardown_method(self):
+        self._cleanup()
+
+    def _cleanup(self):
+        for path in (
+            self.source,
+            self.target,
+            f"{self.target}-wal",
+            f"{self.target}-shm",
+        ):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_documents_should_be_imported_in_order(self):
+        assert migrate(self.source, f"sqlite:///{self.target}") == 2
+
+        repository = SqliteRepository(self.target)
+        assert repository.all() == [
+            {"isbn": "1", "title": "First", "object_type": "book"},
+            {"name": "Python", "object_type": "tech"},
+        ]
+        assert repository.find("name", "Python") == {
+            "name": "Python",
+            "object_type": "tech",
+        }
+        repository.close()
+
+    def test_missing_source_should_migrate_nothing(self):
+        assert migrate("missing.json", f"sqlite:///{self.target}") == 0
+
+    def test_non_empty_target_should_raise(self):
+        migrate(self.source, f"sqlite:///{self.target}")
+
+        with pytest.raises(Exception) as exception:
+            migrate(self.source, f"sqlite:///{self.target}")
+        assert (
+            str(exception.value)
+            == f"Migration target sqlite:///{self.target} is not empty"
+        )
+
+    def test_invalid_target_should_raise(self):
+        with pytest.raises(Exception) as exception:
+            migrate(self.source, "books.db")
+        assert str(exception.value) == "Invalid migration target given books.db"
+
+    def test_command_line_should_migrate_every_pair(self, capsys):
+        main([f"{self.source}=sqlite:///{self.target}"])
+
+        assert "2 documents migrated" in capsys.readouterr().out
+
+    def test_module_should_run_as_a_script(self, capsys):
+        argv = ["migration_helper", f"{self.source}=sqlite:///{self.target}"]
+        with patch.object(sys, "argv", argv), patch.dict(sys.modules):
+            sys.modules.pop("src.migration_helper")
+            runpy.run_module("src.migration_helper", run_name="__main__")
+
+        assert "2 documents migrated" in capsys.readouterr().out
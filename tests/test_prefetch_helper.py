@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock, patch
+from src.ai_helper import page_cache_key
+from src.constant import DEFAULT_AI_MODEL
+from src.cache_helper import summary_cache
+from src.domain import Book, State, Type
+from src.metrics_helper import metrics
+from src.prefetch_helper import (
+    PrefetchQueue,
+    run_prefetch,
+    schedule_prefetch_jobs,
+)
+from src.schedule_helper import maintenance_scheduler
+
+
+class TestPrefetchQueue:
+    def setup_method(self):
+        summary_cache.clear()
+        metrics.reset()
+        self.queue = PrefetchQueue()
+        self.book = Book(
+            isbn="1234567812341",
+            title="My Book",
+            author="Author",
+            channel_id="C123",
+            type=Type.BY_PAGE,
+            current_page=10,
+            page_count=150,
+            state=State.ON_GOING,
+        )
+
+    def test_finished_book_should_not_be_queued(self):
+        self.book.state = State.FINISHED
+        self.queue.enqueue(self.book)
+        assert self.queue.stats()["pending"] == 0
+
+    def test_empty_queue_should_not_generate(self):
+        with patch("src.main.generate_daily_summary") as mock_generate:
+            assert self.queue.run() == 0
+        mock_generate.assert_not_called()
+
+    @patch("src.ai_helper._send_prompt_async")
+    def test_prefetched_summary_should_be_claimed_once(self, mock_send_prompt):
+        mock_send_prompt.return_value = "next summary"
+        self.queue.enqueue(self.book)
+        self.book.current_page = 999
+
+        assert self.queue.run() == 1
+
+        key = page_cache_key("My Book", "Author", 10, 20, DEFAULT_AI_MODEL)
+        assert summary_cache.get(key) == "next summary"
+        assert self.queue.claim(key) is True
+        assert self.queue.claim(key) is False
+        assert self.queue.stats() == {"pending": 0, "ready": 0, "hit_rate": 0.5}
+        assert metrics.snapshot()["samples"]["prefetch.staleness_seconds"]["count"] == 1
+
+    @patch("src.ai_helper._send_prompt_async")
+    def test_failed_prefetch_should_not_be_ready(self, mock_send_prompt):
+        mock_send_prompt.side_effect = Exception("Model unavailable")
+        self.queue.enqueue(self.book)
+
+        assert self.queue.run() == 0
+        assert self.queue.stats()["ready"] == 0
+
+    @patch("src.prefetch_helper.close_async_client")
+    @patch("src.ai_helper._send_prompt_async")
+    def test_prefetch_should_close_its_async_client(self, mock_send_prompt, mock_close):
+        mock_send_prompt.return_value = "next summary"
+        self.queue.enqueue(self.book)
+
+        self.queue.run()
+
+        mock_close.assert_awaited_once()
+
+    @patch("src.ai_helper._send_prompt_async")
+    def test_old_prefetches_should_expire(self, mock_send_prompt):
+        mock_send_prompt.return_value = "next summary"
+        self.queue._ready["stale"] = 0.0
+        self.queue.enqueue(self.book)
+
+        self.queue.run()
+
+        assert "stale" not in self.queue._ready
+        assert metrics.snapshot()["counters"]["prefetch.expired"] == 1
+
+    def test_hit_rate_without_deliveries_should_be_zero(self):
+        assert self.queue.stats()["hit_rate"] == 0.0
+
+
+class TestSchedulePrefetch:
+    @patch("src.prefetch_helper.threading.Thread")
+    def test_run_prefetch_should_start_a_thread(self, mock_thread: MagicMock):
+        run_prefetch()
+        mock_thread.return_value.start.assert_called_once()
+
+    def test_prefetch_should_run_off_peak(self):
+        maintenance_scheduler.clear()
+        schedule_prefetch_jobs()
+        assert maintenance_scheduler.jobs[0].at_time.strftime("%H:%M") == "03:00"
+        maintenance_scheduler.clear()
@@ -0,0 +1,48 @@
+import pytest
+from src.ai_helper import (
+    build_chapter_request,
+    build_page_request,
+    build_technology_request,
+)
+from src.prompt_helper import (
+    PAGE_TEMPLATE,
+    SUMMARY_PREFIX,
+    TIP_PREFIX,
+    PromptTemplate,
+)
+
+
+class TestPromptTemplates:
+    def test_prompts_should_only_carry_their_own_instructions(self):
+        summaries = [
+            build_page_request("Dune", "Herbert", 20, 10)[1],
+            build_chapter_request("Dune", "Herbert", 2)[1],
+        ]
+        tip = build_technology_request("Python")[1]
+
+        for prompt in summaries:
+            assert prompt.startswith(f"{SUMMARY_PREFIX}\n\nRequest:\n")
+            assert "tip or trick:" not in prompt
+        assert tip.startswith(f"{TIP_PREFIX}\n\nRequest:\n")
+        assert "summary" not in tip
+
+    def test_template_key_should_carry_its_version(self):
+        assert PAGE_TEMPLATE.key == "page@3"
+
+    def test_changing_the_template_version_should_change_cache_keys(self):
+        key, _ = build_chapter_request("Dune", "Herbert", 2)
+        template = PromptTemplate(
+            "chapter", "4", "Chapter {current_chapter}", SUMMARY_PREFIX
+        )
+
+        assert template.render(current_chapter=2).endswith("Request:\nChapter 2")
+        assert template.key != "chapter@3"
+        assert key != build_page_request("Dune", "Herbert", 20, 10)[0]
+
+    def test_missing_value_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            PAGE_TEMPLATE.render(title="Dune")
+        assert (
+            str(exception.value)
+            == "Missing value 'current_page' for prompt template page"
+        )
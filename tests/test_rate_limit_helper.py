@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.rate_limit_helper import PromptLimiter, estimate_tokens
+
+
+class TestPromptLimiter:
+    @pytest.mark.parametrize("max_concurrency, tokens_per_minute", [(0, 10), (1, 0)])
+    def test_invalid_limits_should_raise_exception(
+        self, max_concurrency, tokens_per_minute
+    ):
+        with pytest.raises(Exception) as exception:
+            PromptLimiter(max_concurrency, tokens_per_minute)
+        assert (
+            str(exception.value)
+            == f"Invalid limits given {max_concurrency=} - {tokens_per_minute=}"
+        )
+
+    def test_from_env_should_use_defaults(self):
+        limiter = PromptLimiter.from_env()
+        assert limiter.max_concurrency == 8
+        assert limiter.tokens_per_minute == 200000
+
+    def test_reserve_under_budget_should_not_wait(self):
+        limiter = PromptLimiter(max_concurrency=1, tokens_per_minute=100)
+
+        with patch("src.rate_limit_helper.asyncio.sleep") as mock_sleep:
+            asyncio.run(limiter.reserve(40))
+            asyncio.run(limiter.reserve(40))
+
+        mock_sleep.assert_not_called()
+
+    def test_reserve_over_budget_should_wait_for_the_window(self):
+        limiter = PromptLimiter(max_concurrency=1, tokens_per_minute=100)
+        limiter._window.append((0.0, 100))
+
+        with patch("src.rate_limit_helper.time") as mock_time:
+            mock_time.monotonic.side_effect = [30.0, 30.0, 60.0, 60.0]
+            with patch("src.rate_limit_helper.asyncio.sleep") as mock_sleep:
+                asyncio.run(limiter.reserve(50))
+
+        mock_sleep.assert_called_once_with(30.0)
+        assert list(limiter._window) == [(60.0, 50)]
+
+    def test_estimate_tokens_should_include_the_answer_budget(self):
+        assert estimate_tokens("a" * 400) == 1600
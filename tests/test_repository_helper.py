@@ -0,0 +1,181 @@
+import os
+import pytest
+from tinydb import TinyDB
+from tinydb.storages import MemoryStorage
+from src.repository_helper import IndexedRepository, SqliteRepository
+from src.storage_helper import WriteBehindStorage
+
+
+class TestIndexedRepository:
+    def setup_method(self):
+        self.repository = IndexedRepository(TinyDB(storage=MemoryStorage))
+        self.repository.upsert(
+            {"isbn": "1", "title": "First", "object_type": "book"}, "isbn"
+        )
+        self.repository.upsert({"name": "Python", "object_type": "tech"}, "name")
+
+    def test_documents_should_be_found_by_index(self):
+        assert self.repository.find("isbn", "1")["title"] == "First"
+        assert self.repository.find("name", "Python")["object_type"] == "tech"
+        assert self.repository.find("isbn", "unknown") is None
+        assert [doc["name"] for doc in self.repository.of_type("tech")] == ["Python"]
+        assert self.repository.of_type("unknown") == []
+
+    def test_upsert_should_update_the_indexes(self):
+        doc_id = self.repository.upsert(
+            {"isbn": "1", "title": "Renamed", "object_type": "tech"}, "isbn"
+        )
+
+        assert doc_id == 1
+        assert self.repository.find("isbn", "1")["title"] == "Renamed"
+        assert self.repository.of_type("book") == []
+        assert len(self.repository.of_type("tech")) == 2
+        assert self.repository.db.get(doc_id=1)["title"] == "Renamed"
+
+    def test_documents_without_key_should_be_inserted(self):
+        self.repository.upsert({"title": "No isbn"}, "isbn")
+
+        assert len(self.repository.all()) == 3
+
+    def test_remove_should_drop_the_document_and_its_indexes(self):
+        assert self.repository.remove("isbn", "1") is True
+        assert self.repository.remove("isbn", "1") is False
+
+        assert self.repository.find("isbn", "1") is None
+        assert self.repository.of_type("book") == []
+        assert len(self.repository.db.all()) == 1
+
+    def test_insert_many_should_reindex(self):
+        assert self.repository.insert_many([{"isbn": "2", "object_type": "book"}]) == 1
+
+        assert self.repository.find("isbn", "2") == {"isbn": "2", "object_type": "book"}
+
+    def test_truncate_should_empty_the_indexes(self):
+        self.repository.truncate()
+
+        assert self.repository.all() == []
+        assert self.repository.find("isbn", "1") is None
+
+    def test_unknown_index_should_raise(self):
+        with pytest.raises(Exception) as exception:
+            self.repository.find("title", "First")
+        assert str(exception.value) == "No index on field='title'"
+
+        with pytest.raises(Exception):
+            self.repository.upsert({"title": "First"}, "title")
+        with pytest.raises(Exception):
+            self.repository.remove("title", "First")
+
+
+class TestIndexedRepositoryFreshness:
+    def setup_method(self):
+        self.path = "test_repository.json"
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.repository = IndexedRepository(TinyDB(self.path), self.path)
+
+    def teardown_method(self):
+        self.repository.db.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_missing_file_should_be_empty(self):
+        os.remove(self.path)
+
+        assert self.repository.all() == []
+
+    def test_external_writes_should_trigger_a_rebuild(self):
+        self.repository.upsert({"isbn": "1", "object_type": "book"}, "isbn")
+        external = TinyDB(self.path)
+        external.insert({"isbn": "2", "object_type": "book"})
+        external.close()
+
+        assert self.repository.find("isbn", "2") == {"isbn": "2", "object_type": "book"}
+
+    def test_own_writes_should_not_trigger_a_rebuild(self):
+        self.repository.upsert({"isbn": "1", "object_type": "book"}, "isbn")
+        self.repository.upsert({"isbn": "2", "object_type": "book"}, "isbn")
+        self.repository._documents[1]["cached"] = True
+
+        assert self.repository.find("isbn", "1")["cached"] is True
+
+    def test_flush_should_write_pending_documents(self):
+        repository = IndexedRepository(
+            TinyDB(self.path, storage=WriteBehindStorage, flush_interval=0),
+            self.path,
+        )
+        repository.upsert({"isbn": "1", "object_type": "book"}, "isbn")
+        assert os.path.getsize(self.path) == 0
+
+        repository.flush()
+        self.repository.flush()
+
+        assert os.path.getsize(self.path) > 0
+
+
+class TestSqliteRepository:
+    def setup_method(self):
+        self.path = "test_repository.db"
+        self.repository = SqliteRepository(self.path)
+        self.repository.truncate()
+        self.repository.upsert(
+            {"isbn": "1", "title": "First", "object_type": "book"}, "isbn"
+        )
+        self.repository.upsert({"name": "Python", "object_type": "tech"}, "name")
+
+    def teardown_method(self):
+        self.repository.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(f"{self.path}{suffix}"):
+                os.remove(f"{self.path}{suffix}")
+
+    def test_documents_should_be_found_by_index(self):
+        assert self.repository.find("isbn", "1") == {
+            "isbn": "1",
+            "title": "First",
+            "object_type": "book",
+        }
+        assert self.repository.find("isbn", "unknown") is None
+        assert self.repository.of_type("tech") == [
+            {"name": "Python", "object_type": "tech"}
+        ]
+
+    def test_upsert_should_merge_into_the_existing_document(self):
+        doc_id = self.repository.upsert({"isbn": "1", "current_page": 10}, "isbn")
+
+        assert doc_id == 1
+        assert self.repository.find("isbn", "1") == {
+            "isbn": "1",
+            "title": "First",
+            "object_type": "book",
+            "current_page": 10,
+        }
+
+    def test_documents_without_key_should_be_inserted(self):
+        self.repository.upsert({"title": "No isbn"}, "isbn")
+        self.repository.insert_many([{"isbn": "2"}, {"isbn": "3"}])
+
+        assert len(self.repository.all()) == 5
+
+    def test_remove_should_delete_one_document(self):
+        assert self.repository.remove("name", "Python") is True
+        assert self.repository.remove("name", "Python") is False
+
+        assert self.repository.of_type("tech") == []
+
+    def test_database_should_use_wal_and_survive_reopening(self):
+        self.repository.flush()
+        self.repository.close()
+        reopened = SqliteRepository(self.path)
+
+        assert reopened.find("name", "Python") is not None
+        assert reopened._connect().execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        reopened.close()
+
+    def test_unknown_index_should_raise(self):
+        with pytest.raises(Exception):
+            self.repository.find("title", "First")
+        with pytest.raises(Exception):
+            self.repository.upsert({"title": "First"}, "title")
+        with pytest.raises(Exception):
+            self.repository.remove("title", "First")
@@ -0,0 +1,202 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+import pytest
+from src.ai_helper import _send_prompt
+from src.metrics_helper import metrics
+from src.resilience_helper import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_with_resilience,
+    call_with_resilience_async,
+    get_retry_after,
+    is_retryable,
+)
+from tests.test_utils import FakeAPIError, FlakyTestClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=2, reset_timeout=30, clock=self.clock
+        )
+
+    def test_breaker_should_open_after_threshold(self):
+        self.breaker.record_failure()
+        self.breaker.before_call()
+        self.breaker.record_failure()
+
+        with pytest.raises(CircuitOpenError):
+            self.breaker.before_call()
+
+    def test_breaker_should_allow_a_single_half_open_probe(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 31
+
+        self.breaker.before_call()
+        assert self.breaker.state == "half_open"
+        with pytest.raises(CircuitOpenError):
+            self.breaker.before_call()
+
+        self.breaker.record_success()
+        assert self.breaker.state == "closed"
+        self.breaker.before_call()
+
+    def test_failed_probe_should_reopen_the_breaker(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 31
+        self.breaker.before_call()
+
+        self.breaker.record_failure()
+
+        assert self.breaker.state == "open"
+        assert self.breaker.opened_at == 31
+
+
+class TestRetryPolicy:
+    def setup_method(self):
+        self.policy = RetryPolicy(
+            max_attempts=3, base_delay=1, max_delay=5, call_timeout=10, deadline=60
+        )
+
+    def test_delay_should_be_capped_exponential_with_jitter(self):
+        with patch("src.resilience_helper.random.uniform") as mock_uniform:
+            mock_uniform.side_effect = lambda low, high: high
+            assert self.policy.delay(1) == 2
+            assert self.policy.delay(5) == 5
+
+    def test_retry_after_should_win_over_backoff(self):
+        assert self.policy.delay(1, retry_after=3.5) == 3.5
+        assert self.policy.delay(1, retry_after=120) == 5
+
+    def test_from_env_should_use_defaults(self):
+        policy = RetryPolicy.from_env()
+        assert (policy.max_attempts, policy.call_timeout) == (4, 60)
+
+
+class TestRetryHelpers:
+    @pytest.mark.parametrize(
+        "exception, expected",
+        [
+            (TimeoutError(), True),
+            (ConnectionError(), True),
+            (FakeAPIError(503), True),
+            (FakeAPIError(429), True),
+            (FakeAPIError(400), False),
+            (Exception("boom"), False),
+        ],
+    )
+    def test_is_retryable(self, exception, expected):
+        assert is_retryable(exception) is expected
+
+    def test_retry_after_headers_should_be_parsed(self):
+        assert get_retry_after(FakeAPIError(429, {"retry-after-ms": "1500"})) == 1.5
+        assert get_retry_after(FakeAPIError(429, {"retry-after": "2"})) == 2
+        assert get_retry_after(FakeAPIError(429)) is None
+        assert get_retry_after(Exception()) is None
+
+    def test_retry_after_http_date_should_be_parsed(self):
+        in_ten_seconds = datetime.now(timezone.utc) + timedelta(seconds=10)
+        retry_after = get_retry_after(
+            FakeAPIError(429, {"retry-after": format_datetime(in_ten_seconds)})
+        )
+        assert retry_after is not None and 5 < retry_after <= 10
+
+
+class TestCallWithResilience:
+    def setup_method(self):
+        metrics.reset()
+        self.policy = RetryPolicy(
+            max_attempts=3, base_delay=0, max_delay=0, call_timeout=10, deadline=60
+        )
+        self.breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+
+    def _call(self, client):
+        return call_with_resilience(
+            lambda timeout: client.responses.create(
+                model="model", input="prompt", timeout=timeout
+            ),
+            self.policy,
+            self.breaker,
+        ).output_text
+
+    def test_transient_failures_should_be_retried(self):
+        client = FlakyTestClient([FakeAPIError(500), TimeoutError()])
+
+        assert self._call(client) == "TEST OK"
+        assert len(client.timeouts) == 3
+        assert all(timeout <= 10 for timeout in client.timeouts)
+        assert metrics.snapshot()["counters"]["ai.retries"] == 2
+        assert self.breaker.failures == 0
+
+    def test_retry_after_should_be_respected(self):
+        client = FlakyTestClient([FakeAPIError(429, {"retry-after": "0.01"})])
+        self.policy.max_delay = 1
+
+        with patch("src.resilience_helper.time.sleep") as mock_sleep:
+            assert self._call(client) == "TEST OK"
+
+        mock_sleep.assert_called_once_with(0.01)
+
+    def test_non_retryable_failure_should_raise_immediately(self):
+        client = FlakyTestClient([FakeAPIError(400)])
+
+        with pytest.raises(FakeAPIError):
+            self._call(client)
+        assert len(client.timeouts) == 1
+
+    def test_exhausted_attempts_should_raise_exception(self):
+        client = FlakyTestClient([FakeAPIError(502)] * 3)
+
+        with pytest.raises(Exception) as exception:
+            self._call(client)
+        assert str(exception.value) == "AI call failed after 3 attempts"
+
+    def test_deadline_should_stop_retries(self):
+        client = FlakyTestClient([FakeAPIError(503, {"retry-after": "30"})])
+        self.policy.max_delay = 60
+        self.policy.deadline = 10
+
+        with pytest.raises(Exception) as exception:
+            self._call(client)
+        assert str(exception.value) == "AI call deadline exceeded after 1 attempts"
+
+    def test_open_circuit_should_fail_fast(self):
+        self.breaker.failure_threshold = 2
+        client = FlakyTestClient([FakeAPIError(500)] * 3)
+
+        with pytest.raises(CircuitOpenError):
+            self._call(client)
+        assert len(client.timeouts) == 2
+
+    def test_async_calls_should_be_retried(self):
+        client = FlakyTestClient([ConnectionError()])
+
+        async def create(timeout):
+            return client.responses.create(model="m", input="p", timeout=timeout)
+
+        response = asyncio.run(
+            call_with_resilience_async(create, self.policy, self.breaker)
+        )
+        assert response.output_text == "TEST OK"
+        assert len(client.timeouts) == 2
+
+    def test_send_prompt_should_go_through_the_resilience_layer(self):
+        client = FlakyTestClient([FakeAPIError(503)])
+
+        with patch("src.resilience_helper.time.sleep"):
+            assert _send_prompt(prompt="prompt", client=client) == "TEST OK"
+        assert len(client.timeouts) == 2
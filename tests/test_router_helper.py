@@ -0,0 +1,153 @@
+import asyncio
+from unittest.mock import patch
+import pytest
+from src.ai_helper import _send_prompt, _send_prompt_async
+from src.metrics_helper import metrics
+from src.rate_limit_helper import PromptLimiter
+from src.router_helper import ModelRouter
+from tests.test_utils import AsyncTestClient, FakeAPIError, FlakyTestClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestModelRouter:
+    def setup_method(self):
+        metrics.reset()
+        self.clock = FakeClock()
+        self.router = ModelRouter(
+            primary="primary",
+            fallbacks=["primary", "fallback"],
+            latency_slo=10,
+            max_error_rate=0.5,
+            window=3,
+            min_samples=3,
+            recovery_seconds=60,
+            clock=self.clock,
+        )
+
+    def _breach(self, model, seconds=20.0):
+        for _ in range(3):
+            self.router.record(model, seconds, ok=True)
+
+    def test_invalid_limits_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            ModelRouter("primary", [], latency_slo=0, max_error_rate=0.5)
+        assert (
+            str(exception.value)
+            == "Invalid routing limits given latency_slo=0 - max_error_rate=0.5 - min_samples=5"
+        )
+
+    def test_requests_should_go_to_the_primary_by_default(self):
+        assert self.router.fallbacks == ["fallback"]
+        assert self.router.choose("tech") == "primary"
+        assert self.router.choose("tech") == "primary"
+        assert self.router.stats()["routes"] == {"tech": "primary"}
+        assert len(self.router.decisions) == 1
+
+    def test_slow_primary_should_shift_to_the_fallback(self):
+        self.router.choose("chapter")
+        self._breach("primary")
+
+        assert self.router.choose("chapter") == "fallback"
+        assert self.router.decisions[-1]["reason"] == "primary breached its SLO"
+
+    def test_failing_primary_should_shift_to_the_fallback(self):
+        for _ in range(3):
+            self.router.record("primary", 1.0, ok=False)
+
+        assert self.router.choose("page") == "fallback"
+        assert metrics.counters["ai.errors.primary"] == 3
+
+    def test_routing_should_be_sticky_per_kind(self):
+        self._breach("primary")
+        assert self.router.choose("tech") == "fallback"
+
+        for _ in range(3):
+            self.router.record("primary", 1.0, ok=True)
+
+        assert self.router.choose("tech") == "fallback"
+        assert self.router.choose("page") == "primary"
+
+    def test_primary_should_be_retried_after_recovery_window(self):
+        self._breach("primary")
+        self.router.choose("tech")
+        self.clock.now = 61
+
+        assert self.router.choose("tech") == "primary"
+        assert self.router.stats()["models"]["primary"]["count"] == 0
+
+    def test_unhealthy_fallbacks_should_keep_the_current_route(self):
+        self._breach("primary")
+        self._breach("fallback")
+
+        assert self.router.choose("tech") == "primary"
+
+    def test_stats_should_expose_percentiles_and_histograms(self):
+        self.router.record("primary", 0.5, ok=True)
+        self.router.record("primary", 4.0, ok=True)
+        self.router.record("primary", 90.0, ok=True)
+        self.router.record("unknown", 1.0, ok=True)
+
+        primary = self.router.stats()["models"]["primary"]
+        assert (primary["p50"], primary["p95"]) == (4.0, 90.0)
+        assert primary["histogram"]["<=1s"] == 1
+        assert primary["histogram"]["<=5s"] == 1
+        assert primary["histogram"][">60s"] == 1
+        assert self.router.stats()["models"]["fallback"]["p50"] == 0.0
+        assert metrics.snapshot()["samples"]["ai.latency.unknown"]["count"] == 1
+
+    def test_from_env_should_parse_fallbacks(self):
+        with patch.dict(
+            "os.environ", {"AI_MODEL": "main", "AI_FALLBACK_MODELS": "a, b,"}
+        ):
+            router = ModelRouter.from_env()
+        assert (router.primary, router.fallbacks) == ("main", ["a", "b"])
+
+
+class TestRoutedPrompts:
+    def setup_method(self):
+        self.router = ModelRouter(
+            "primary", ["fallback"], latency_slo=10, max_error_rate=0.5, min_samples=1
+        )
+
+    def test_send_prompt_should_use_and_track_the_routed_model(self):
+        client = FlakyTestClient([])
+
+        with patch("src.ai_helper.model_router", self.router):
+            assert _send_prompt(prompt="prompt", client=client, kind="tech") == (
+                "TEST OK"
+            )
+
+        assert client.models == ["primary"]
+        assert self.router.stats()["models"]["primary"]["count"] == 1
+
+    def test_failed_prompt_should_be_tracked_as_an_error(self):
+        client = FlakyTestClient([FakeAPIError(400)])
+
+        with patch("src.ai_helper.model_router", self.router):
+            with pytest.raises(FakeAPIError):
+                _send_prompt(prompt="prompt", client=client, kind="tech")
+
+            assert self.router.stats()["models"]["primary"]["error_rate"] == 1.0
+            _send_prompt(prompt="prompt", client=client, kind="tech")
+
+        assert client.models == ["primary", "fallback"]
+
+    def test_async_prompt_should_use_the_routed_model(self):
+        client = AsyncTestClient()
+        limiter = PromptLimiter(max_concurrency=1, tokens_per_minute=100000)
+
+        with patch("src.ai_helper.model_router", self.router):
+            asyncio.run(
+                _send_prompt_async(
+                    prompt="prompt", limiter=limiter, client=client, kind="page"
+                )
+            )
+
+        assert self.router.stats()["routes"] == {"page": "primary"}
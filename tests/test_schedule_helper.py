@@ -1,11 +1,20 @@
+import asyncio
+import threading
 import schedule
 import pytest
 from unittest.mock import MagicMock, patch
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.constant import DEFAULT_SCHEDULE_TIME
-from src.schedule_helper import schedule_jobs, run_all_jobs
-from tests.test_utils import default_book_per_page
+from src.schedule_helper import (
+    _run_all,
+    _stream_job,
+    run_all_jobs,
+    run_pending_jobs,
+    schedule_jobs,
+    schedule_many,
+)
+from tests.test_utils import default_book_per_page, default_technology
 
 
 class TestScheduleJobs:
@@ -30,6 +39,31 @@ class TestScheduleJobs:
         )
 
 
+class TestScheduleMany:
+    def setup_method(self):
+        schedule.clear()
+
+    @patch("src.main.send_daily_tech_summary")
+    @patch("src.main.send_daily_book_summary")
+    def test_schedules_every_object_in_one_batch(
+        self, mock_send_book: MagicMock, mock_send_tech: MagicMock
+    ):
+        assert schedule_many([default_book_per_page, default_technology]) == 2
+
+        assert [job.job_func.func for job in schedule.jobs] == [
+            mock_send_book,
+            mock_send_tech,
+        ]
+        assert [job.job_func.args[0] for job in schedule.jobs] == [
+            default_book_per_page,
+            default_technology,
+        ]
+
+    def test_empty_batch_schedules_nothing(self):
+        assert schedule_many([]) == 0
+        assert schedule.jobs == []
+
+
 class TestRunJobs:
     @patch("src.schedule_helper.threading.Thread")
     @patch("src.schedule_helper.schedule.run_all")
@@ -42,6 +76,162 @@ class TestRunJobs:
         run_all_jobs()
 
         mock_thread_class.assert_called_once_with(
-            name="Run all scheduled jobs", target=mock_run_all
+            name="Run all scheduled jobs", target=_run_all
         )
         mock_thread_instance.start.assert_called_once()
+
+
+class TestRunPendingJobs:
+    def setup_method(self):
+        schedule.clear()
+
+    @patch("src.schedule_helper._run_job")
+    @patch("src.main.generate_daily_summaries")
+    def test_due_jobs_should_be_generated_before_running(
+        self, mock_generate: MagicMock, mock_run_job: MagicMock
+    ):
+        schedule_jobs(default_book_per_page)
+        schedule.every().day.at("00:00").do(print, "not due")
+        schedule.jobs[0].next_run = datetime(2000, 1, 1)
+
+        asyncio.run(run_pending_jobs())
+
+        mock_generate.assert_called_once_with([default_book_per_page])
+        mock_run_job.assert_called_once()
+
+    @patch("src.schedule_helper._run_job")
+    @patch("src.main.generate_daily_summaries")
+    def test_no_due_jobs_should_skip_generation(
+        self, mock_generate: MagicMock, mock_run_job: MagicMock
+    ):
+        schedule_jobs(default_book_per_page)
+
+        asyncio.run(run_pending_jobs())
+
+        mock_generate.assert_not_called()
+        mock_run_job.assert_not_called()
+
+    @patch("src.schedule_helper._run_job")
+    @patch("src.main.generate_daily_summaries")
+    def test_failing_maintenance_job_should_not_block_deliveries(
+        self, mock_generate: MagicMock, mock_run_job: MagicMock
+    ):
+        schedule_jobs(default_book_per_page)
+        schedule.jobs[0].next_run = datetime(2000, 1, 1)
+
+        with patch(
+            "src.schedule_helper.maintenance_scheduler.run_pending",
+            side_effect=Exception("batch failed"),
+        ):
+            asyncio.run(run_pending_jobs())
+
+        mock_run_job.assert_called_once()
+
+    @patch("src.main.generate_daily_summaries")
+    def test_failing_job_should_not_block_the_jobs_after_it(
+        self, mock_generate: MagicMock
+    ):
+        ran = []
+
+        def deliver(index: int) -> None:
+            ran.append(index)
+            if index == 1:
+                raise Exception("Circuit breaker is open")
+
+        jobs = [schedule.every().day.do(deliver, index) for index in range(3)]
+        for index, job in enumerate(jobs):
+            job.next_run = datetime(2000, 1, 1, minute=index)
+
+        for _ in range(3):
+            asyncio.run(run_pending_jobs())
+
+        assert ran == [0, 1, 2]
+        assert not any(job.should_run for job in jobs)
+        assert jobs[1].last_run is not None
+        mock_generate.assert_called_once_with([0, 1, 2])
+
+    @patch("src.main.generate_daily_summaries")
+    def test_jobs_should_run_off_the_event_loop(self, mock_generate: MagicMock):
+        threads = []
+
+        def record() -> None:
+            threads.append(threading.get_ident())
+
+        schedule.every().day.do(record).next_run = datetime(2000, 1, 1)
+
+        with patch(
+            "src.schedule_helper.maintenance_scheduler.run_pending", side_effect=record
+        ):
+            asyncio.run(run_pending_jobs())
+
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+
+    @patch("src.main.generate_daily_summaries")
+    def test_cancelled_job_should_be_unscheduled(self, mock_generate: MagicMock):
+        job = schedule.every().day.do(lambda: schedule.CancelJob)
+        job.next_run = datetime(2000, 1, 1)
+
+        asyncio.run(run_pending_jobs())
+
+        assert schedule.jobs == []
+
+    @patch("src.schedule_helper._run_job")
+    @patch("src.main.generate_daily_summaries")
+    def test_run_all_should_generate_every_job_first(
+        self, mock_generate: MagicMock, mock_run_job: MagicMock
+    ):
+        schedule_jobs(default_book_per_page)
+
+        _run_all()
+
+        mock_generate.assert_called_once_with([default_book_per_page])
+        mock_run_job.assert_called_once()
+
+    @patch("src.schedule_helper._run_job")
+    @patch("src.schedule_helper.close_async_client")
+    @patch("src.main.generate_daily_summaries")
+    def test_run_all_should_close_the_async_client(
+        self,
+        mock_generate: MagicMock,
+        mock_close: MagicMock,
+        mock_run_job: MagicMock,
+    ):
+        mock_generate.side_effect = Exception("AI is down")
+        schedule_jobs(default_book_per_page)
+
+        with pytest.raises(Exception):
+            _run_all()
+
+        mock_close.assert_awaited_once()
+        mock_run_job.assert_not_called()
+
+    def test_streaming_mode_should_stream_every_job(self, monkeypatch):
+        monkeypatch.setenv("STREAMING_MODE", "true")
+        schedule.clear()
+        streamed = []
+
+        def deliver(object, stream=False):
+            streamed.append((object, stream))
+
+        def failing_delivery(object, stream=False):
+            raise Exception("Slack is down")
+
+        delivered = schedule.every().day.do(deliver, default_book_per_page)
+        failed = schedule.every().day.do(failing_delivery, default_book_per_page)
+        schedule.every().day.do(print)
+        delivered.next_run = datetime.now() - timedelta(minutes=1)
+
+        with patch("src.main.generate_daily_summaries") as mock_generate:
+            _run_all()
+
+        mock_generate.assert_not_called()
+        assert streamed == [(default_book_per_page, True)]
+        assert delivered.last_run is not None
+        assert delivered.next_run > datetime.now()
+        assert failed.last_run is None
+
+    def test_streaming_a_job_without_function_should_raise(self):
+        with pytest.raises(Exception) as exception:
+            _stream_job(schedule.Job(1))
+        assert "Cannot stream a job without a function" in str(exception.value)
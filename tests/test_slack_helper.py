@@ -1,18 +1,53 @@
+import asyncio
+import ssl
 import pytest
+import requests
+import responses
 from slack_sdk.errors import SlackApiError
 import os
 import time
 import hmac
 import hashlib
 from src.slack_helper import (
+    SlackRateLimitedError,
+    MESSAGE_BLOCK_LIMIT,
+    SECTION_TEXT_LIMIT,
+    ChannelDirectory,
+    PooledWebClient,
+    SignatureVerifier,
+    close_slack_client,
+    get_slack_client,
+    send_slack_message_async,
+    unarchive_channel,
+    _SlackdownStream,
+    _iter_sections,
+    channel_directory,
     create_channel,
+    get_channel_state,
     send_slack_message,
     get_channel_id,
     _markdown_to_slackdown,
+    stream_slack_message,
+    update_slack_message,
     verify_slack_request,
 )
-from tests.test_utils import TestClient
-from unittest.mock import patch
+from tests.test_utils import (
+    BlockKitTestClient,
+    PaginatedSlackClient,
+    StreamingTestClient,
+    TestClient,
+)
+from unittest.mock import MagicMock, patch
+
+
+def _rate_limited() -> SlackApiError:
+    class RateLimitedResponse(dict):
+        status_code = 429
+        headers = {"Retry-After": "3"}
+
+    return SlackApiError(
+        message="ratelimited", response=RateLimitedResponse(error="ratelimited")
+    )
 
 
 class TestSendSlackMessage:
@@ -43,7 +78,116 @@ class TestSendSlackMessage:
                 send_slack_message(channel_id="123", message="456")
 
 
+class TestStructuredSlackMessage:
+    def test_short_message_should_be_a_single_post(self):
+        client = BlockKitTestClient()
+
+        response = send_slack_message(
+            "123456", "## Title\nSome **bold** text", client, structured=True
+        )
+
+        assert response == {"ok": True, "ts": "1700000000.000001"}
+        assert client.posts == [
+            {
+                "text": "*Title*\nSome *bold* text",
+                "blocks": [
+                    {
+                        "type": "section",
+                        "text": {"type": "mrkdwn", "text": "*Title*\nSome *bold* text"},
+                    }
+                ],
+                "thread_ts": None,
+            }
+        ]
+
+    def test_progress_should_resume_after_the_parts_already_sent(self):
+        client = BlockKitTestClient()
+        progress = {"parts_sent": 1, "thread_ts": "1699999999.000001"}
+        posted_progress = []
+
+        response = send_slack_message(
+            "123456",
+            "word " * 40_000,
+            client,
+            structured=True,
+            progress=progress,
+            before_post=lambda current: posted_progress.append(dict(current)),
+        )
+
+        assert response == {"ok": True, "ts": "1700000000.000001"}
+        assert [post["thread_ts"] for post in client.posts] == ["1699999999.000001"]
+        assert progress == {"parts_sent": 2, "thread_ts": "1699999999.000001"}
+        assert posted_progress == [{"parts_sent": 1, "thread_ts": "1699999999.000001"}]
+
+    def test_plain_message_should_call_before_post_once(self):
+        before_post = MagicMock()
+
+        send_slack_message("123456", "hello", TestClient(), before_post=before_post)
+
+        before_post.assert_called_once_with({})
+
+    def test_long_message_should_post_a_parent_and_thread_replies(self):
+        client = BlockKitTestClient()
+        paragraph = "word " * 700
+        message = "\n\n".join(
+            f"## Part {index}\n{paragraph}" for index in range(MESSAGE_BLOCK_LIMIT)
+        )
+
+        send_slack_message("123456", message, client, structured=True)
+
+        assert len(client.posts) > 1
+        assert client.posts[0]["thread_ts"] is None
+        assert all(
+            post["thread_ts"] == "1700000000.000001" for post in client.posts[1:]
+        )
+        blocks = [block for post in client.posts for block in post["blocks"]]
+        assert all(len(post["blocks"]) <= MESSAGE_BLOCK_LIMIT for post in client.posts)
+        assert all(len(block["text"]["text"]) <= SECTION_TEXT_LIMIT for block in blocks)
+        headings = [
+            line
+            for block in blocks
+            for line in block["text"]["text"].split("\n")
+            if line.startswith("*Part")
+        ]
+        assert headings == [f"*Part {index}*" for index in range(MESSAGE_BLOCK_LIMIT)]
+
+    def test_sections_should_break_on_headings_and_paragraphs(self):
+        text = "*One*\nfirst\n\nsecond\n*Two*\nthird"
+
+        assert list(_iter_sections(text, 30)) == [
+            "*One*\nfirst\n\nsecond",
+            "*Two*\nthird",
+        ]
+        assert list(_iter_sections(text, 20)) == [
+            "*One*\nfirst",
+            "second",
+            "*Two*\nthird",
+        ]
+
+    def test_oversized_paragraph_should_be_split_on_words(self):
+        sections = list(_iter_sections("a" * 5 + " " + "b" * 5 + "c" * 20, 18))
+
+        assert sections == ["aaaaa", "bbbbbccccc", "cccccccccc", "ccccc"]
+        assert list(_iter_sections("one two three four five six", 18)) == [
+            "one two",
+            "three",
+            "four five",
+            "six",
+        ]
+
+    def test_code_blocks_should_be_reopened_across_sections(self):
+        code = "\n".join(f"line_{index} = {index}" for index in range(6))
+        sections = list(_iter_sections(f"```\n{code}\n```", 40))
+
+        assert len(sections) > 1
+        assert all(section.count("```") == 2 for section in sections)
+        assert all(len(section) <= 40 for section in sections)
+
+
 class TestSlackGetChannel:
+    def setup_method(self):
+        channel_directory.clear()
+
     def test_get_channel_with_empty_book_name_should_raise_exception(self):
         with pytest.raises(Exception) as exception:
             get_channel_id(object_name="", client=TestClient())
@@ -69,6 +213,83 @@ class TestSlackGetChannel:
                 get_channel_id(object_name="123", client=TestClient())
 
 
+class TestChannelDirectory:
+    def setup_method(self):
+        self.now = 0.0
+        self.directory = ChannelDirectory(ttl_seconds=60, clock=lambda: self.now)
+        self.client = PaginatedSlackClient()
+        channel_directory.clear()
+
+    def test_directory_should_load_every_page_once(self):
+        assert self.directory.get("channel-49999", self.client) == "C00049999"
+        assert self.directory.get("channel-0", self.client) == "C00000000"
+        assert self.directory.get("missing", self.client) is None
+        assert self.client.list_calls == 50
+
+    def test_rate_limited_page_should_be_retried_after_the_delay(self):
+        list_channels = self.client.conversations_list
+        failures = iter([_rate_limited()])
+
+        def conversations_list(**kwargs):
+            if error := next(failures, None):
+                raise error
+            return list_channels(**kwargs)
+
+        with (
+            patch.object(
+                self.client, "conversations_list", side_effect=conversations_list
+            ),
+            patch("src.slack_helper.time.sleep") as mock_sleep,
+        ):
+            assert self.directory.refresh(self.client) == 50000
+
+        mock_sleep.assert_called_once_with(3.0)
+
+    def test_persistent_rate_limit_should_fail_the_refresh(self):
+        with (
+            patch.object(
+                self.client, "conversations_list", side_effect=_rate_limited()
+            ) as patched,
+            patch("src.slack_helper.time.sleep") as mock_sleep,
+            pytest.raises(SlackApiError),
+        ):
+            self.directory.refresh(self.client)
+
+        assert patched.call_count == 5
+        assert mock_sleep.call_count == 4
+        assert self.directory.is_stale()
+
+    def test_directory_should_reload_after_ttl(self):
+        self.directory.get("channel-1", self.client)
+        self.now = 61
+
+        assert self.directory.is_stale()
+        self.directory.get("channel-1", self.client)
+        assert self.client.list_calls == 100
+
+    def test_created_channel_should_be_added_without_reloading(self):
+        with patch("src.slack_helper.create_channel") as mock_create_channel:
+            mock_create_channel.side_effect = lambda name: (
+                self.client.conversations_create(name)["channel"]["id"]
+            )
+            channel_id = get_channel_id("My Book", client=self.client)
+
+            assert get_channel_id("My Book", client=self.client) == channel_id
+
+        assert self.client.created == ["my-book"]
+        assert self.client.list_calls == 50
+
+    def test_failed_creation_should_reload_the_directory(self):
+        channel_directory.refresh(self.client)
+        self.client.channels.append({"name": "taken", "id": "CTAKEN"})
+
+        with patch("src.slack_helper.create_channel") as mock_create_channel:
+            mock_create_channel.side_effect = Exception("name_taken")
+            assert get_channel_id("Taken", client=self.client) == "CTAKEN"
+
+        assert self.client.list_calls == 50 + 51
+
+
 class TestSlackCreateChannel:
     def test_create_channel_with_empty_book_name_should_raise_exception(self):
         with pytest.raises(Exception) as exception:
@@ -88,6 +309,41 @@ class TestSlackCreateChannel:
                 create_channel(object_name="123", client=TestClient())
 
 
+class TestSlackChannelState:
+    def setup_method(self):
+        self.client = PaginatedSlackClient(channel_count=2)
+
+    def test_channel_state_should_follow_slack(self):
+        self.client.archived.add("C00000001")
+
+        assert get_channel_state("C00000000", self.client) == "active"
+        assert get_channel_state("C00000001", self.client) == "archived"
+        assert get_channel_state("C99999999", self.client) == "not_found"
+
+    def test_other_slack_errors_should_raise_exception(self):
+        with patch.object(self.client, "conversations_info") as patched:
+            patched.side_effect = SlackApiError(
+                message="ratelimited", response={"error": "ratelimited"}
+            )
+            with pytest.raises(Exception) as exception:
+                get_channel_state("C00000000", self.client)
+        assert str(exception.value) == "Error getting channel's info: ratelimited"
+
+    def test_unarchive_should_call_slack(self):
+        self.client.archived.add("C00000001")
+
+        unarchive_channel("C00000001", self.client)
+
+        assert self.client.archived == set()
+        with patch.object(self.client, "conversations_unarchive") as patched:
+            patched.side_effect = SlackApiError(
+                message="not_in_channel", response={"error": "not_in_channel"}
+            )
+            with pytest.raises(Exception) as exception:
+                unarchive_channel("C00000001", self.client)
+        assert str(exception.value) == "Error unarchiving channel: not_in_channel"
+
+
 class TestFormatMessageFromMarkdown:
     def test_empty_message_should_raise(self):
         with pytest.raises(Exception) as exception:
@@ -107,6 +363,174 @@ class TestFormatMessageFromMarkdown:
     ):
         assert _markdown_to_slackdown(initial_message) == expected
 
+    @pytest.mark.parametrize(
+        "initial_message, expected",
+        [
+            ("# **Bold** title #", "*Bold title*"),
+            ("Some *italic* text", "Some _italic_ text"),
+            ("Some __very bold__ and _italic_", "Some *very bold* and _italic_"),
+            ("Override __init__ or __repr__", "Override __init__ or __repr__"),
+            ("my__private__ name", "my__private__ name"),
+            ("***Key*** point", "*_Key_* point"),
+            ("## A ***key*** idea", "*A _key_ idea*"),
+            ("## Using a*b and **bold**", "*Using a*b and bold*"),
+            ("### __Why it__ matters", "*Why it matters*"),
+            ("## The `code` and *italic* way", "*The `code` and _italic_ way*"),
+            ("2 * 3 * 4 and snake_case_name", "2 * 3 * 4 and snake_case_name"),
+            ("Use `**kwargs` here", "Use `**kwargs` here"),
+            ("See [the docs](https://docs.io)", "See <https://docs.io|the docs>"),
+            ("~~old~~ new", "~old~ new"),
+            ("- one\n  * two\n+ three", "• one\n  • two\n• three"),
+            ("1. first\n2. second", "1. first\n2. second"),
+            ("> a **quote**\n>", "> a *quote*\n>"),
+            (
+                "```python\n## not a heading **x**\n- item\n```\nAfter **it**",
+                "```\n## not a heading **x**\n- item\n```\nAfter *it*",
+            ),
+        ],
+    )
+    def test_extended_markdown_should_be_converted(self, initial_message, expected):
+        assert _markdown_to_slackdown(initial_message) == expected
+
+
+class TestUpdateSlackMessage:
+    def test_update_with_missing_ts_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            update_slack_message("123456", "", "Message", StreamingTestClient())
+        assert str(exception.value) == "Wrong argument given 123456 -  - Message"
+
+    def test_update_should_edit_the_message(self):
+        client = StreamingTestClient()
+        assert update_slack_message("123456", "1.0", "Message", client) is True
+        assert client.updates == ["Message"]
+
+    def test_slack_exception_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            with patch("slack_sdk.WebClient.chat_update") as patched:
+                patched.side_effect = SlackApiError(
+                    message="Something didnt go well",
+                    response={"error": "message_not_found"},
+                )
+                update_slack_message("123", "1.0", "456")
+        assert str(exception.value) == "Error updating message: message_not_found"
+
+
+class TestStreamSlackMessage:
+    def test_stream_should_post_placeholder_then_update_in_place(self, monkeypatch):
+        monkeypatch.setenv("STREAMING_UPDATE_TOKENS", "2")
+        client = StreamingTestClient()
+
+        result = stream_slack_message(
+            "123456", iter(["## Title\n", "Some **bo", "ld**"]), client
+        )
+
+        assert result == "## Title\nSome **bold**"
+        assert client.posted == ["_Generating summary..._"]
+        assert client.updates == ["*Title*\nSome **bo", "*Title*\nSome *bold*"]
+
+    def test_stream_should_update_after_the_interval(self, monkeypatch):
+        monkeypatch.setenv("STREAMING_UPDATE_SECONDS", "0")
+        client = StreamingTestClient()
+
+        stream_slack_message("123456", iter(["a", "b"]), client)
+
+        assert client.updates == ["a", "ab", "ab"]
+
+    def test_empty_stream_should_raise_exception(self):
+        client = StreamingTestClient()
+        with pytest.raises(Exception) as exception:
+            stream_slack_message("123456", iter([]), client)
+        assert str(exception.value) == "Empty stream received for channel_id='123456'"
+        assert client.deleted == ["1700000000.000100"]
+
+    def test_failed_stream_should_delete_the_placeholder(self):
+        client = StreamingTestClient()
+
+        def chunks():
+            yield "Some text"
+            raise Exception("stream dropped")
+
+        with pytest.raises(Exception, match="stream dropped"):
+            stream_slack_message("123456", chunks(), client)
+        assert client.deleted == ["1700000000.000100"]
+
+    def test_failed_placeholder_deletion_should_keep_the_stream_error(self):
+        client = StreamingTestClient()
+
+        with patch.object(client, "chat_delete", side_effect=Exception("gone")):
+            with pytest.raises(Exception, match="Empty stream"):
+                stream_slack_message("123456", iter([]), client)
+
+    def _fail_updates(self, client: StreamingTestClient, *errors: Exception):
+        failures = iter(errors)
+
+        def chat_update(channel: str, ts: str, text: str):
+            if error := next(failures, None):
+                raise error
+            return StreamingTestClient.chat_update(client, channel, ts, text)
+
+        return patch.object(client, "chat_update", side_effect=chat_update)
+
+    def test_rate_limited_refresh_should_pause_refreshes(self, monkeypatch):
+        monkeypatch.setenv("STREAMING_UPDATE_TOKENS", "1")
+        client = StreamingTestClient()
+
+        with (
+            self._fail_updates(client, _rate_limited()),
+            patch("src.slack_helper.time.sleep") as mock_sleep,
+        ):
+            result = stream_slack_message("123456", iter(["a", "b", "c"]), client)
+
+        assert result == "abc"
+        assert client.updates == ["abc"]
+        assert 0 < mock_sleep.call_args.args[0] <= 3
+        assert client.deleted == []
+
+    def test_failed_refresh_should_be_skipped(self, monkeypatch):
+        monkeypatch.setenv("STREAMING_UPDATE_TOKENS", "1")
+        client = StreamingTestClient()
+
+        with self._fail_updates(client, Exception("timed out")):
+            stream_slack_message("123456", iter(["a", "b"]), client)
+
+        assert client.updates == ["ab", "ab"]
+
+    def test_rate_limited_final_update_should_fail_the_stream(self):
+        client = StreamingTestClient()
+
+        with patch.object(client, "chat_update", side_effect=_rate_limited()):
+            with pytest.raises(SlackRateLimitedError) as exception:
+                stream_slack_message("123456", iter(["a"]), client)
+
+        assert exception.value.retry_after == 3
+        assert client.deleted == ["1700000000.000100"]
+
+    def test_placeholder_without_ts_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            stream_slack_message("123456", iter(["a"]), TestClient())
+        assert "Wrong argument given 123456 -  - " in str(exception.value)
+
+
+class TestSlackdownStream:
+    def test_incremental_conversion_should_match_full_conversion(self):
+        message = "## Heading\nSome **bold** words\n\n### Other\nEnd **here**"
+        converter = _SlackdownStream()
+        for index in range(0, len(message), 3):
+            converter.feed(message[index : index + 3])
+
+        assert converter.render() == _markdown_to_slackdown(message)
+        assert converter.raw == message
+
+    def test_code_block_state_should_survive_across_chunks(self):
+        message = "Intro\n```\n## kept **as is**\n```\n- done"
+        converter = _SlackdownStream()
+        for index in range(0, len(message), 4):
+            converter.feed(message[index : index + 4])
+            converter.render()
+
+        assert converter.render() == _markdown_to_slackdown(message)
+        assert "## kept **as is**" in converter.render()
+
 
 class TestVerifySlackSignature:
     def setup_method(self, method):
@@ -147,3 +571,161 @@ class TestVerifySlackSignature:
         sig = self._generate_signature(self.secret, timestamp, body)
 
         assert verify_slack_request(timestamp, sig, body) is True
+
+
+class TestSignatureVerifier:
+    def setup_method(self, method):
+        self.now = [1_700_000_000.0]
+        self.verifier = SignatureVerifier(
+            "secret", max_nonces=2, clock=lambda: self.now[0]
+        )
+
+    def _sign(self, timestamp: str, body: bytes) -> str:
+        return (
+            "v0="
+            + hmac.new(
+                b"secret", f"v0:{timestamp}:".encode() + body, hashlib.sha256
+            ).hexdigest()
+        )
+
+    def test_signature_should_be_computed_over_raw_bytes(self):
+        body = "text=caf\u00e9".encode("latin-1")
+        signature = self._sign("1700000000", body)
+
+        assert self.verifier.verify("1700000000", signature, body) is True
+
+    def test_invalid_timestamp_should_be_rejected(self):
+        assert self.verifier.verify("yesterday", "v0=abc", b"hello") is False
+
+    def test_replayed_signature_should_be_rejected(self):
+        signature = self._sign("1700000000", b"hello")
+
+        assert self.verifier.verify("1700000000", signature, b"hello") is True
+        assert self.verifier.verify("1700000000", signature, b"hello") is False
+
+    def test_expired_nonces_should_be_evicted(self):
+        self.verifier.verify("1700000000", self._sign("1700000000", b"a"), b"a")
+        self.now[0] += 400
+        self.verifier.verify("1700000400", self._sign("1700000400", b"b"), b"b")
+
+        assert list(self.verifier._seen) == [self._sign("1700000400", b"b")]
+
+    def test_full_nonce_cache_should_refuse_instead_of_forgetting(self):
+        signatures = {body: self._sign("1700000000", body) for body in (b"a", b"b")}
+        for body, signature in signatures.items():
+            assert self.verifier.verify("1700000000", signature, body) is True
+
+        assert (
+            self.verifier.verify("1700000000", self._sign("1700000000", b"c"), b"c")
+            is False
+        )
+        assert self.verifier.verify("1700000000", signatures[b"a"], b"a") is False
+        assert list(self.verifier._seen) == list(signatures.values())
+
+    def test_full_nonce_cache_should_free_expired_entries(self):
+        late = self._sign("1700000200", b"a")
+        self.now[0] += 200
+        self.verifier.verify("1700000200", late, b"a")
+        self.verifier.verify("1700000000", self._sign("1700000000", b"b"), b"b")
+        self.now[0] += 150
+
+        signature = self._sign("1700000350", b"c")
+        assert self.verifier.verify("1700000350", signature, b"c") is True
+        assert list(self.verifier._seen) == [late, signature]
+
+
+class TestPooledSlackClient:
+    def teardown_method(self):
+        close_slack_client()
+
+    @responses.activate
+    def test_pooled_client_should_reuse_one_session(self):
+        responses.post(
+            "https://slack.com/api/chat.postMessage",
+            json={"ok": True, "ts": "1.0"},
+        )
+        client = PooledWebClient(pool_size=2, token="xoxb-test")
+
+        for _ in range(3):
+            assert client.chat_postMessage(channel="C1", text="Hi")["ts"] == "1.0"
+
+        assert len(responses.calls) == 3
+        assert responses.calls[0].request.headers["Authorization"] == "Bearer xoxb-test"
+        assert client.session.adapters["https://"]._pool_maxsize == 2
+
+    @responses.activate
+    def test_pooled_client_should_raise_slack_errors(self):
+        responses.post(
+            "https://slack.com/api/chat.postMessage",
+            json={"ok": False, "error": "channel_not_found"},
+            status=404,
+        )
+        client = PooledWebClient(token="xoxb-test", proxy="http://proxy:8080")
+
+        with pytest.raises(SlackApiError):
+            client.chat_postMessage(channel="C1", text="Hi")
+
+    @responses.activate
+    def test_dropped_pooled_connection_should_be_retried(self):
+        url = "https://slack.com/api/chat.postMessage"
+        responses.post(url, body=requests.exceptions.ConnectionError("reset"))
+        responses.post(url, json={"ok": True, "ts": "1.0"})
+        client = PooledWebClient(token="xoxb-test")
+
+        with patch("slack_sdk.http_retry.handler.time.sleep"):
+            assert client.chat_postMessage(channel="C1", text="Hi")["ts"] == "1.0"
+
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_pooled_client_should_report_timeouts_like_urllib(self):
+        responses.post(
+            "https://slack.com/api/chat.postMessage",
+            body=requests.exceptions.ReadTimeout("slow"),
+        )
+
+        with pytest.raises(TimeoutError):
+            PooledWebClient(token="xoxb-test").chat_postMessage(channel="C1", text="Hi")
+
+    @responses.activate
+    def test_rate_limited_pooled_call_should_expose_retry_after(self):
+        responses.post(
+            "https://slack.com/api/chat.postMessage",
+            json={"ok": False, "error": "ratelimited"},
+            status=429,
+            headers={"Retry-After": "3"},
+        )
+
+        with pytest.raises(SlackApiError) as error:
+            PooledWebClient(token="xoxb-test").chat_postMessage(channel="C1", text="Hi")
+
+        assert error.value.response.status_code == 429
+        assert error.value.response.headers["retry-after"] == "3"
+
+    def test_pooled_client_should_use_the_given_ssl_context(self):
+        context = ssl.create_default_context()
+        client = PooledWebClient(token="xoxb-test", ssl=context)
+        adapter = client.session.adapters["https://"]
+
+        assert adapter.poolmanager.connection_pool_kw["ssl_context"] is context
+        assert (
+            adapter.proxy_manager_for("http://proxy:8080").connection_pool_kw[
+                "ssl_context"
+            ]
+            is context
+        )
+        assert client.session.verify is True
+
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        assert PooledWebClient(token="xoxb-test", ssl=context).session.verify is False
+
+    def test_shared_client_should_be_created_once(self):
+        client = get_slack_client()
+
+        assert get_slack_client() is client
+        close_slack_client()
+        assert get_slack_client() is not client
+
+    def test_async_send_should_run_on_the_slack_pool(self):
+        assert asyncio.run(send_slack_message_async("C1", "Hi", TestClient())) is True
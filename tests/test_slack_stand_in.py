@@ -0,0 +1,71 @@
+import pytest
+from src.slack_helper import (
+    ChannelDirectory,
+    PooledWebClient,
+    SlackRateLimitedError,
+    create_channel,
+    send_slack_message,
+    update_slack_message,
+)
+from tests.slack_stand_in import SlackStandIn
+
+
+class TestSlackStandIn:
+    def setup_method(self):
+        self.stand_in = SlackStandIn(channel_count=2500).start()
+        self.client = PooledWebClient(
+            token="xoxb-test", base_url=self.stand_in.base_url
+        )
+
+    def teardown_method(self):
+        self.client.close()
+        self.stand_in.stop()
+
+    def test_messages_should_be_posted_and_updated(self):
+        response = send_slack_message("C1", "Some **bold** text", self.client)
+
+        update_slack_message("C1", response["ts"], "Final text", self.client)
+
+        assert self.stand_in.messages["C1"] == [
+            {"channel": "C1", "text": "Final text", "ts": response["ts"]}
+        ]
+
+    def test_structured_messages_should_be_threaded(self):
+        send_slack_message("C1", "word " * 40_000, self.client, structured=True)
+
+        parent, *replies = self.stand_in.messages["C1"]
+        assert len(parent["blocks"]) == 50
+        assert replies and all(reply["thread_ts"] == parent["ts"] for reply in replies)
+
+    def test_directory_should_page_through_the_channels(self):
+        directory = ChannelDirectory(ttl_seconds=60)
+
+        assert directory.refresh(self.client) == 2500
+        assert self.stand_in.calls["conversations.list"] == 3
+
+    def test_channels_should_be_created_once(self):
+        assert create_channel("new-book", self.client) == "C00002500"
+        with pytest.raises(Exception, match="name_taken"):
+            create_channel("new-book", self.client)
+
+    def test_rate_limits_should_carry_retry_after(self):
+        self.stand_in.rate_limit_every = 1
+        self.stand_in.retry_after = 7
+
+        with pytest.raises(SlackRateLimitedError) as error:
+            send_slack_message("C1", "hello", self.client)
+
+        assert error.value.retry_after == 7
+        assert self.stand_in.rate_limited == 1
+
+    def test_injected_errors_should_raise(self):
+        self.stand_in.error_rate = 1
+
+        with pytest.raises(Exception, match="internal_error"):
+            send_slack_message("C1", "hello", self.client)
+
+    def test_stopped_stand_in_has_no_base_url(self):
+        self.stand_in.stop()
+
+        with pytest.raises(Exception, match="not running"):
+            self.stand_in.base_url
@@ -0,0 +1,93 @@
+import json
+import os
+import time
+import pytest
+from tinydb import TinyDB
+from src.metrics_helper import metrics
+from src.storage_helper import WriteBehindStorage
+
+
+class TestWriteBehindStorage:
+    def setup_method(self):
+        self.path = "test_storage.json"
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        metrics.reset()
+
+    def teardown_method(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _on_disk(self) -> dict:
+        with open(self.path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_writes_should_be_coalesced_until_the_threshold(self):
+        db = TinyDB(
+            self.path,
+            storage=WriteBehindStorage,
+            max_pending_writes=3,
+            flush_interval=0,
+        )
+
+        db.insert({"isbn": "1"})
+        db.insert({"isbn": "2"})
+        assert not os.path.exists(self.path)
+        assert len(db.all()) == 2
+
+        db.insert({"isbn": "3"})
+        assert len(self._on_disk()["_default"]) == 3
+        assert metrics.counters["storage.coalesced_writes"] == 3
+        assert metrics.samples["storage.flush_bytes"][0] == os.path.getsize(self.path)
+
+    def test_pending_writes_should_flush_after_the_interval(self):
+        db = TinyDB(
+            self.path,
+            storage=WriteBehindStorage,
+            max_pending_writes=100,
+            flush_interval=0.05,
+            fsync="never",
+        )
+
+        db.insert({"isbn": "1"})
+        time.sleep(0.3)
+
+        assert self._on_disk() == {"_default": {"1": {"isbn": "1"}}}
+        assert not os.path.exists(f"{self.path}.tmp")
+
+    def test_close_should_flush_pending_writes(self):
+        db = TinyDB(self.path, storage=WriteBehindStorage, flush_interval=0)
+        db.insert({"isbn": "1"})
+
+        db.close()
+
+        assert self._on_disk() == {"_default": {"1": {"isbn": "1"}}}
+        assert db.storage.flush() == 0
+
+    def test_external_changes_should_be_reloaded(self):
+        db = TinyDB(self.path, storage=WriteBehindStorage, max_pending_writes=1)
+        db.insert({"isbn": "1"})
+        loads = db.storage.version()
+
+        with TinyDB(self.path) as external:
+            external.insert({"isbn": "2"})
+
+        assert db.storage.version() == loads + 1
+        assert [document["isbn"] for document in db.all()] == ["1", "2"]
+
+    def test_pending_writes_should_win_over_the_file(self):
+        db = TinyDB(self.path, storage=WriteBehindStorage, flush_interval=0)
+        db.insert({"isbn": "1"})
+
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write("")
+
+        assert db.all() == [{"isbn": "1"}]
+
+    def test_invalid_policy_should_raise(self):
+        with pytest.raises(Exception) as exception:
+            WriteBehindStorage(self.path, fsync="sometimes")
+        assert (
+            str(exception.value)
+            == "Invalid write-behind storage given fsync='sometimes' - max_pending_writes=100"
+        )
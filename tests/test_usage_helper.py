@@ -0,0 +1,125 @@
+import asyncio
+from datetime import date, datetime
+from unittest.mock import patch
+import pytest
+from src.ai_helper import _send_prompt_async, stream_summary
+from src.cache_helper import summary_cache
+from src.domain import Technology
+from src.main import generate_daily_summaries, handle_usage_command
+from src.rate_limit_helper import PromptLimiter
+from src.usage_helper import UsageStore, track_origin, usage_origin, usage_store
+from tests.test_utils import AsyncTestClient, StreamingTestClient
+
+
+class TestUsageStore:
+    def setup_method(self):
+        self.store = UsageStore(":memory:")
+        with track_origin("isbn-1", "Big Book", "C1"):
+            self.store.record("page", "m", 1000, 3000, 20.0, datetime(2026, 1, 1))
+            self.store.record("page", "m", 500, 500, 4.0, datetime(2026, 1, 2))
+        with track_origin("Python", "Python", "C2"):
+            self.store.record("tech", "m", 100, 200, 30.0, datetime(2026, 1, 2))
+        self.store.record("tech", "m", 1, 1, 0.1, datetime(2026, 1, 2))
+
+    def test_origin_should_be_reset_after_tracking(self):
+        assert usage_origin.get() is None
+
+    def test_aggregate_by_object(self):
+        rows = self.store.aggregate("object")
+        assert [row["key"] for row in rows] == ["Python", "isbn-1", "unknown"]
+        assert rows[1] == {
+            "key": "isbn-1",
+            "name": "Big Book",
+            "calls": 2,
+            "prompt_tokens": 1500,
+            "completion_tokens": 3500,
+            "seconds": 24.0,
+        }
+
+    def test_aggregate_by_channel_and_day(self):
+        assert [row["key"] for row in self.store.aggregate("channel")] == [
+            "",
+            "C1",
+            "C2",
+        ]
+        days = self.store.aggregate("day", since=date(2026, 1, 2))
+        assert [(row["key"], row["calls"]) for row in days] == [("2026-01-02", 3)]
+
+    def test_top_should_rank_by_tokens_or_seconds(self):
+        assert [row["name"] for row in self.store.top(2)] == ["Big Book", "Python"]
+        assert [row["name"] for row in self.store.top(1, by="seconds")] == ["Python"]
+
+    @pytest.mark.parametrize(
+        "call, message",
+        [
+            (
+                lambda store: store.aggregate("isbn"),
+                "Invalid aggregation given by='isbn'",
+            ),
+            (lambda store: store.top(0), "Invalid ranking given by='tokens' - count=0"),
+            (
+                lambda store: store.top(1, by="cost"),
+                "Invalid ranking given by='cost' - count=1",
+            ),
+        ],
+    )
+    def test_invalid_queries_should_raise_exception(self, call, message):
+        with pytest.raises(Exception) as exception:
+            call(self.store)
+        assert str(exception.value) == message
+
+    def test_clear_should_remove_records(self):
+        self.store.clear()
+        assert self.store.aggregate("object") == []
+
+
+class TestUsageRecording:
+    def setup_method(self):
+        usage_store.clear()
+        summary_cache.clear()
+
+    def test_async_prompts_should_record_usage_for_their_subscription(self):
+        technology = Technology(name="Rust", channel_id="C9")
+
+        with patch("src.ai_helper.get_async_client", return_value=AsyncTestClient()):
+            asyncio.run(generate_daily_summaries([technology]))
+
+        [row] = usage_store.aggregate("channel")
+        assert (row["key"], row["name"], row["calls"]) == ("C9", "Rust", 1)
+        assert (row["prompt_tokens"], row["completion_tokens"]) == (100, 400)
+
+    def test_streamed_prompts_should_record_usage_on_completion(self):
+        with track_origin("isbn-2", "Streamed", "C3"):
+            list(stream_summary("key", "prompt", StreamingTestClient(), kind="page"))
+
+        [row] = usage_store.top(1)
+        assert (row["name"], row["prompt_tokens"], row["completion_tokens"]) == (
+            "Streamed",
+            12,
+            3,
+        )
+
+    def test_usage_command_should_report_top_subscriptions(self):
+        limiter = PromptLimiter(max_concurrency=1, tokens_per_minute=100000)
+        with track_origin("Go", "Go", "C4"):
+            asyncio.run(
+                _send_prompt_async("prompt", limiter, AsyncTestClient(), kind="tech")
+            )
+
+        report = handle_usage_command("3")
+
+        assert report.startswith("Top 3 most expensive subscriptions:\nGo: 500 tokens")
+        assert "Top 3 slowest subscriptions:\nGo: 500 tokens" in report
+        assert f"Daily usage:\n{date.today().isoformat()}: 500 tokens" in report
+
+    def test_usage_command_with_invalid_argument_should_raise_exception(self):
+        with pytest.raises(Exception) as exception:
+            handle_usage_command(42)  # type: ignore[arg-type]
+        assert str(exception.value) == "Invalid usage argument type given <class 'int'>"
+        assert handle_usage_command().startswith("Top 5 most expensive")
+
+    @pytest.mark.parametrize("text", ["0", "-3", "abc", "²"])
+    def test_usage_command_with_invalid_count_should_reply_usage(self, text):
+        assert handle_usage_command(text) == (
+            "Usage: /usage <N> - N is how many subscriptions to show, at least 1"
+        )
@@ -1,13 +1,15 @@
 from src.domain import Book, ObjectType, State, Technology, Type
+import json
 import os
 import responses
+from slack_sdk.errors import SlackApiError
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
 class TestClient:
-    def chat_postMessage(self, channel: str, text: str):
+    def chat_postMessage(self, channel: str, text: str, blocks=None, thread_ts=None):
         class FakeSlackResponse:
             ok = True
 
@@ -16,7 +18,7 @@ class TestClient:
 
         return FakeSlackResponse()
 
-    def conversations_list(self, types):
+    def conversations_list(self, types, exclude_archived=False, limit=100, cursor=""):
         return {
             "ok": True,
             "channels": [
@@ -28,15 +30,236 @@ class TestClient:
     def conversations_create(self, name):
         return {"channel": {"id": "123456"}}
 
+    def api_test(self):
+        return {"ok": True}
+
     class responses:
         @staticmethod
-        def create(model, input):
+        def create(model, input, stream=False, timeout=None):
             class FakeResponse:
                 output_text = "TEST OK"
 
             return FakeResponse()
 
 
+class PaginatedSlackClient(TestClient):
+    def __init__(self, channel_count: int = 50_000):
+        self.channels = [
+            {"name": f"channel-{index}", "id": f"C{index:08d}"}
+            for index in range(channel_count)
+        ]
+        self.list_calls = 0
+        self.created: list[str] = []
+        self.archived: set[str] = set()
+        self.unarchived: list[str] = []
+
+    def conversations_list(self, types, exclude_archived=False, limit=100, cursor=""):
+        self.list_calls += 1
+        start = int(cursor or 0)
+        end = start + limit
+        return {
+            "ok": True,
+            "channels": self.channels[start:end],
+            "response_metadata": {
+                "next_cursor": str(end) if end < len(self.channels) else ""
+            },
+        }
+
+    def conversations_create(self, name):
+        self.created.append(name)
+        channel = {"name": name, "id": f"C{len(self.channels):08d}"}
+        self.channels.append(channel)
+        return {"channel": channel}
+
+    def conversations_info(self, channel):
+        if not any(known["id"] == channel for known in self.channels):
+            raise SlackApiError(
+                message="channel_not_found", response={"error": "channel_not_found"}
+            )
+        return {"channel": {"id": channel, "is_archived": channel in self.archived}}
+
+    def conversations_unarchive(self, channel):
+        self.archived.discard(channel)
+        self.unarchived.append(channel)
+        return {"ok": True}
+
+
+class BlockKitTestClient(TestClient):
+    def __init__(self):
+        self.posts: list[dict] = []
+
+    def chat_postMessage(self, channel: str, text: str, blocks=None, thread_ts=None):
+        self.posts.append({"text": text, "blocks": blocks, "thread_ts": thread_ts})
+        ts = f"1700000000.{len(self.posts):06d}"
+
+        class FakeSlackResponse:
+            def validate(self):
+                return {"ok": True, "ts": ts}
+
+        return FakeSlackResponse()
+
+
+class StreamingTestClient(TestClient):
+    def __init__(self, deltas: list[str] | None = None):
+        self.posted: list[str] = []
+        self.updates: list[str] = []
+        self.deleted: list[str] = []
+        self.deltas = (
+            deltas if deltas is not None else ["## Title\n", "Some **bo", "ld**"]
+        )
+
+    def chat_postMessage(self, channel: str, text: str):
+        self.posted.append(text)
+
+        class FakeSlackResponse:
+            def validate(self):
+                return {"ok": True, "ts": "1700000000.000100"}
+
+        return FakeSlackResponse()
+
+    def chat_update(self, channel: str, ts: str, text: str):
+        self.updates.append(text)
+
+        class FakeSlackResponse:
+            def validate(self):
+                return True
+
+        return FakeSlackResponse()
+
+    def chat_delete(self, channel: str, ts: str):
+        self.deleted.append(ts)
+        return {"ok": True}
+
+    @property
+    def responses(self):
+        client = self
+
+        class FakeResponses:
+            def create(self, model, input, stream=False, timeout=None):
+                class FakeEvent:
+                    def __init__(self, type, delta=""):
+                        self.type = type
+                        self.delta = delta
+                        self.response = FakeUsageResponse(12, len(client.deltas))
+
+                yield FakeEvent("response.created")
+                for delta in client.deltas:
+                    yield FakeEvent("response.output_text.delta", delta)
+                yield FakeEvent("response.completed")
+
+        return FakeResponses()
+
+
+class FakeUsageResponse:
+    def __init__(self, input_tokens: int, output_tokens: int):
+        self.output_text = "TEST OK"
+
+        class FakeUsage:
+            pass
+
+        self.usage = FakeUsage()
+        self.usage.input_tokens = input_tokens
+        self.usage.output_tokens = output_tokens
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+
+        class FakeHTTPResponse:
+            pass
+
+        self.response = FakeHTTPResponse()
+        self.response.headers = headers or {}
+
+
+class FlakyTestClient:
+    def __init__(self, failures: list[Exception]):
+        self.failures = list(failures)
+        self.timeouts: list[float] = []
+        self.models: list[str] = []
+
+    @property
+    def responses(self):
+        client = self
+
+        class FakeResponses:
+            def create(self, model, input, timeout=None):
+                client.timeouts.append(timeout)
+                client.models.append(model)
+                if client.failures:
+                    raise client.failures.pop(0)
+
+                class FakeResponse:
+                    output_text = "TEST OK"
+
+                return FakeResponse()
+
+        return FakeResponses()
+
+
+class AsyncTestClient:
+    def __init__(self):
+        self.calls = 0
+
+    @property
+    def responses(self):
+        client = self
+
+        class FakeResponses:
+            async def create(self, model, input, timeout=None):
+                client.calls += 1
+                return FakeUsageResponse(100, 400)
+
+        return FakeResponses()
+
+
+class LocalBatchBackend:
+    def __init__(self, directory: str, complete: bool = True):
+        self.directory = directory
+        self.complete = complete
+
+    def submit(self, path: str) -> str:
+        batch_id = f"batch_{len(os.listdir(self.directory))}"
+        with open(path) as requests_file:
+            requests = [json.loads(line) for line in requests_file]
+        with open(os.path.join(self.directory, batch_id), "w") as output_file:
+            for request in requests:
+                output_file.write(
+                    json.dumps(
+                        {
+                            "custom_id": request["custom_id"],
+                            "response": {
+                                "status_code": 200,
+                                "body": {
+                                    "output": [
+                                        {
+                                            "type": "message",
+                                            "content": [
+                                                {
+                                                    "type": "output_text",
+                                                    "text": f"BATCH {request['body']['input'][:20]}",
+                                                }
+                                            ],
+                                        }
+                                    ]
+                                },
+                            },
+                        }
+                    )
+                    + "\n"
+                )
+        return batch_id
+
+    def is_complete(self, batch_id: str) -> bool:
+        return self.complete
+
+    def results(self, batch_id: str) -> list[dict]:
+        with open(os.path.join(self.directory, batch_id)) as output_file:
+            return [json.loads(line) for line in output_file]
+
+
 default_google_response_per_page = {
     "totalItems": 1,
     "items": [
@@ -0,0 +1,165 @@
+import asyncio
+from dataclasses import replace
+from unittest.mock import patch
+from slack_sdk.errors import SlackApiError
+from src.domain import State
+from src.slack_helper import channel_directory
+from src.warmup_helper import reconcile_channels, warm_connections, warm_up
+from tests.test_utils import (
+    PaginatedSlackClient,
+    default_book_per_page,
+    default_technology,
+)
+
+
+class FailingCreateClient(PaginatedSlackClient):
+    def conversations_create(self, name):
+        if name == "python":
+            raise Exception("restricted_action")
+        return super().conversations_create(name)
+
+
+class TakenNameClient(PaginatedSlackClient):
+    def __init__(self, channel_count: int, taken: set[str]):
+        super().__init__(channel_count)
+        self.taken = taken
+
+    def conversations_create(self, name):
+        if name in self.taken:
+            raise Exception("name_taken")
+        return super().conversations_create(name)
+
+    def conversations_unarchive(self, channel):
+        raise Exception("not_in_channel")
+
+
+class UncheckableClient(PaginatedSlackClient):
+    def conversations_info(self, channel):
+        raise SlackApiError(message="ratelimited", response={"error": "ratelimited"})
+
+
+class TestReconcileChannels:
+    def setup_method(self):
+        channel_directory.clear()
+        self.client = PaginatedSlackClient(channel_count=3)
+        self.client.channels.append({"name": "clean-code", "id": "CRENAMED"})
+        self.book = replace(default_book_per_page)
+        self.finished = replace(
+            default_book_per_page, title="Done", state=State.FINISHED
+        )
+        self.technology = replace(default_technology)
+
+    def teardown_method(self):
+        channel_directory.clear()
+
+    def _reconcile(self, client, technologies):
+        with (
+            patch("src.slack_helper.get_slack_client", return_value=client),
+            patch(
+                "src.warmup_helper.load_books", return_value=[self.book, self.finished]
+            ),
+            patch("src.warmup_helper.load_technologies", return_value=technologies),
+            patch("src.warmup_helper.write_book_to_db") as mock_write_book,
+            patch("src.warmup_helper.write_technology_to_db") as mock_write_tech,
+        ):
+            result = asyncio.run(reconcile_channels())
+        return result, mock_write_book, mock_write_tech
+
+    def test_channels_should_be_resolved_and_created_in_one_pass(self):
+        result, mock_write_book, mock_write_tech = self._reconcile(
+            self.client, [self.technology]
+        )
+
+        assert result == {"updated": 1, "unarchived": 0, "created": 1, "failed": 0}
+        assert self.client.list_calls == 1
+        assert self.client.created == ["sqlalchemy"]
+        assert self.book.channel_id == "CRENAMED"
+        mock_write_book.assert_called_once()
+        mock_write_tech.assert_called_once()
+        assert channel_directory.get("sqlalchemy") == self.technology.channel_id
+
+    def test_failed_creation_should_not_stop_the_others(self):
+        client = FailingCreateClient(channel_count=3)
+        python = replace(default_technology, name="Python", channel_id="")
+
+        result, _, mock_write_tech = self._reconcile(client, [self.technology, python])
+
+        assert result == {"updated": 0, "unarchived": 0, "created": 2, "failed": 1}
+        assert sorted(client.created) == ["clean-code", "sqlalchemy"]
+        assert python.channel_id == ""
+        assert mock_write_tech.call_count == 1
+
+    def test_valid_stored_channels_should_be_kept(self):
+        self.book.channel_id = "C00000001"
+        self.technology.channel_id = "C00000002"
+
+        result, mock_write_book, mock_write_tech = self._reconcile(
+            self.client, [self.technology]
+        )
+
+        assert result == {"updated": 0, "unarchived": 0, "created": 0, "failed": 0}
+        assert self.book.channel_id == "C00000001"
+        mock_write_book.assert_not_called()
+        mock_write_tech.assert_not_called()
+
+    def test_archived_stored_channel_should_be_unarchived(self):
+        self.book.channel_id = "C00000001"
+        self.client.archived.add("C00000001")
+
+        result, mock_write_book, _ = self._reconcile(self.client, [])
+
+        assert result == {"updated": 0, "unarchived": 1, "created": 0, "failed": 0}
+        assert self.client.unarchived == ["C00000001"]
+        assert self.book.channel_id == "C00000001"
+        mock_write_book.assert_not_called()
+
+    def test_taken_name_should_fall_back_to_a_free_name(self):
+        client = TakenNameClient(channel_count=3, taken={"sqlalchemy", "clean-code"})
+        self.technology.channel_id = "C00000001"
+        client.archived.add("C00000001")
+
+        result, _, mock_write_tech = self._reconcile(client, [self.technology])
+
+        assert result == {"updated": 0, "unarchived": 0, "created": 2, "failed": 0}
+        assert sorted(client.created) == ["clean-code-2", "sqlalchemy-2"]
+        assert self.technology.channel_id == channel_directory.get("sqlalchemy-2")
+        mock_write_tech.assert_called_once()
+
+    def test_channel_without_a_free_name_should_fail(self):
+        client = TakenNameClient(
+            channel_count=3,
+            taken={"clean-code"} | {f"clean-code-{index}" for index in range(2, 6)},
+        )
+
+        result, mock_write_book, _ = self._reconcile(client, [])
+
+        assert result == {"updated": 0, "unarchived": 0, "created": 0, "failed": 1}
+        mock_write_book.assert_not_called()
+
+    def test_unchecked_channels_should_be_kept(self):
+        result, mock_write_book, _ = self._reconcile(UncheckableClient(3), [])
+
+        assert result == {"updated": 0, "unarchived": 0, "created": 0, "failed": 0}
+        mock_write_book.assert_not_called()
+
+
+class TestWarmUp:
+    def test_connections_should_be_opened_on_the_shared_client(self):
+        client = PaginatedSlackClient(channel_count=0)
+        with (
+            patch("src.warmup_helper.get_slack_client", return_value=client),
+            patch.object(client, "api_test") as mock_api_test,
+        ):
+            asyncio.run(warm_connections(3))
+        assert mock_api_test.call_count == 3
+
+    def test_failing_warm_up_should_not_stop_startup(self):
+        with (
+            patch("src.warmup_helper.warm_connections"),
+            patch(
+                "src.warmup_helper.reconcile_channels",
+                side_effect=Exception("Slack is down"),
+            ) as mock_reconcile,
+        ):
+            asyncio.run(warm_up())
+        mock_reconcile.assert_called_once()